@@ -0,0 +1,96 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares loading a detailed Moonshot CSV in one read against loading it in
+chunks, reporting CSV rows per second and peak RSS. Each load runs in a
+fresh process so that peak RSS is measured independently.
+
+To run: python3 -m benchmarks.bench_chunked_csv --rows 2520 --cols 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+
+# fields of a detailed Moonshot backtest; only some are used by DailyPerformance
+FIELDS = [
+    "Signal", "Weight", "AbsWeight", "NetExposure", "AbsExposure",
+    "TotalHoldings", "Turnover", "Commission", "Slippage", "Return"]
+
+def write_csv(filepath, rows, cols):
+    np.random.seed(0)
+    dates = pd.date_range("2010-01-04", periods=rows, freq="B", name="Date")
+    columns = ["FI{0}".format(i) for i in range(cols)]
+    with open(filepath, "w") as f:
+        for i, field in enumerate(FIELDS):
+            frame = pd.DataFrame(
+                np.random.normal(0, 0.01, (rows, cols)).round(6), index=dates, columns=columns)
+            frame.insert(0, "Field", field)
+            frame.reset_index().set_index(["Field", "Date"]).to_csv(f, header=i == 0)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+def load(filepath, chunksize):
+    from moonchart import DailyPerformance
+    baseline_mb = peak_rss_mb()
+    start = time.time()
+    perf = DailyPerformance.from_moonshot_csv(
+        filepath, chunksize=chunksize or None, warn_outliers=False)
+    seconds = time.time() - start
+    print("{0} {1} {2} {3}".format(seconds, baseline_mb, peak_rss_mb(), perf.returns.values.nbytes))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2520, help="number of dates (default 10 years)")
+    parser.add_argument("--cols", type=int, default=1000, help="number of securities")
+    parser.add_argument("--chunksize", type=int, default=1000, help="CSV rows per chunk")
+    parser.add_argument("--load", nargs=2, metavar=("FILEPATH", "CHUNKSIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load(args.load[0], int(args.load[1]))
+        return
+
+    directory = tempfile.mkdtemp()
+    filepath = os.path.join(directory, "results.csv")
+    try:
+        write_csv(filepath, args.rows, args.cols)
+        csv_rows = args.rows * len(FIELDS)
+        print("CSV: {0} rows x {1} columns, {2:.0f} MB".format(
+            csv_rows, args.cols, os.path.getsize(filepath) / 1024**2))
+
+        for label, chunksize in (("one read", 0), ("chunked", args.chunksize)):
+            output = subprocess.check_output(
+                [sys.executable, "-m", "benchmarks.bench_chunked_csv", "--load", filepath, str(chunksize)])
+            seconds, baseline_mb, peak_mb, field_bytes = output.decode().split()[-4:]
+            print("{0:<10} {1:>10.0f} rows/s   peak RSS {2:>7.0f} MB ({3:.0f} MB above import, "
+                  "{4:.0f} MB per stored field)".format(
+                      label, csv_rows / float(seconds), float(peak_mb),
+                      float(peak_mb) - float(baseline_mb), int(field_bytes) / 1024**2))
+    finally:
+        os.remove(filepath)
+        os.rmdir(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares get_rolling_sharpe against the per-window rolling apply it replaced.
+
+To run: python3 -m benchmarks.bench_rolling_sharpe --rows 3780 --cols 300
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from moonchart.utils import get_sharpe, get_rolling_sharpe
+
+def rolling_apply_sharpe(returns, window, riskfree=0):
+    """
+    The previous implementation, which calls get_sharpe once per window.
+    """
+    rolling_returns = returns.fillna(0).rolling(window, min_periods=window)
+    return rolling_returns.apply(get_sharpe, raw=True, kwargs=dict(riskfree=riskfree))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=3780, help="number of dates (default 15 years)")
+    parser.add_argument("--cols", type=int, default=300, help="number of columns")
+    parser.add_argument("--window", type=int, default=200, help="rolling window length")
+    parser.add_argument("--riskfree", type=float, default=0.02/252, help="risk-free rate")
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    returns = pd.DataFrame(
+        np.random.normal(0.0003, 0.01, (args.rows, args.cols)),
+        index=pd.date_range("2005-01-03", periods=args.rows, freq="B"))
+    # sprinkle in some gaps
+    returns = returns.where(np.random.random(returns.shape) > 0.05)
+
+    start = time.time()
+    expected = rolling_apply_sharpe(returns, args.window, args.riskfree)
+    apply_seconds = time.time() - start
+
+    start = time.time()
+    actual = get_rolling_sharpe(returns, args.window, args.riskfree)
+    kernel_seconds = time.time() - start
+
+    max_diff = np.nanmax(np.abs(expected.values - actual.values))
+
+    print("shape: {0} x {1}, window: {2}".format(args.rows, args.cols, args.window))
+    print("rolling apply:   {0:.3f}s".format(apply_seconds))
+    print("running sums:    {0:.3f}s".format(kernel_seconds))
+    print("speedup:         {0:.0f}x".format(apply_seconds/kernel_seconds))
+    print("max abs diff:    {0:.3g}".format(max_diff))
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,9 @@ __version__ = get_versions()['version']
 del get_versions
 
 from .tearsheet import Tearsheet
-from .perf import DailyPerformance, AggregateDailyPerformance
+from .perf import (
+    DailyPerformance,
+    AggregateDailyPerformance,
+    GroupedDailyPerformance,
+    IntradayPerformance)
 from .paramscan import ParamscanTearsheet
\ No newline at end of file
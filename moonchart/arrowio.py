@@ -0,0 +1,218 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Reading and writing backtest results in Parquet and Arrow IPC (Feather)
+format.
+
+The files use the same long layout as Moonshot and PNL CSVs: a Field
+column, a Date column (and a Time column for intraday results), and a
+column per strategy or security. Unlike CSVs, they can be read selectively:
+only the requested fields and columns are loaded, so unused fields such as
+AbsWeight cost nothing.
+
+Requires pyarrow.
+"""
+
+from .exceptions import MoonchartError
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+INDEX_COLUMNS = ["Field", "Date", "Time"]
+
+def _require_pyarrow():
+    if pa is None:
+        raise MoonchartError("reading and writing Parquet or Feather files requires pyarrow to be installed")
+
+def _to_table(results):
+    """
+    Converts a results DataFrame with a (Field, Date[, Time]) MultiIndex to
+    an Arrow table in the long layout.
+    """
+    arrays = [pa.array(results.index.get_level_values(name)) for name in results.index.names]
+    for column in results.columns:
+        values = results[column]
+        if values.dtype == object:
+            # PNL results mix numeric fields with string fields such as
+            # Account and OrderRef, so store the column as strings
+            arrays.append(pa.array(
+                values.astype(str).values, mask=values.isnull().values, type=pa.string()))
+        else:
+            arrays.append(pa.array(values.values))
+    names = list(results.index.names) + [str(column) for column in results.columns]
+    return pa.Table.from_arrays(arrays, names=names)
+
+def _select_columns(names, columns):
+    """
+    Returns the file columns to read: the index columns and the requested
+    strategy or security columns (or all of them). Column labels are stored
+    as strings, so the requested columns are compared as strings.
+    """
+    index_columns = [name for name in INDEX_COLUMNS if name in names]
+    if "Field" not in index_columns or "Date" not in index_columns:
+        raise MoonchartError("file is not in the backtest results layout, expected Field and Date columns")
+    if columns is None:
+        return None
+    columns = [str(column) for column in columns]
+    missing_columns = [column for column in columns if column not in names]
+    if missing_columns:
+        raise MoonchartError("columns not found: {0}".format(", ".join(missing_columns)))
+    return index_columns + columns
+
+def _to_results(table):
+    """
+    Converts an Arrow table in the long layout to a results DataFrame.
+    """
+    index_columns = [name for name in INDEX_COLUMNS if name in table.column_names]
+    return table.to_pandas().set_index(index_columns)
+
+def read_results_parquet(filepath, fields=None, columns=None):
+    """
+    Reads backtest results from a Parquet file.
+
+    Parameters
+    ----------
+    filepath : str, required
+        path of the Parquet file
+
+    fields : list of str, optional
+        only read these fields (for example Return and NetExposure). Default
+        is all fields
+
+    columns : list of str, optional
+        only read these strategy or security columns. Default is all columns.
+        Column labels are stored as strings, so other labels (such as integer
+        conids) are matched as strings
+
+    Returns
+    -------
+    DataFrame
+        results with a (Field, Date) or (Field, Date, Time) MultiIndex
+    """
+    _require_pyarrow()
+    read_columns = _select_columns(pq.read_schema(filepath).names, columns)
+    filters = [("Field", "in", list(fields))] if fields is not None else None
+    table = pq.read_table(filepath, columns=read_columns, filters=filters)
+    return _to_results(table)
+
+def read_results_feather(filepath, fields=None, columns=None):
+    """
+    Reads backtest results from an Arrow IPC (Feather) file. The file is
+    memory-mapped, so rows of unwanted fields are never read from disk
+    unless the file is compressed.
+
+    Parameters
+    ----------
+    filepath : str, required
+        path of the Feather file
+
+    fields : list of str, optional
+        only read these fields (for example Return and NetExposure). Default
+        is all fields
+
+    columns : list of str, optional
+        only read these strategy or security columns. Default is all columns.
+        Column labels are stored as strings, so other labels (such as integer
+        conids) are matched as strings
+
+    Returns
+    -------
+    DataFrame
+        results with a (Field, Date) or (Field, Date, Time) MultiIndex
+    """
+    _require_pyarrow()
+    with pa.memory_map(filepath) as source:
+        names = pa.ipc.open_file(source).schema.names
+    read_columns = _select_columns(names, columns)
+    table = feather.read_table(filepath, columns=read_columns, memory_map=True)
+    if fields is not None:
+        table = table.filter(pc.is_in(table["Field"], value_set=pa.array(list(fields), pa.string())))
+    return _to_results(table)
+
+def write_results_parquet(results, filepath, **kwargs):
+    """
+    Writes backtest results to a Parquet file.
+
+    Parameters
+    ----------
+    results : DataFrame, required
+        results with a (Field, Date) or (Field, Date, Time) MultiIndex, for
+        example as returned by quantrocket.moonshot.read_moonshot_csv.
+        Column labels are stored as strings, so labels of other types (such
+        as integer conids) are read back as strings, as from a CSV
+
+    filepath : str, required
+        path of the Parquet file
+
+    kwargs :
+        additional keyword arguments for pyarrow.parquet.write_table, such
+        as compression
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    Convert a Moonshot CSV to Parquet:
+
+    >>> from quantrocket.moonshot import read_moonshot_csv
+    >>> results = read_moonshot_csv("backtest_results.csv")
+    >>> write_results_parquet(results, "backtest_results.parquet")
+    """
+    _require_pyarrow()
+    pq.write_table(_to_table(results), filepath, **kwargs)
+
+def write_results_feather(results, filepath, compression="uncompressed", **kwargs):
+    """
+    Writes backtest results to an Arrow IPC (Feather) file.
+
+    Parameters
+    ----------
+    results : DataFrame, required
+        results with a (Field, Date) or (Field, Date, Time) MultiIndex, for
+        example as returned by quantrocket.moonshot.read_moonshot_csv.
+        Column labels are stored as strings, so labels of other types (such
+        as integer conids) are read back as strings, as from a CSV
+
+    filepath : str, required
+        path of the Feather file
+
+    compression : str, optional
+        "uncompressed", "lz4" or "zstd". Default is uncompressed, which lets
+        readers memory-map the file instead of decompressing it
+
+    kwargs :
+        additional keyword arguments for pyarrow.feather.write_feather
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    Convert a Moonshot CSV to Feather:
+
+    >>> from quantrocket.moonshot import read_moonshot_csv
+    >>> results = read_moonshot_csv("backtest_results.csv")
+    >>> write_results_feather(results, "backtest_results.feather")
+    """
+    _require_pyarrow()
+    feather.write_feather(_to_table(results), filepath, compression=compression, **kwargs)
@@ -0,0 +1,546 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compute backends for the array kernels behind moonchart.utils.
+
+Kernels operate along the first axis of 1-d or 2-d arrays (dates as rows,
+strategies or securities as columns). The NumPy backend is always
+available. If Numba is installed, the Numba backend is used by default; it
+compiles the kernels in nopython mode and runs them in parallel across
+columns, falling back to NumPy for inputs it doesn't support. The
+MOONCHART_BACKEND environment variable ("numpy", "numba", or "auto") sets
+the initial choice.
+
+Results of the two backends are identical for cum_returns and drawdowns,
+for float32 as well as float64 arrays.
+rolling_sharpe, zscores and max_zscores accumulate sums in a different
+order, so they agree within a relative tolerance of about 1e-10.
+rolling_comoments is vectorized NumPy, shared by both backends.
+
+Both backends accept float32 as well as float64 arrays. Outputs have the
+dtype of the input, but products, sums and moments are always accumulated
+in float64, so float32 storage loses precision only in the final rounding.
+"""
+
+import os
+import warnings
+import numpy as np
+from .exceptions import MoonchartError
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def _prepend(row, values):
+    """
+    Returns the values with a row (a scalar for 1-d values) prepended.
+    """
+    row = np.asarray(row, dtype=np.float64).reshape((1,) + values.shape[1:])
+    return np.concatenate((row, values))
+
+class NumpyBackend(object):
+    """
+    Pure NumPy kernels.
+    """
+    name = "numpy"
+
+    def cum_returns(self, returns, compound=True, initial=None):
+        """
+        Computes cumulative returns, skipping (and preserving) nulls like
+        pandas cumprod/cumsum.
+
+        initial, if given, is the running product (or for arithmetic
+        returns, the running sum) of each column's earlier returns, which
+        is carried forward as if those returns preceded these.
+        """
+        isnull = np.isnan(returns)
+        if compound:
+            # add 1 in float64, so float32 returns aren't rounded before
+            # they are accumulated
+            growth = np.where(isnull, 1, np.add(returns, 1, dtype=np.float64))
+        else:
+            growth = np.where(isnull, 0, returns)
+        if initial is not None:
+            growth = _prepend(initial, growth)
+        if compound:
+            cum_returns = growth.cumprod(axis=0, dtype=np.float64)
+        else:
+            cum_returns = growth.cumsum(axis=0, dtype=np.float64)
+            cum_returns += 1
+        if initial is not None:
+            cum_returns = cum_returns[1:]
+        cum_returns[isnull] = np.nan
+        return cum_returns.astype(returns.dtype, copy=False)
+
+    def log_growth(self, returns, compound=True, initial=None):
+        """
+        Computes the running sum of log(1 + return), or of the returns
+        themselves if compound is False. Nulls contribute nothing, so every
+        row holds the growth through that row and differences between rows
+        give the growth over any range. Always returns float64.
+
+        initial, if given, is the growth of each column through the
+        preceding row.
+        """
+        returns = np.where(np.isnan(returns), 0, returns)
+        if compound:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = np.log1p(returns, dtype=np.float64)
+        if initial is None:
+            return returns.cumsum(axis=0, dtype=np.float64)
+        return _prepend(initial, returns).cumsum(axis=0, dtype=np.float64)[1:]
+
+    def drawdowns(self, cum_returns, initial=None):
+        """
+        Computes drawdowns in a single pass and, for float64, a single output
+        buffer.
+
+        The high-water marks are a NaN-aware running maximum, so nulls don't
+        reset them and remain null in the output. initial, if given, is each
+        column's high-water mark from preceding rows (NaN if none).
+        """
+        if initial is None:
+            drawdowns = np.fmax.accumulate(cum_returns, axis=0)
+        else:
+            drawdowns = np.fmax.accumulate(_prepend(initial, cum_returns), axis=0)[1:]
+        if drawdowns.dtype != np.float64:
+            # divide and subtract in float64 and round once, rather than
+            # rounding the ratio to float32 before subtracting 1
+            drawdowns = drawdowns.astype(np.float64)
+        np.divide(cum_returns, drawdowns, out=drawdowns)
+        drawdowns -= 1
+        return drawdowns.astype(cum_returns.dtype, copy=False)
+
+    def rolling_sharpe(self, excess_returns, window, periods_per_year=252):
+        """
+        Computes annualized rolling Sharpe ratios of excess returns containing
+        no NaNs, with periods_per_year return periods per year.
+
+        Equivalent to applying get_sharpe to each window (population standard
+        deviation, 0 for windows with a mean of 0), but computed from the
+        differences of cumulative sums rather than a per-window callback.
+        """
+        num_rows = excess_returns.shape[0]
+        rolling_sharpe = np.full(excess_returns.shape, np.nan, dtype=excess_returns.dtype)
+        if window < 1 or num_rows < window:
+            return rolling_sharpe
+
+        # Demean each column before accumulating so that the squared sums stay
+        # small and the variance doesn't suffer from cancellation
+        shift = excess_returns.mean(axis=0, dtype=np.float64)
+        demeaned = excess_returns - shift
+        zeros = np.zeros((1,) + excess_returns.shape[1:])
+        sums = np.concatenate((zeros, demeaned.cumsum(axis=0)))
+        sq_sums = np.concatenate((zeros, (demeaned * demeaned).cumsum(axis=0)))
+
+        window_means = (sums[window:] - sums[:-window]) / window
+        window_vars = (sq_sums[window:] - sq_sums[:-window]) / window - window_means**2
+        window_vars = np.maximum(window_vars, 0)
+        window_means += shift
+
+        # Windows in which every return is identical have a std of exactly 0
+        # (and a mean of exactly that return), which running sums can't
+        # reproduce, so count the changes within each window to find them
+        changes = np.concatenate((zeros, (excess_returns[1:] != excess_returns[:-1]).cumsum(axis=0)))
+        is_constant = (changes[window-1:] - changes[:num_rows-window+1]) == 0
+        constant_values = excess_returns[window-1:]
+        window_means = np.where(is_constant, constant_values, window_means)
+        window_vars = np.where(is_constant, 0, window_vars)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = window_means / np.sqrt(window_vars) * np.sqrt(periods_per_year)
+        sharpe = np.where(window_means == 0, 0, sharpe)
+
+        rolling_sharpe[window-1:] = sharpe
+        return rolling_sharpe
+
+    def rolling_comoments(self, x, y, windows):
+        """
+        Computes the rolling population variances of x and y and their
+        covariance, for each window, from running sums of x, y, x², y² and
+        xy. x and y contain no NaNs; y may be 1-d and is then shared by the
+        columns of x.
+
+        The running sums are accumulated once and each window is a
+        difference of them, so the cost is linear in the number of rows
+        regardless of the number or length of the windows. Returns a list
+        of (x_vars, y_vars, covs) tuples, one per window, with the shape of
+        x and NaN before the first full window.
+        """
+        num_rows = x.shape[0]
+        if y.ndim < x.ndim:
+            y = y.reshape((num_rows,) + (1,) * (x.ndim - 1))
+        y = np.broadcast_to(y, x.shape)
+
+        # Demean each column before accumulating so that the squared sums stay
+        # small and the moments don't suffer from cancellation
+        x = x - x.mean(axis=0, dtype=np.float64)
+        y = y - y.mean(axis=0, dtype=np.float64)
+        zeros = np.zeros((1,) + x.shape[1:])
+        x_sums = np.concatenate((zeros, x.cumsum(axis=0)))
+        y_sums = np.concatenate((zeros, y.cumsum(axis=0)))
+        x_sq_sums = np.concatenate((zeros, (x * x).cumsum(axis=0)))
+        y_sq_sums = np.concatenate((zeros, (y * y).cumsum(axis=0)))
+        xy_sums = np.concatenate((zeros, (x * y).cumsum(axis=0)))
+
+        # Windows in which every value is identical have a variance of
+        # exactly 0, which running sums can't reproduce, so count the changes
+        # within each window to find them
+        x_changes = np.concatenate((zeros, (x[1:] != x[:-1]).cumsum(axis=0)))
+        y_changes = np.concatenate((zeros, (y[1:] != y[:-1]).cumsum(axis=0)))
+
+        comoments = []
+        for window in windows:
+            x_vars = np.full(x.shape, np.nan)
+            y_vars = np.full(x.shape, np.nan)
+            covs = np.full(x.shape, np.nan)
+            if 1 <= window <= num_rows:
+                x_means = (x_sums[window:] - x_sums[:-window]) / window
+                y_means = (y_sums[window:] - y_sums[:-window]) / window
+                window_x_vars = np.maximum(
+                    (x_sq_sums[window:] - x_sq_sums[:-window]) / window - x_means**2, 0)
+                window_y_vars = np.maximum(
+                    (y_sq_sums[window:] - y_sq_sums[:-window]) / window - y_means**2, 0)
+                window_covs = (xy_sums[window:] - xy_sums[:-window]) / window - x_means * y_means
+
+                x_is_constant = (x_changes[window-1:] - x_changes[:num_rows-window+1]) == 0
+                y_is_constant = (y_changes[window-1:] - y_changes[:num_rows-window+1]) == 0
+                x_vars[window-1:] = np.where(x_is_constant, 0, window_x_vars)
+                y_vars[window-1:] = np.where(y_is_constant, 0, window_y_vars)
+                covs[window-1:] = np.where(x_is_constant | y_is_constant, 0, window_covs)
+            comoments.append((x_vars, y_vars, covs))
+        return comoments
+
+    def zscores(self, returns):
+        """
+        Computes Z-scores, ignoring 0 and null returns.
+        """
+        nonzero_returns = np.where(returns != 0, returns, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            # silence "Mean of empty slice" and "Degrees of freedom <= 0"
+            warnings.simplefilter("ignore", RuntimeWarning)
+            means = np.nanmean(nonzero_returns, axis=0, dtype=np.float64)
+            stds = np.nanstd(nonzero_returns, axis=0, ddof=1, dtype=np.float64)
+            nonzero_returns -= means
+            nonzero_returns /= stds
+        return nonzero_returns
+
+    def max_zscores(self, returns):
+        """
+        Returns the largest absolute Z-score in each column, ignoring 0 and
+        null returns.
+
+        The mean of the nonzero returns comes from a running sum (0
+        contributes nothing to a sum), and the sample standard deviation from
+        the sum of squared deviations from it, which unlike the difference of
+        the sums of squares doesn't lose precision when the mean is large
+        relative to the standard deviation. The most extreme return is either
+        the column max or min, so no Z-scores need to be computed.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            # silence "All-NaN slice encountered"
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            counts = np.count_nonzero(returns, axis=0) - np.isnan(returns).sum(axis=0)
+            sums = np.nansum(returns, axis=0, dtype=np.float64)
+            means = sums/counts
+            deviations = np.where(returns != 0, returns - means, 0)
+            sq_deviations = np.nansum(np.square(deviations, dtype=np.float64), axis=0)
+            stds = np.sqrt(sq_deviations/(counts - 1))
+            maxes = np.nanmax(returns, axis=0)
+            mins = np.nanmin(returns, axis=0)
+
+            # If the max (min) is 0, the largest (smallest) nonzero return isn't
+            # known; fall back to an exact computation for those (rare) columns
+            need_nonzero = (maxes == 0) | (mins == 0)
+            if need_nonzero.any():
+                nonzero = returns[:, need_nonzero]
+                nonzero = np.where(nonzero != 0, nonzero, np.nan)
+                maxes[need_nonzero] = np.nanmax(nonzero, axis=0)
+                mins[need_nonzero] = np.nanmin(nonzero, axis=0)
+
+            return np.fmax(np.abs(maxes - means), np.abs(mins - means))/stds
+
+if numba is not None:
+
+    # Columns are processed in blocks so that each thread walks down the
+    # rows of a contiguous slice of a row-major array
+    BLOCK_SIZE = 64
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_cum_returns(returns, compound, initial):
+        num_rows, num_cols = returns.shape
+        cum_returns = np.empty(returns.shape, dtype=returns.dtype)
+        num_blocks = (num_cols + BLOCK_SIZE - 1) // BLOCK_SIZE
+        for block in numba.prange(num_blocks):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, num_cols)
+            totals = initial[start:stop].copy()
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    value = returns[i, j]
+                    if np.isnan(value):
+                        cum_returns[i, j] = np.nan
+                    elif compound:
+                        totals[j - start] *= value + 1
+                        cum_returns[i, j] = totals[j - start]
+                    else:
+                        totals[j - start] += value
+                        cum_returns[i, j] = totals[j - start] + 1
+        return cum_returns
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_drawdowns(cum_returns, initial):
+        num_rows, num_cols = cum_returns.shape
+        drawdowns = np.empty(cum_returns.shape, dtype=cum_returns.dtype)
+        num_blocks = (num_cols + BLOCK_SIZE - 1) // BLOCK_SIZE
+        for block in numba.prange(num_blocks):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, num_cols)
+            highwater_marks = initial[start:stop].copy()
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    value = cum_returns[i, j]
+                    if not value <= highwater_marks[j - start]:
+                        if not np.isnan(value):
+                            highwater_marks[j - start] = value
+                    drawdowns[i, j] = value / highwater_marks[j - start] - 1
+        return drawdowns
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_rolling_sharpe(excess_returns, window, periods_per_year):
+        num_rows, num_cols = excess_returns.shape
+        rolling_sharpe = np.full(excess_returns.shape, np.nan, dtype=excess_returns.dtype)
+        if window < 1 or num_rows < window:
+            return rolling_sharpe
+        annualization = np.sqrt(periods_per_year)
+        num_blocks = (num_cols + BLOCK_SIZE - 1) // BLOCK_SIZE
+        for block in numba.prange(num_blocks):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, num_cols)
+            width = stop - start
+            # demean to keep the squared sums small
+            shifts = np.zeros(width)
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    shifts[j - start] += excess_returns[i, j]
+            shifts /= num_rows
+            sums = np.zeros(width)
+            sq_sums = np.zeros(width)
+            changes = np.zeros(width, dtype=np.int64)
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    k = j - start
+                    value = excess_returns[i, j] - shifts[k]
+                    sums[k] += value
+                    sq_sums[k] += value * value
+                    if i >= 1 and excess_returns[i, j] != excess_returns[i - 1, j]:
+                        changes[k] += 1
+                    if i >= window:
+                        value = excess_returns[i - window, j] - shifts[k]
+                        sums[k] -= value
+                        sq_sums[k] -= value * value
+                        if excess_returns[i - window + 1, j] != excess_returns[i - window, j]:
+                            changes[k] -= 1
+                    if i < window - 1:
+                        continue
+                    if changes[k] == 0:
+                        # constant window: std is exactly 0
+                        mean = excess_returns[i, j]
+                        var = 0.0
+                    else:
+                        mean = sums[k] / window
+                        var = max(sq_sums[k] / window - mean * mean, 0.0)
+                        mean += shifts[k]
+                    if mean == 0:
+                        rolling_sharpe[i, j] = 0.0
+                    elif var == 0:
+                        rolling_sharpe[i, j] = np.inf if mean > 0 else -np.inf
+                    else:
+                        rolling_sharpe[i, j] = mean / np.sqrt(var) * annualization
+        return rolling_sharpe
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_nonzero_moments(returns):
+        """
+        Returns the count, mean, and sample std of the nonzero, non-null
+        returns in each column, using two passes for accuracy.
+        """
+        num_rows, num_cols = returns.shape
+        counts = np.zeros(num_cols)
+        means = np.zeros(num_cols)
+        stds = np.zeros(num_cols)
+        num_blocks = (num_cols + BLOCK_SIZE - 1) // BLOCK_SIZE
+        for block in numba.prange(num_blocks):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, num_cols)
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    value = returns[i, j]
+                    if value != 0 and not np.isnan(value):
+                        counts[j] += 1
+                        means[j] += value
+            for j in range(start, stop):
+                means[j] /= counts[j]
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    value = returns[i, j]
+                    if value != 0 and not np.isnan(value):
+                        stds[j] += (value - means[j]) ** 2
+            for j in range(start, stop):
+                stds[j] = np.sqrt(stds[j] / (counts[j] - 1))
+        return counts, means, stds
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_zscores(returns):
+        num_rows, num_cols = returns.shape
+        counts, means, stds = _numba_nonzero_moments(returns)
+        zscores = np.empty(returns.shape, dtype=returns.dtype)
+        for i in numba.prange(num_rows):
+            for j in range(num_cols):
+                value = returns[i, j]
+                if value != 0 and not np.isnan(value):
+                    zscores[i, j] = (value - means[j]) / stds[j]
+                else:
+                    zscores[i, j] = np.nan
+        return zscores
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_max_zscores(returns):
+        num_rows, num_cols = returns.shape
+        counts, means, stds = _numba_nonzero_moments(returns)
+        max_deviations = np.full(num_cols, np.nan)
+        num_blocks = (num_cols + BLOCK_SIZE - 1) // BLOCK_SIZE
+        for block in numba.prange(num_blocks):
+            start = block * BLOCK_SIZE
+            stop = min(start + BLOCK_SIZE, num_cols)
+            for i in range(num_rows):
+                for j in range(start, stop):
+                    value = returns[i, j]
+                    if value != 0 and not np.isnan(value):
+                        deviation = abs(value - means[j])
+                        if not deviation <= max_deviations[j]:
+                            max_deviations[j] = deviation
+        return max_deviations / stds
+
+class NumbaBackend(NumpyBackend):
+    """
+    Numba-compiled kernels, parallelized across columns. Inputs other than
+    1-d or 2-d float32 or float64 arrays are passed to the NumPy kernels.
+    """
+    name = "numba"
+
+    def _supports(self, values):
+        return values.dtype in (np.float32, np.float64) and values.ndim in (1, 2)
+
+    def _call(self, kernel, values, *args):
+        """
+        Calls the kernel on a 2-d view of the values and returns a result of
+        the same shape as the values.
+        """
+        result = kernel(values.reshape((values.shape[0], -1)), *args)
+        return result.reshape(values.shape)
+
+    def _initial(self, values, initial, default):
+        """
+        Returns the initial state as a float64 array with an element per
+        column of the 2-d view of the values.
+        """
+        num_cols = values.reshape((values.shape[0], -1)).shape[1]
+        if initial is None:
+            return np.full(num_cols, default)
+        return np.asarray(initial, dtype=np.float64).reshape(num_cols)
+
+    def cum_returns(self, returns, compound=True, initial=None):
+        if not self._supports(returns):
+            return super(NumbaBackend, self).cum_returns(
+                returns, compound=compound, initial=initial)
+        initial = self._initial(returns, initial, 1.0 if compound else 0.0)
+        return self._call(_numba_cum_returns, returns, compound, initial)
+
+    def drawdowns(self, cum_returns, initial=None):
+        if not self._supports(cum_returns):
+            return super(NumbaBackend, self).drawdowns(cum_returns, initial=initial)
+        initial = self._initial(cum_returns, initial, np.nan)
+        return self._call(_numba_drawdowns, cum_returns, initial)
+
+    def rolling_sharpe(self, excess_returns, window, periods_per_year=252):
+        if not self._supports(excess_returns):
+            return super(NumbaBackend, self).rolling_sharpe(
+                excess_returns, window, periods_per_year=periods_per_year)
+        return self._call(_numba_rolling_sharpe, excess_returns, window, float(periods_per_year))
+
+    def zscores(self, returns):
+        if not self._supports(returns):
+            return super(NumbaBackend, self).zscores(returns)
+        return self._call(_numba_zscores, returns)
+
+    def max_zscores(self, returns):
+        if not self._supports(returns) or returns.ndim != 2:
+            return super(NumbaBackend, self).max_zscores(returns)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return _numba_max_zscores(returns)
+
+BACKENDS = {
+    "numpy": NumpyBackend,
+}
+if numba is not None:
+    BACKENDS["numba"] = NumbaBackend
+
+_backend = None
+
+def get_backend():
+    """
+    Returns the active compute backend.
+
+    Returns
+    -------
+    NumpyBackend or NumbaBackend
+    """
+    global _backend
+    if _backend is None:
+        set_backend(os.environ.get("MOONCHART_BACKEND", "auto"))
+    return _backend
+
+def set_backend(name):
+    """
+    Sets the compute backend used by moonchart.utils.
+
+    Parameters
+    ----------
+    name : str, required
+        "numpy", "numba", or "auto" (Numba if installed, otherwise NumPy)
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    Force the pure NumPy kernels:
+
+    >>> from moonchart.backends import set_backend
+    >>> set_backend("numpy")
+    """
+    global _backend
+    if name == "auto":
+        name = "numba" if "numba" in BACKENDS else "numpy"
+    if name not in BACKENDS:
+        if name == "numba":
+            raise MoonchartError("the numba backend requires numba to be installed")
+        raise MoonchartError("unknown backend {0}, choices are: {1}".format(
+            name, ", ".join(sorted(BACKENDS))))
+    _backend = BACKENDS[name]()
@@ -117,11 +117,48 @@ class BaseTearsheet(object):
         plot.legend(
             loc='center left', bbox_to_anchor=(1, 0.5), title=legend_title)
 
+    def _create_rolling_plot(self, performance, field, ylabel,
+                             subplot, extra_label, figsize, legend_title=None):
+        """
+        Plots a field of the rolling statistics (Volatility, Beta or
+        Correlation). Aggregate performance is
+        plotted for every window; detailed performance only for the longest
+        window that fits in the returns, which is the only window computed,
+        to avoid cluttering the plot. Windows are in periods, which are days
+        only for daily performance.
+        """
+        num_dates = len(performance.returns.index)
+        windows = [window for window in performance.rolling_windows if window < num_dates]
+        if not windows:
+            return
+
+        fig = plt.figure("Rolling {0}".format(field), figsize=figsize)
+        axis = fig.add_subplot(subplot)
+        axis.set_ylabel(ylabel)
+        if field == "Volatility":
+            self._y_format_as_percentage(axis)
+        else:
+            self._y_format_at_least_two_decimal_places(axis)
+
+        if isinstance(performance.returns, pd.DataFrame):
+            window = windows[-1]
+            rolling_stat = performance.rolling_stats_for_window(window)[field]
+            plot = rolling_stat.plot(ax=axis, title="Rolling {0} ({1}-period) {2}".format(
+                field, window, extra_label))
+            self._clear_legend(plot, legend_title=legend_title)
+        else:
+            rolling_stat = performance.rolling_stats[field][windows]
+            plot = rolling_stat.plot(ax=axis, title="Rolling {0} {1}".format(
+                field, extra_label))
+            self._clear_legend(plot, legend_title="Window (periods)")
+        axis.set_xlabel("")
+
     def _create_returns_plots(self, performance, subplot, extra_label, figsize=None,
                               legend_title=None):
         """
         Creates agg/details plots for cumulative returns, drawdowns, rolling
-        Sharpe, and possibly pnl.
+        Sharpe and volatility, and possibly pnl and rolling beta and
+        correlation.
         """
         figsize = figsize or self.figsize
 
@@ -262,6 +299,18 @@ class BaseTearsheet(object):
                 if isinstance(performance.rolling_sharpe, pd.DataFrame):
                     self._clear_legend(plot, legend_title=legend_title)
 
+            self._create_rolling_plot(
+                performance, "Volatility", "Annual volatility",
+                subplot, extra_label, figsize, legend_title)
+
+            if performance.benchmark_returns is not None:
+                self._create_rolling_plot(
+                    performance, "Beta", "Beta",
+                    subplot, extra_label, figsize, legend_title)
+                self._create_rolling_plot(
+                    performance, "Correlation", "Correlation",
+                    subplot, extra_label, figsize, legend_title)
+
             if performance.benchmark_returns is not None:
                 fig = plt.figure("Cumulative Returns vs Benchmark", figsize=figsize)
                 axis = fig.add_subplot(subplot)
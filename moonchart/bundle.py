@@ -0,0 +1,195 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Directory bundles of date-indexed arrays, which can be memory-mapped.
+
+A bundle directory contains:
+
+    metadata.json   the format version, the arrays and their kinds, and
+                    any other metadata
+    index.npy       the dates, as datetime64[ns]
+    columns.json    the column labels and the columns name
+    <name>.npy      one array per name, of shape (dates,) or (dates, columns)
+
+2-d arrays are stored in Fortran order, so that each column is contiguous:
+that is how pandas lays out DataFrame blocks, so a DataFrame built on a
+memory-mapped array is a view of the file rather than a copy, and processes
+which load the same bundle share one copy in the page cache.
+"""
+
+import os
+import json
+import stat
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from .exceptions import MoonchartError
+
+FORMAT_VERSION = 1
+
+METADATA_FILE = "metadata.json"
+INDEX_FILE = "index.npy"
+COLUMNS_FILE = "columns.json"
+
+def save_bundle(directory, data, index, columns, metadata=None):
+    """
+    Saves Series and DataFrames sharing a date index and column index to a
+    bundle directory, creating it if needed.
+
+    The bundle is written to a temporary sibling directory which then
+    replaces the bundle directory, so an interrupted save leaves any
+    existing bundle intact, and processes which have memory-mapped the
+    existing bundle keep reading its (now unlinked) files rather than
+    files being rewritten under them.
+
+    Parameters
+    ----------
+    directory : str, required
+        the bundle directory
+
+    data : dict of str: Series or DataFrame, required
+        the data to save, keyed by name
+
+    index : DatetimeIndex, required
+        the dates shared by the data
+
+    columns : Index, required
+        the columns shared by the DataFrames
+
+    metadata : dict, optional
+        additional JSON-serializable metadata to save
+
+    Returns
+    -------
+    None
+    """
+    directory = os.path.normpath(directory)
+    if (
+        os.path.isdir(directory)
+        and os.listdir(directory)
+        and not os.path.exists(os.path.join(directory, METADATA_FILE))):
+        raise MoonchartError(
+            "{0} is not empty and is not a bundle directory (no {1}), refusing to "
+            "replace it".format(directory, METADATA_FILE))
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    new_directory = tempfile.mkdtemp(
+        dir=parent, prefix=".{0}.".format(os.path.basename(directory)))
+    # mkdtemp makes the directory private; give it the permissions of the
+    # bundle directory it replaces, or of a new directory
+    if os.path.isdir(directory):
+        mode = stat.S_IMODE(os.stat(directory).st_mode)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o777 & ~umask
+    os.chmod(new_directory, mode)
+    try:
+        _write_bundle(new_directory, data, index, columns, metadata)
+    except BaseException:
+        shutil.rmtree(new_directory, ignore_errors=True)
+        raise
+
+    if not os.path.exists(directory):
+        os.rename(new_directory, directory)
+        return
+
+    # A directory can't be renamed over a non-empty one, so move the old
+    # bundle aside first, then delete it
+    old_directory = tempfile.mkdtemp(
+        dir=parent, prefix=".{0}.".format(os.path.basename(directory)))
+    os.rename(directory, os.path.join(old_directory, "bundle"))
+    os.rename(new_directory, directory)
+    # the files may still be memory-mapped (which prevents deleting them on
+    # Windows)
+    shutil.rmtree(old_directory, ignore_errors=True)
+
+def _write_bundle(directory, data, index, columns, metadata):
+    """
+    Writes the files of a bundle to an existing, empty directory.
+    """
+    kinds = {}
+    for name, values in data.items():
+        kinds[name] = {
+            "kind": "frame" if isinstance(values, pd.DataFrame) else "series",
+            "name": values.name if isinstance(values, pd.Series) else None}
+        np.save(os.path.join(directory, name + ".npy"), np.asfortranarray(values.values))
+
+    dates = index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+    np.save(os.path.join(directory, INDEX_FILE), dates.values.astype("datetime64[ns]"))
+
+    with open(os.path.join(directory, COLUMNS_FILE), "w") as f:
+        json.dump({"labels": list(columns), "name": columns.name}, f)
+
+    # Write the metadata last, so a bundle directory is only complete once
+    # it exists
+    with open(os.path.join(directory, METADATA_FILE), "w") as f:
+        json.dump({
+            "format_version": FORMAT_VERSION,
+            "index_name": index.name,
+            "tz": str(index.tz) if index.tz is not None else None,
+            "arrays": kinds,
+            "metadata": metadata or {}}, f, indent=2)
+
+def load_bundle(directory, mmap_mode="r"):
+    """
+    Loads a bundle directory.
+
+    Parameters
+    ----------
+    directory : str, required
+        the bundle directory
+
+    mmap_mode : str or None, optional
+        memory-map the arrays with this mode (see numpy.load). Default "r"
+        (read-only). None reads the arrays into memory
+
+    Returns
+    -------
+    tuple of (dict of str: Series or DataFrame, dict)
+        the data, keyed by name, and the additional metadata
+    """
+    try:
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            bundle_metadata = json.load(f)
+    except FileNotFoundError:
+        raise MoonchartError("{0} is not a bundle directory (no {1})".format(
+            directory, METADATA_FILE))
+
+    if bundle_metadata["format_version"] > FORMAT_VERSION:
+        raise MoonchartError(
+            "bundle format version {0} is newer than this version of moonchart supports ({1})".format(
+                bundle_metadata["format_version"], FORMAT_VERSION))
+
+    index = pd.DatetimeIndex(
+        np.load(os.path.join(directory, INDEX_FILE)), name=bundle_metadata["index_name"])
+    if bundle_metadata["tz"]:
+        index = index.tz_localize("UTC").tz_convert(bundle_metadata["tz"])
+
+    with open(os.path.join(directory, COLUMNS_FILE)) as f:
+        columns = json.load(f)
+    columns = pd.Index(columns["labels"], name=columns["name"])
+
+    data = {}
+    for name, kind in bundle_metadata["arrays"].items():
+        values = np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+        if kind["kind"] == "frame":
+            data[name] = pd.DataFrame(values, index=index, columns=columns, copy=False)
+        else:
+            data[name] = pd.Series(values, index=index, name=kind["name"], copy=False)
+
+    return data, bundle_metadata["metadata"]
@@ -0,0 +1,258 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memoization of derived values with dependency tracking.
+
+A class declares its inputs with Input descriptors and its derived values
+with the cached decorator, naming the inputs and other cached values each
+one depends on:
+
+    class Performance(object):
+
+        returns = Input()
+        compound = Input()
+
+        @cached("returns", "compound")
+        def cum_returns(self):
+            return get_cum_returns(self.returns, compound=self.compound)
+
+        @cached("cum_returns")
+        def drawdowns(self):
+            return get_drawdowns(self.cum_returns)
+
+Setting an input discards the cached values that depend on it, directly or
+through other cached values, and nothing else. A LazyInput is an input
+which is loaded on first access. Modifying an input in place
+(for example, assigning to cells of a DataFrame) can't be detected; call
+clear_cache after doing so.
+
+A cached value can also declare an appender, which extends the previously
+cached value after new rows are appended to the inputs, rather than
+recomputing it from scratch (see append_to_cache):
+
+    @drawdowns.appender
+    def drawdowns(self, drawdowns, state, num_rows):
+        ...
+
+The state dict is kept with the cached value and lets the appender carry
+running totals from one append to the next; it is discarded along with the
+cached value.
+"""
+
+import pandas as pd
+
+class Input(object):
+    """
+    Descriptor for an attribute that cached values depend on. Setting the
+    attribute invalidates the dependent cached values.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+        invalidate(obj, self.name)
+
+class LazyInput(Input):
+    """
+    Input whose value is loaded on first access, by calling the named method
+    of the object with the attribute name. The method must set the attribute
+    (and may set other attributes at the same time).
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            getattr(obj, self.loader)(self.name)
+            return obj.__dict__[self.name]
+
+class cached(object):
+    """
+    Decorator for a read-only property which is computed on first access and
+    cached until an input or cached value it depends on changes.
+
+    Parameters
+    ----------
+    depends_on : str
+        names of the Input attributes and cached values the property is
+        computed from
+    """
+
+    def __init__(self, *depends_on):
+        self.depends_on = depends_on
+        self.func = None
+        self.append_func = None
+
+    def __call__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        return self
+
+    def appender(self, func):
+        """
+        Decorator for a method which, given the previously cached value, its
+        state dict, and the number of rows appended to the inputs, returns
+        the extended value.
+        """
+        self.append_func = func
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        cache = obj.__dict__.setdefault("_cache", {})
+        try:
+            return cache[self.name]
+        except KeyError:
+            pass
+        value = cache[self.name] = self.func(obj)
+        return value
+
+    def __set__(self, obj, value):
+        raise AttributeError("can't set attribute {0}".format(self.name))
+
+def get_cached_properties(cls):
+    """
+    Returns a dict of cached property names to cached descriptors for the
+    class, in the order they are defined (base classes first).
+    """
+    properties = {}
+    for klass in reversed(cls.__mro__):
+        for name, attr in vars(klass).items():
+            if isinstance(attr, cached):
+                properties[name] = attr
+    return properties
+
+def _get_dependents(cls):
+    """
+    Returns a dict mapping each input or cached value name to the set of
+    cached values that depend on it, directly or transitively. Computed
+    once per class.
+    """
+    dependents = cls.__dict__.get("_cache_dependents")
+    if dependents is not None:
+        return dependents
+
+    direct = {}
+    for name, prop in get_cached_properties(cls).items():
+        for dependency in prop.depends_on:
+            direct.setdefault(dependency, set()).add(name)
+
+    dependents = {}
+    for dependency in direct:
+        found = set()
+        pending = [dependency]
+        while pending:
+            for name in direct.get(pending.pop(), ()):
+                if name not in found:
+                    found.add(name)
+                    pending.append(name)
+        dependents[dependency] = found
+
+    setattr(cls, "_cache_dependents", dependents)
+    return dependents
+
+def invalidate(obj, name):
+    """
+    Discards the cached values of obj which depend on the named input or
+    cached value.
+    """
+    cache = obj.__dict__.get("_cache")
+    if not cache:
+        return
+    state = obj.__dict__.get("_cache_state", {})
+    for dependent in _get_dependents(type(obj)).get(name, ()):
+        cache.pop(dependent, None)
+        state.pop(dependent, None)
+
+def clear_cache(obj):
+    """
+    Discards all cached values of obj.
+    """
+    obj.__dict__.pop("_cache", None)
+    obj.__dict__.pop("_cache_state", None)
+
+def get_cache_snapshot(obj):
+    """
+    Returns a copy of the cached values and their state, to pass to
+    append_to_cache after appending rows to the inputs.
+    """
+    return (dict(obj.__dict__.get("_cache", {})),
+            dict(obj.__dict__.get("_cache_state", {})))
+
+def append_to_cache(obj, snapshot, num_rows):
+    """
+    Restores the cached values in the snapshot which were invalidated by
+    appending num_rows rows to the inputs, extending them with their
+    appenders. Values without an appender stay invalidated and are
+    recomputed on next access.
+
+    Values are extended in the order they are defined, so an appender can
+    use the (already extended) values defined before it.
+    """
+    old_cache, old_state = snapshot
+    cache = obj.__dict__.setdefault("_cache", {})
+    cache_state = obj.__dict__.setdefault("_cache_state", {})
+    for name, prop in get_cached_properties(type(obj)).items():
+        if name in cache or name not in old_cache or prop.append_func is None:
+            continue
+        state = old_state.get(name, {})
+        cache[name] = prop.append_func(obj, old_cache[name], state, num_rows)
+        cache_state[name] = state
+
+def _nbytes(value):
+    """
+    Returns the memory used by a cached value, or 0 if unknown.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True))
+    return int(getattr(value, "nbytes", 0))
+
+def get_cache_info(obj):
+    """
+    Returns a DataFrame with a row per cached property of obj, indicating
+    whether it is cached (Warm), how much memory it holds (Bytes), and what
+    it depends on (DependsOn).
+    """
+    cache = obj.__dict__.get("_cache", {})
+    properties = get_cached_properties(type(obj))
+    info = pd.DataFrame(
+        [(name in cache,
+          _nbytes(cache[name]) if name in cache else 0,
+          ", ".join(prop.depends_on))
+         for name, prop in properties.items()],
+        index=pd.Index(list(properties), name="Cache"),
+        columns=["Warm", "Bytes", "DependsOn"])
+    return info
@@ -0,0 +1,244 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+On-disk cache of parsed and derived performance data.
+
+Entries are keyed by a hash of the content of the input file and the
+parameters it was loaded with, so a cached entry is found again no matter
+where the file lives, and is never returned for a file whose content has
+changed. Entries are pickled DailyPerformance instances (including their
+cached derived values), which load much faster than the CSV parses. The
+keys also include the moonchart and pandas versions, since the pickles
+(and the derived values computed by moonchart) are only valid for the
+versions which wrote them.
+
+When the cache grows beyond its maximum size, the least recently used
+entries are evicted.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+import pandas as pd
+from . import __version__
+
+# Bump when the pickled layout of cached objects changes, so that stale
+# entries are ignored
+FORMAT_VERSION = 1
+
+# Read files in 1 MB chunks when hashing them
+CHUNK_SIZE = 1024 * 1024
+
+class DiskCache(object):
+    """
+    A directory of cached objects, evicted in least recently used order
+    when the total size exceeds max_bytes.
+
+    Parameters
+    ----------
+    directory : str, required
+        the cache directory. Created if it doesn't exist
+
+    max_bytes : int, optional
+        the maximum total size of the cache, in bytes. Default 1 GB
+
+    Examples
+    --------
+    >>> cache = DiskCache("/tmp/moonchart")
+    >>> key = cache.make_key("backtest_results.csv", riskfree=0.02)
+    >>> perf = cache.get(key)
+    >>> if perf is None:
+    ...     perf = DailyPerformance.from_moonshot_csv("backtest_results.csv", riskfree=0.02)
+    ...     cache.put(key, perf)
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory, max_bytes=1024**3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def make_key(self, filepath_or_buffer, **params):
+        """
+        Returns the key for a file loaded with the given parameters.
+
+        Parameters
+        ----------
+        filepath_or_buffer : str or file-like object, required
+            filepath or file-like object. A file-like object must be
+            seekable; its content from the current position is hashed, and
+            it is returned to that position afterwards
+
+        params : keyword arguments
+            the parameters the file is loaded with
+
+        Returns
+        -------
+        str or None
+            a hex digest, or None if the file-like object isn't seekable (in
+            which case it can't be cached)
+        """
+        digest = hashlib.sha256()
+        digest.update(repr((
+            FORMAT_VERSION, __version__, pd.__version__, sorted(params.items()))).encode())
+
+        if isinstance(filepath_or_buffer, str):
+            with open(filepath_or_buffer, "rb") as f:
+                self._hash_file(f, digest)
+        else:
+            if not filepath_or_buffer.seekable():
+                return None
+            position = filepath_or_buffer.tell()
+            self._hash_file(filepath_or_buffer, digest)
+            filepath_or_buffer.seek(position)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash_file(f, digest):
+        """
+        Updates the digest with the content of the file.
+        """
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            digest.update(chunk)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key):
+        """
+        Returns the cached object, or None if the key isn't cached.
+
+        Parameters
+        ----------
+        key : str, required
+            the key returned by make_key
+
+        Returns
+        -------
+        object or None
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # a corrupt or incompatible entry is treated as a miss
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Caches the object, then evicts least recently used entries if the
+        cache exceeds max_bytes.
+
+        Parameters
+        ----------
+        key : str, required
+            the key returned by make_key
+
+        value : object, required
+            the object to cache. Must be picklable
+
+        Returns
+        -------
+        None
+        """
+        # Write to a temporary file and rename it, so that readers never see
+        # a partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        self._evict(keep=key)
+
+    def _entries(self):
+        """
+        Returns a list of (mtime, size, path) of the cache entries, least
+        recently used first.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def _evict(self, keep=None):
+        """
+        Removes least recently used entries until the cache fits in
+        max_bytes, never removing the entry for keep.
+        """
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        keep_path = self._path(keep) if keep else None
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            self._remove(path)
+            total_bytes -= size
+
+    @property
+    def nbytes(self):
+        """
+        The total size of the cache entries, in bytes.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        """
+        Removes all cache entries.
+
+        Returns
+        -------
+        None
+        """
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -12,20 +12,178 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import weakref
 import numpy as np
 import pandas as pd
 from .exceptions import InsufficientData, MoonchartError
+from .backends import get_backend
 from .utils import (
-    get_zscores,
+    _moments,
+    _merge_moments,
+    _annualize,
+    get_max_zscore,
     trim_outliers as trim_outliers_func,
     get_sharpe,
     get_rolling_sharpe,
     get_cagr,
+    get_log_growth,
+    get_period_returns,
+    get_period_cagr,
     get_cum_returns,
-    get_drawdowns)
-
+    get_drawdowns,
+    get_drawdown_periods,
+    get_summary_stats,
+    get_benchmark_stats,
+    get_rolling_stats)
+
+from .store import FieldStore, GrowableArray, _level_codes
+from .arrowio import read_results_parquet, read_results_feather
+from .bundle import save_bundle, load_bundle
+from .rangestats import RangeStatsIndex
+from .cache import (
+    Input,
+    LazyInput,
+    cached,
+    clear_cache,
+    get_cache_info,
+    get_cache_snapshot,
+    append_to_cache)
 from quantrocket.moonshot import read_moonshot_csv, intraday_to_daily
 
+# Moonshot and PNL results fields used by DailyPerformance
+MOONSHOT_FIELDS = [
+    "Return",
+    "NetExposure",
+    "AbsExposure",
+    "TotalHoldings",
+    "Turnover",
+    "Commission",
+    "Slippage",
+    "Benchmark",
+]
+PNL_FIELDS = [
+    "Return",
+    "Pnl",
+    "NetExposure",
+    "AbsExposure",
+    "TotalHoldings",
+    "Commission",
+    "CommissionAmount",
+    "Benchmark",
+]
+# DailyPerformance attributes holding each results field
+FIELD_ATTRS = {
+    "Return": "returns",
+    "Pnl": "pnl",
+    "NetExposure": "net_exposures",
+    "AbsExposure": "abs_exposures",
+    "TotalHoldings": "total_holdings",
+    "Turnover": "turnover",
+    "Commission": "commissions",
+    "CommissionAmount": "commission_amounts",
+    "Slippage": "slippages",
+    "Benchmark": "_benchmark_prices",
+}
+# How DailyPerformance.resample combines the days of each period, by
+# attribute (returns are compounded from the cumulative returns)
+RESAMPLE_METHODS = {
+    "pnl": "sum",
+    "net_exposures": "mean",
+    "abs_exposures": "mean",
+    "total_holdings": "mean",
+    "turnover": "sum",
+    "commissions": "sum",
+    "commission_amounts": "sum",
+    "slippages": "sum",
+    "_benchmark_prices": "last",
+}
+# How IntradayPerformance.daily rolls up the bars of each day, by attribute
+# (as quantrocket.moonshot.intraday_to_daily does)
+DAILY_ROLLUP_METHODS = {
+    "returns": "sum",
+    "pnl": "sum",
+    "net_exposures": "mean",
+    "abs_exposures": "max",
+    "total_holdings": "max",
+    "turnover": "sum",
+    "commissions": "sum",
+    "commission_amounts": "sum",
+    "slippages": "sum",
+    "_benchmark_prices": "last",
+}
+# Periods per year of the resample frequencies, keyed by pandas offset alias
+# (without any anchor such as -FRI or -DEC)
+PERIODS_PER_YEAR = {
+    "W": 52,
+    "SM": 24, "SMS": 24,
+    "M": 12, "ME": 12, "MS": 12, "BM": 12, "BME": 12, "BMS": 12,
+    "Q": 4, "QE": 4, "QS": 4, "BQ": 4, "BQE": 4, "BQS": 4,
+    "A": 1, "Y": 1, "YE": 1, "AS": 1, "YS": 1, "BA": 1, "BY": 1, "BYE": 1, "BAS": 1, "BYS": 1,
+}
+# The rolling volatility, beta and correlation windows, in years (3 months,
+# 6 months and 1 year)
+ROLLING_WINDOW_YEARS = (0.25, 0.5, 1)
+
+def _as_2d(values):
+    """
+    Returns a 2-d view of the values of a Series or DataFrame.
+    """
+    return values.reshape((len(values), -1))
+
+def _price_returns(prices, baseline=None):
+    """
+    Returns the returns of a Series or DataFrame of prices. The first return
+    of each column is 0, or if there is a baseline (the price before the
+    first row, a scalar for a Series or a Series indexed by column), the
+    return of the first price from the baseline.
+    """
+    returns = prices.pct_change().fillna(0)
+    if baseline is None:
+        return returns
+    values = _as_2d(prices.values)
+    if isinstance(prices, pd.DataFrame):
+        baseline = pd.Series(baseline).reindex(prices.columns).values
+    baseline = np.asarray(baseline, dtype=np.float64).reshape(-1)
+    notnull = ~np.isnan(values)
+    has_price = notnull.any(axis=0) & ~np.isnan(baseline)
+    if not has_price.any():
+        return returns
+    columns = np.flatnonzero(has_price)
+    firsts = notnull[:, columns].argmax(axis=0)
+    seeded = _as_2d(returns.values).astype(np.float64)
+    seeded[firsts, columns] = values[firsts, columns] / baseline[columns] - 1
+    if isinstance(prices, pd.DataFrame):
+        return pd.DataFrame(seeded, index=prices.index, columns=prices.columns)
+    return pd.Series(seeded[:, 0], index=prices.index, name=prices.name)
+
+def _last_valid(values, default):
+    """
+    Returns the last non-null value in each column of a 2-d array, or the
+    default (a scalar or an array) for columns with no values.
+    """
+    notnull = ~np.isnan(values)
+    positions = len(values) - 1 - notnull[::-1].argmax(axis=0)
+    last_values = values[positions, np.arange(values.shape[1])].astype(np.float64)
+    return np.where(notnull.any(axis=0), last_values, default)
+
+def _last_valid_before(values, position, default):
+    """
+    Returns the last non-null value before the position in each column of a
+    2-d array, or the default for columns with no values. Searches backwards
+    in growing windows, so usually only the previous row is read.
+    """
+    last_values = np.full(values.shape[1], np.nan)
+    missing = np.ones(values.shape[1], dtype=bool)
+    stop = position
+    size = 1
+    while stop > 0 and missing.any():
+        start = max(stop - size, 0)
+        last_values[missing] = _last_valid(values[start:stop][:, missing], np.nan)
+        missing = np.isnan(last_values)
+        stop = start
+        size *= 2
+    return np.where(missing, default, last_values)
+
 class DailyPerformance(object):
     """
     Class representing daily performance and derived statistics.
@@ -75,8 +233,51 @@ class DailyPerformance(object):
 
     trim_outliers: int or float, optional
         discard returns that are more than this many standard deviations from the mean
+
+    warn_outliers : bool
+        if trim_outliers is not set, warn if there are returns more than 20
+        standard deviations from the mean. Set to False to skip this check,
+        for example in batch jobs (default True)
+
+    dtype : str or numpy dtype, optional
+        store the DataFrames as this dtype, for example "float32" to halve the
+        memory used by large detailed backtests. Cumulative products, sums and
+        moments are computed in float64 regardless. Default is to keep the
+        dtype of the DataFrames as passed.
+
+    log_space : bool
+        derive cum_returns from the log growth (see the log_growth property)
+        rather than from a cumulative product, which avoids underflow and
+        overflow over very long histories. The log growth is also what
+        period_returns and period_cagr use, so it is only computed once
+        (default False)
+
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize the Sharpe
+        ratio and other statistics (default 252, for daily returns)
     """
 
+    # Inputs of the cached derived values; setting one invalidates the
+    # values that depend on it
+    returns = Input()
+    pnl = Input()
+    net_exposures = Input()
+    abs_exposures = Input()
+    total_holdings = Input()
+    turnover = Input()
+    commission_amounts = Input()
+    commissions = Input()
+    slippages = Input()
+    riskfree = Input()
+    compound = Input()
+    log_space = Input()
+    rolling_sharpe_window = Input()
+    periods_per_year = Input()
+    _benchmark_prices = Input()
+    # the benchmark prices before the first row, if known (as for resampled
+    # performance), so that the first row has a benchmark return
+    _benchmark_baseline = Input()
+
     def __init__(
         self,
         returns,
@@ -92,9 +293,24 @@ class DailyPerformance(object):
         riskfree=0,
         compound=True,
         rolling_sharpe_window=200,
-        trim_outliers=None
+        trim_outliers=None,
+        warn_outliers=True,
+        dtype=None,
+        log_space=False,
+        periods_per_year=252
         ):
 
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+            returns = returns.astype(dtype, copy=False)
+            pnl, net_exposures, abs_exposures, total_holdings, turnover, \
+                commission_amounts, commissions, slippages, benchmark = [
+                    data.astype(dtype, copy=False) if data is not None else None
+                    for data in (
+                        pnl, net_exposures, abs_exposures, total_holdings, turnover,
+                        commission_amounts, commissions, slippages, benchmark)]
+        self.dtype = dtype
+
         self.returns = returns
         if len(self.returns.index) < 2:
             raise InsufficientData(
@@ -103,12 +319,9 @@ class DailyPerformance(object):
         self._trim_outliers = trim_outliers
         if trim_outliers:
             self.returns = trim_outliers_func(returns, z_score=trim_outliers)
-        else:
-            # warn the user if there are >10-sigma returns
-            z_scores = get_zscores(returns)
-            max_zscore = z_scores.abs().max()
-            if isinstance(returns, pd.DataFrame):
-                max_zscore = max_zscore.max()
+        elif warn_outliers:
+            # warn the user if there are >20-sigma returns
+            max_zscore = get_max_zscore(returns)
             if max_zscore > 20:
                 import warnings
                 warnings.warn("Found returns which are {0} standard deviations from the "
@@ -124,64 +337,92 @@ class DailyPerformance(object):
         self.slippages = slippages
         self.riskfree = riskfree
         self.compound = compound
+        self.log_space = log_space
         self.rolling_sharpe_window = rolling_sharpe_window
+        self.periods_per_year = periods_per_year
         self._benchmark_prices = benchmark
-        self._benchmark_returns = None
-        self._benchmark_cum_returns = None
-        self._cum_returns = None
-        self._cum_commissions = None
-        self._cum_slippages = None
-        self._cum_commission_amounts = None
-        self._sharpe = None
-        self._rolling_sharpe = None
-        self._cagr = None
-        self._drawdowns = None
-        self._max_drawdown = None
-        self._cum_pnl = None
+        self._benchmark_baseline = None
+        # the FieldStore the DataFrames are views of, if loaded from results
+        self._store = None
+        # Aggregate and GroupedDailyPerformances to update when rows are
+        # appended
+        self._aggregates = weakref.WeakSet()
 
     @classmethod
     def _from_moonshot(cls, results,
                        trim_outliers=None,
                        riskfree=0,
                        compound=True,
-                       rolling_sharpe_window=200):
+                       rolling_sharpe_window=200,
+                       warn_outliers=True,
+                       dtype=None,
+                       log_space=False,
+                       store=None):
         """
-        Creates a DailyPerformance instance from a moonshot backtest results DataFrame.
+        Creates a DailyPerformance instance from a moonshot backtest results
+        DataFrame, or from a FieldStore of the results (in which case results
+        is ignored).
         """
-        if "Time" in results.index.names:
-            results = intraday_to_daily(results)
+        if store is None and "Time" in results.index.names:
+            results = cls._from_intraday(results)
 
-        fields = results.index.get_level_values("Field").unique()
         kwargs = dict(
             trim_outliers=trim_outliers,
             riskfree=riskfree,
             compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space
         )
-        kwargs["returns"] = results.loc["Return"]
+
+        if store is None:
+            store = FieldStore.from_results(results, fields=MOONSHOT_FIELDS, dtype=dtype)
+        if store is not None:
+            fields = store.fields
+            get_field = store.frame
+        else:
+            fields = results.index.get_level_values("Field").unique()
+            get_field = results.loc.__getitem__
+
+        kwargs["returns"] = get_field("Return")
         if "NetExposure" in fields:
-            kwargs["net_exposures"] = results.loc["NetExposure"]
+            kwargs["net_exposures"] = get_field("NetExposure")
         if "AbsExposure" in fields:
-            kwargs["abs_exposures"] = results.loc["AbsExposure"]
+            kwargs["abs_exposures"] = get_field("AbsExposure")
         if "TotalHoldings" in fields:
-            kwargs["total_holdings"] = results.loc["TotalHoldings"]
+            kwargs["total_holdings"] = get_field("TotalHoldings")
         if "Turnover" in fields:
-            kwargs["turnover"] = results.loc["Turnover"]
+            kwargs["turnover"] = get_field("Turnover")
         if "Commission" in fields:
-            kwargs["commissions"] = results.loc["Commission"]
+            kwargs["commissions"] = get_field("Commission")
         if "Slippage" in fields:
-            kwargs["slippages"] = results.loc["Slippage"]
+            kwargs["slippages"] = get_field("Slippage")
         if "Benchmark" in fields:
-            kwargs["benchmark"] = results.loc["Benchmark"]
+            kwargs["benchmark"] = get_field("Benchmark")
 
-        return cls(**kwargs)
+        performance = cls(**kwargs)
+        performance._store = store
+        return performance
+
+    @staticmethod
+    def _from_intraday(results):
+        """
+        Converts intraday results with a (Field, Date, Time) MultiIndex to
+        the periods of this class, by rolling them up to daily.
+        """
+        return intraday_to_daily(results)
 
     @classmethod
     def from_moonshot_csv(cls, filepath_or_buffer,
                           trim_outliers=None,
                           riskfree=0,
                           compound=True,
-                          rolling_sharpe_window=200):
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False,
+                          chunksize=None):
         """
         Creates a DailyPerformance instance from a Moonshot backtest results CSV.
 
@@ -204,6 +445,27 @@ class DailyPerformance(object):
         rolling_sharpe_window : int, optional
             compute rolling Sharpe over this many periods (default 200)
 
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
+
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests. Default is the dtype
+            inferred by the CSV parser
+
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
+
+        chunksize : int, optional
+            read the CSV this many rows at a time, keeping only the fields
+            DailyPerformance uses, so that peak memory stays close to the size
+            of those fields even for detailed backtests whose CSV doesn't fit
+            in memory. The CSV is read twice (once to count dates), and must
+            contain daily results whose fields share the same dates. Default
+            is to read the whole CSV at once
+
         Returns
         -------
         DailyPerformance
@@ -214,7 +476,25 @@ class DailyPerformance(object):
 
         >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
         >>> perf.cum_returns.plot()
+
+        Load a large detailed backtest 1 million rows at a time:
+
+        >>> perf = DailyPerformance.from_moonshot_csv(
+        ...     "detailed_backtest_results.csv", chunksize=1000000)
         """
+        if chunksize:
+            store = FieldStore.from_csv(
+                filepath_or_buffer, fields=MOONSHOT_FIELDS, chunksize=chunksize, dtype=dtype)
+            return cls._from_moonshot(
+                None, trim_outliers=trim_outliers,
+                riskfree=riskfree,
+                compound=compound,
+                rolling_sharpe_window=rolling_sharpe_window,
+                warn_outliers=warn_outliers,
+                dtype=dtype,
+                log_space=log_space,
+                store=store)
+
         try:
             results = read_moonshot_csv(filepath_or_buffer)
         except ValueError as e:
@@ -232,21 +512,34 @@ class DailyPerformance(object):
             results, trim_outliers=trim_outliers,
             riskfree=riskfree,
             compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window)
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
 
     @classmethod
-    def from_pnl_csv(cls, filepath_or_buffer,
+    def from_moonshot_parquet(cls, filepath,
+                          columns=None,
                           trim_outliers=None,
                           riskfree=0,
                           compound=True,
-                          rolling_sharpe_window=200):
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False):
         """
-        Creates a DailyPerformance instance from a PNL CSV.
+        Creates a DailyPerformance instance from a Moonshot backtest results Parquet
+        file in the same long (Field, Date[, Time]) layout as the CSV (see
+        moonchart.arrowio.write_results_parquet). Only the fields used by
+        DailyPerformance are read.
 
         Parameters
         ----------
-        filepath_or_buffer : str or file-like object
-            filepath or file-like object of the CSV
+        filepath : str, required
+            path of the Parquet file
+
+        columns : list of str, optional
+            only load these strategy or security columns. Default is all columns
 
         trim_outliers: int or float, optional
             discard returns that are more than this many standard deviations from the mean
@@ -260,253 +553,2113 @@ class DailyPerformance(object):
         rolling_sharpe_window : int, optional
             compute rolling Sharpe over this many periods (default 200)
 
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
+
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests (default the dtype of the file)
+
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
+
         Returns
         -------
         DailyPerformance
 
         Examples
         --------
-        Plot cumulative returns:
+        Plot cumulative returns of two strategies:
 
-        >>> perf = DailyPerformance.from_pnl_csv("pnl.csv")
+        >>> perf = DailyPerformance.from_moonshot_parquet(
+        ...     "backtest_results.parquet", columns=["strategy-a", "strategy-b"])
         >>> perf.cum_returns.plot()
         """
-        results = read_moonshot_csv(filepath_or_buffer)
+        results = read_results_parquet(filepath, fields=MOONSHOT_FIELDS, columns=columns)
 
-        return cls._from_pnl(
+        return cls._from_moonshot(
             results, trim_outliers=trim_outliers,
             riskfree=riskfree,
             compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window)
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
 
     @classmethod
-    def _from_pnl(cls, results,
-                  trim_outliers=None,
-                  riskfree=0,
-                  compound=True,
-                  rolling_sharpe_window=200):
-        """
-        Creates a DailyPerformance instance from a PNL results DataFrame.
+    def from_moonshot_feather(cls, filepath,
+                          columns=None,
+                          trim_outliers=None,
+                          riskfree=0,
+                          compound=True,
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False):
         """
-        fields = results.index.get_level_values("Field").unique()
-        kwargs = dict(
-            trim_outliers=trim_outliers,
-            riskfree=riskfree,
-            compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window
-        )
-        kwargs["returns"] = results.loc["Return"].astype(np.float64)
-        kwargs["pnl"] = results.loc["Pnl"].astype(np.float64)
-        if "NetExposure" in fields:
-            kwargs["net_exposures"] = results.loc["NetExposure"].astype(np.float64)
-        if "AbsExposure" in fields:
-            kwargs["abs_exposures"] = results.loc["AbsExposure"].astype(np.float64)
-        if "TotalHoldings" in fields:
-            kwargs["total_holdings"] = results.loc["TotalHoldings"].astype(np.float64)
-        if "Commission" in fields:
-            kwargs["commissions"] = results.loc["Commission"].astype(np.float64)
-        if "CommissionAmount" in fields:
-            kwargs["commission_amounts"] = results.loc["CommissionAmount"].astype(np.float64)
-        if "Benchmark" in fields:
-            kwargs["benchmark"] = results.loc["Benchmark"].astype(np.float64)
+        Creates a DailyPerformance instance from a Moonshot backtest results Feather
+        file in the same long (Field, Date[, Time]) layout as the CSV (see
+        moonchart.arrowio.write_results_feather). Only the fields used by
+        DailyPerformance are read.
 
-        return cls(**kwargs)
+        Parameters
+        ----------
+        filepath : str, required
+            path of the Feather file
 
-    @property
-    def cum_returns(self):
+        columns : list of str, optional
+            only load these strategy or security columns. Default is all columns
 
-        if self._cum_returns is None:
-            self._cum_returns = get_cum_returns(self.returns, compound=self.compound)
+        trim_outliers: int or float, optional
+            discard returns that are more than this many standard deviations from the mean
 
-        return self._cum_returns
+        riskfree : float, optional
+            the riskfree rate (default 0)
 
-    @property
-    def cum_commissions(self):
+        compound : bool
+             True for compound/geometric returns, False for arithmetic returns (default True)
 
-        if self._cum_commissions is None and self.commissions is not None:
-            self._cum_commissions = get_cum_returns(self.commissions, compound=False)
+        rolling_sharpe_window : int, optional
+            compute rolling Sharpe over this many periods (default 200)
 
-        return self._cum_commissions
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
 
-    @property
-    def cum_commission_amounts(self):
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests (default the dtype of the file)
 
-        if self._cum_commission_amounts is None and self.commission_amounts is not None:
-            self._cum_commission_amounts = self.commission_amounts.cumsum()
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
 
-        return self._cum_commission_amounts
+        Returns
+        -------
+        DailyPerformance
 
-    @property
-    def cum_slippages(self):
+        Examples
+        --------
+        Plot cumulative returns of two strategies:
 
-        if self._cum_slippages is None and self.slippages is not None:
-            self._cum_slippages = get_cum_returns(self.slippages, compound=False)
+        >>> perf = DailyPerformance.from_moonshot_feather(
+        ...     "backtest_results.feather", columns=["strategy-a", "strategy-b"])
+        >>> perf.cum_returns.plot()
+        """
+        results = read_results_feather(filepath, fields=MOONSHOT_FIELDS, columns=columns)
 
-        return self._cum_slippages
+        return cls._from_moonshot(
+            results, trim_outliers=trim_outliers,
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
 
-    @property
-    def cagr(self):
-        if self._cagr is None:
-            self._cagr = get_cagr(self.cum_returns, compound=self.compound)
+    @classmethod
+    def from_pnl_csv(cls, filepath_or_buffer,
+                          trim_outliers=None,
+                          riskfree=0,
+                          compound=True,
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False):
+        """
+        Creates a DailyPerformance instance from a PNL CSV.
 
-        return self._cagr
+        Parameters
+        ----------
+        filepath_or_buffer : str or file-like object
+            filepath or file-like object of the CSV
 
-    @property
-    def sharpe(self):
-        if self._sharpe is None:
-            self._sharpe = get_sharpe(self.returns, riskfree=self.riskfree)
+        trim_outliers: int or float, optional
+            discard returns that are more than this many standard deviations from the mean
 
-        return self._sharpe
+        riskfree : float, optional
+            the riskfree rate (default 0)
 
-    @property
-    def rolling_sharpe(self):
-        if self._rolling_sharpe is None:
-            self._rolling_sharpe = get_rolling_sharpe(
-                self.returns,
-                window=self.rolling_sharpe_window,
-                riskfree=self.riskfree)
+        compound : bool
+             True for compound/geometric returns, False for arithmetic returns (default True)
 
-        return self._rolling_sharpe
+        rolling_sharpe_window : int, optional
+            compute rolling Sharpe over this many periods (default 200)
 
-    @property
-    def drawdowns(self):
-        if self._drawdowns is None:
-            self._drawdowns = get_drawdowns(self.cum_returns)
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
 
-        return self._drawdowns
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests (default float64)
 
-    @property
-    def max_drawdown(self):
-        return self.drawdowns.min()
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
 
-    @property
-    def cum_pnl(self):
-        if self._cum_pnl is None and self.pnl is not None:
-            self._cum_pnl = self.pnl.cumsum()
+        Returns
+        -------
+        DailyPerformance
 
-        return self._cum_pnl
+        Examples
+        --------
+        Plot cumulative returns:
 
-    @property
-    def benchmark_returns(self):
-        """
-        Returns a Series of benchmark returns from the DataFrame of benchmark
-        prices, if any. If more than one strategy/column has benchmark
-        prices, uses the first to compute returns.
+        >>> perf = DailyPerformance.from_pnl_csv("pnl.csv")
+        >>> perf.cum_returns.plot()
         """
-        if self._benchmark_returns is not None:
-            return self._benchmark_returns
+        results = read_moonshot_csv(filepath_or_buffer)
 
-        if self._benchmark_prices is None:
-            return None
+        return cls._from_pnl(
+            results, trim_outliers=trim_outliers,
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
 
-        have_benchmarks = self._benchmark_prices.notnull().any(axis=0)
-        have_benchmarks = have_benchmarks[have_benchmarks]
-        if have_benchmarks.empty:
-            return None
+    @classmethod
+    def from_pnl_parquet(cls, filepath,
+                          columns=None,
+                          trim_outliers=None,
+                          riskfree=0,
+                          compound=True,
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False):
+        """
+        Creates a DailyPerformance instance from a PNL results Parquet
+        file in the same long (Field, Date[, Time]) layout as the CSV (see
+        moonchart.arrowio.write_results_parquet). Only the fields used by
+        DailyPerformance are read.
 
-        col = have_benchmarks.index[0]
-        if len(have_benchmarks.index) > 1:
-            import warnings
-            warnings.warn("Multiple benchmarks found, only using first ({0})".format(col))
+        Parameters
+        ----------
+        filepath : str, required
+            path of the Parquet file
 
-        benchmark_prices = self._benchmark_prices[col]
+        columns : list of str, optional
+            only load these strategy or security columns. Default is all columns
 
-        self._benchmark_returns = benchmark_prices.pct_change().fillna(0)
-        self._benchmark_returns.name = "benchmark"
+        trim_outliers: int or float, optional
+            discard returns that are more than this many standard deviations from the mean
 
-        return self._benchmark_returns
+        riskfree : float, optional
+            the riskfree rate (default 0)
 
-    @property
-    def benchmark_cum_returns(self):
+        compound : bool
+             True for compound/geometric returns, False for arithmetic returns (default True)
 
-        if self._benchmark_cum_returns is None and self._benchmark_returns is not None:
-            self._benchmark_cum_returns = get_cum_returns(self._benchmark_returns, compound=True)
+        rolling_sharpe_window : int, optional
+            compute rolling Sharpe over this many periods (default 200)
 
-        return self._benchmark_cum_returns
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
 
-class AggregateDailyPerformance(DailyPerformance):
-    """
-    Class representing aggregate daily performance.
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests (default float64)
 
-    Given a DailyPerformance instance containing multi-column (that is,
-    multi-strategy or detailed single-strategy) DataFrames, this class
-    represents the aggregate performance.
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
 
-    Parameters
-    ----------
-    performance : DailyPerformance, required
-        daily performance results to aggregate
+        Returns
+        -------
+        DailyPerformance
 
-    trim_outliers: int or float, optional
-        discard returns that are more than this many standard deviations from the mean
-        (copied from DailyPerformance if omitted)
+        Examples
+        --------
+        Plot cumulative returns of two strategies:
 
-    riskfree : float, optional
-        the riskfree rate (copied from DailyPerformance if omitted)
+        >>> perf = DailyPerformance.from_pnl_parquet(
+        ...     "pnl.parquet", columns=["strategy-a", "strategy-b"])
+        >>> perf.cum_returns.plot()
+        """
+        results = read_results_parquet(filepath, fields=PNL_FIELDS, columns=columns)
 
-    compound : bool
-         True for compound/geometric returns, False for arithmetic returns (copied from
-         DailyPerformance if omitted)
+        return cls._from_pnl(
+            results, trim_outliers=trim_outliers,
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
 
-    rolling_sharpe_window : int, optional
-        compute rolling Sharpe over this many periods (copied from DailyPerformance if
-        omitted)
+    @classmethod
+    def from_pnl_feather(cls, filepath,
+                          columns=None,
+                          trim_outliers=None,
+                          riskfree=0,
+                          compound=True,
+                          rolling_sharpe_window=200,
+                          warn_outliers=True,
+                          dtype=None,
+                          log_space=False):
+        """
+        Creates a DailyPerformance instance from a PNL results Feather
+        file in the same long (Field, Date[, Time]) layout as the CSV (see
+        moonchart.arrowio.write_results_feather). Only the fields used by
+        DailyPerformance are read.
 
-    Returns
-    -------
-    AggregatePerformance
+        Parameters
+        ----------
+        filepath : str, required
+            path of the Feather file
 
-    Examples
-    --------
-    Plot aggregate cumulative returns:
+        columns : list of str, optional
+            only load these strategy or security columns. Default is all columns
 
-    >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
-    >>> agg_perf = AggregateDailyPerformance(perf)
-    >>> agg_perf.cum_returns.plot()
-    """
+        trim_outliers: int or float, optional
+            discard returns that are more than this many standard deviations from the mean
 
-    def __init__(self, performance, riskfree=None,
-                 compound=None,
-                 rolling_sharpe_window=None,
-                 trim_outliers=None):
+        riskfree : float, optional
+            the riskfree rate (default 0)
 
-        if riskfree is None:
-            riskfree = performance.riskfree
-        if compound is None:
-            compound = performance.compound
-        if rolling_sharpe_window is None:
-            rolling_sharpe_window = performance.rolling_sharpe_window
-        if trim_outliers is None:
-            trim_outliers = performance._trim_outliers
+        compound : bool
+             True for compound/geometric returns, False for arithmetic returns (default True)
 
-        super(AggregateDailyPerformance, self).__init__(
-            performance.returns.sum(axis=1),
-            riskfree=riskfree,
-            compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window,
-            benchmark=performance._benchmark_prices,
-            trim_outliers=trim_outliers
-        )
-        if performance.pnl is not None:
-            self.pnl = performance.pnl.sum(axis=1)
+        rolling_sharpe_window : int, optional
+            compute rolling Sharpe over this many periods (default 200)
 
-        if performance.commission_amounts is not None:
-            self.commission_amounts = performance.commission_amounts.sum(axis=1)
+        warn_outliers : bool
+            if trim_outliers is not set, warn if there are returns more than 20
+            standard deviations from the mean (default True)
 
-        if performance.commissions is not None:
-            self.commissions = performance.commissions.sum(axis=1)
+        dtype : str or numpy dtype, optional
+            store the results as this dtype, for example "float32" to halve
+            memory usage for large detailed backtests (default float64)
 
-        if performance.slippages is not None:
-            self.slippages = performance.slippages.sum(axis=1)
+        log_space : bool
+            derive cumulative returns from the log growth rather than from a
+            cumulative product (default False)
 
-        if performance.net_exposures is not None:
-            self.net_exposures = performance.net_exposures.sum(axis=1)
+        Returns
+        -------
+        DailyPerformance
 
-        if performance.abs_exposures is not None:
-            self.abs_exposures = performance.abs_exposures.sum(axis=1)
+        Examples
+        --------
+        Plot cumulative returns of two strategies:
 
-        if performance.total_holdings is not None:
-            self.total_holdings = performance.total_holdings.sum(axis=1)
+        >>> perf = DailyPerformance.from_pnl_feather(
+        ...     "pnl.feather", columns=["strategy-a", "strategy-b"])
+        >>> perf.cum_returns.plot()
+        """
+        results = read_results_feather(filepath, fields=PNL_FIELDS, columns=columns)
+
+        return cls._from_pnl(
+            results, trim_outliers=trim_outliers,
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            dtype=dtype,
+            log_space=log_space)
+
+    @classmethod
+    def _from_pnl(cls, results,
+                  trim_outliers=None,
+                  riskfree=0,
+                  compound=True,
+                  rolling_sharpe_window=200,
+                  warn_outliers=True,
+                  dtype=None,
+                  log_space=False):
+        """
+        Creates a DailyPerformance instance from a PNL results DataFrame.
+        """
+        kwargs = dict(
+            trim_outliers=trim_outliers,
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            warn_outliers=warn_outliers,
+            # the pnl CSV has mixed fields, so the parser can't infer numeric dtypes
+            dtype=dtype or np.float64,
+            log_space=log_space
+        )
+
+        store = FieldStore.from_results(results, fields=PNL_FIELDS, dtype=dtype or np.float64)
+        if store is not None:
+            fields = store.fields
+            get_field = store.frame
+        else:
+            fields = results.index.get_level_values("Field").unique()
+            get_field = results.loc.__getitem__
+
+        kwargs["returns"] = get_field("Return")
+        kwargs["pnl"] = get_field("Pnl")
+        if "NetExposure" in fields:
+            kwargs["net_exposures"] = get_field("NetExposure")
+        if "AbsExposure" in fields:
+            kwargs["abs_exposures"] = get_field("AbsExposure")
+        if "TotalHoldings" in fields:
+            kwargs["total_holdings"] = get_field("TotalHoldings")
+        if "Commission" in fields:
+            kwargs["commissions"] = get_field("Commission")
+        if "CommissionAmount" in fields:
+            kwargs["commission_amounts"] = get_field("CommissionAmount")
+        if "Benchmark" in fields:
+            kwargs["benchmark"] = get_field("Benchmark")
+
+        performance = cls(**kwargs)
+        performance._store = store
+        return performance
+
+    def save(self, directory):
+        """
+        Saves the performance data to a bundle directory, with one .npy file
+        per field, which DailyPerformance.load can memory-map.
+
+        Only the data and parameters are saved, not the derived statistics.
+        Fields whose dates differ from the returns are reindexed to the
+        returns.
+
+        Parameters
+        ----------
+        directory : str, required
+            the bundle directory. Created if it doesn't exist; existing
+            files are overwritten
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        Convert a CSV to a bundle:
+
+        >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
+        >>> perf.save("backtest_results")
+        """
+        index = self.returns.index
+        data = {}
+        for attr in FIELD_ATTRS.values():
+            values = getattr(self, attr)
+            if values is None:
+                continue
+            if not values.index.equals(index):
+                values = values.reindex(index)
+            data[attr.lstrip("_")] = values
+
+        columns = self.returns.columns if isinstance(self.returns, pd.DataFrame) else pd.Index([])
+        benchmark_baseline = None
+        if self._benchmark_baseline is not None and self._benchmark_prices is not None:
+            # in the order of the saved benchmark prices' columns
+            benchmark_baseline = [
+                None if np.isnan(price) else float(price)
+                for price in self._benchmark_baseline.reindex(self._benchmark_prices.columns)]
+        save_bundle(directory, data, index, columns, metadata=dict(
+            riskfree=self.riskfree,
+            compound=self.compound,
+            rolling_sharpe_window=self.rolling_sharpe_window,
+            trim_outliers=self._trim_outliers,
+            log_space=self.log_space,
+            periods_per_year=self.periods_per_year,
+            benchmark_baseline=benchmark_baseline))
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """
+        Loads performance data saved with DailyPerformance.save.
+
+        By default the fields are memory-mapped read-only rather than read
+        into memory, so loading takes about the same time regardless of the
+        size of the bundle, and processes which load the same bundle (for
+        example to render tear sheets in parallel) share one copy of the data
+        in the page cache.
+
+        Parameters
+        ----------
+        directory : str, required
+            the bundle directory
+
+        mmap_mode : str or None, optional
+            memory-map the fields with this mode (see numpy.load). Default
+            "r" (read-only). None reads the fields into memory
+
+        Returns
+        -------
+        DailyPerformance
+
+        Examples
+        --------
+        >>> perf = DailyPerformance.load("backtest_results")
+        >>> perf.cum_returns.plot()
+        """
+        data, metadata = load_bundle(directory, mmap_mode=mmap_mode)
+        kwargs = dict(
+            (attr.lstrip("_"), data[attr.lstrip("_")])
+            for attr in FIELD_ATTRS.values() if attr.lstrip("_") in data)
+        kwargs["benchmark"] = kwargs.pop("benchmark_prices", None)
+
+        performance = cls(
+            riskfree=metadata["riskfree"],
+            compound=metadata["compound"],
+            rolling_sharpe_window=metadata["rolling_sharpe_window"],
+            log_space=metadata["log_space"],
+            # bundles saved by earlier versions are daily
+            periods_per_year=metadata.get("periods_per_year", 252),
+            # the saved returns were already trimmed and checked for
+            # outliers, and checking would read the whole file
+            warn_outliers=False,
+            **kwargs)
+        performance._trim_outliers = metadata["trim_outliers"]
+        if metadata.get("benchmark_baseline") is not None:
+            performance._benchmark_baseline = pd.Series(
+                metadata["benchmark_baseline"], index=performance._benchmark_prices.columns,
+                dtype=np.float64)
+        return performance
+
+    def _accumulate(self, data, method, **kwargs):
+        """
+        Calls a pandas accumulation or reduction method (such as cumsum or
+        sum) on the data upcast to float64, then casts the result back to
+        the storage dtype, so that float32 storage doesn't lose precision
+        in long sums.
+        """
+        result = getattr(data.astype(np.float64, copy=False), method)(**kwargs)
+        if self.dtype is not None:
+            result = result.astype(self.dtype, copy=False)
+        return result
+
+    def _extend(self, value, new_values, state, num_rows, new_index=None):
+        """
+        Appends rows to a cached Series or DataFrame. The values are kept in a
+        growable buffer in the cache state, so earlier rows aren't copied on
+        each append.
+        """
+        buffer = state.get("buffer")
+        if buffer is None:
+            buffer = state["buffer"] = GrowableArray(_as_2d(value.values))
+        buffer.append(_as_2d(new_values).astype(buffer.values.dtype, copy=False))
+        if new_index is None:
+            new_index = self.returns.index[-num_rows:]
+        index = value.index.append(new_index.rename(value.index.name))
+        if isinstance(value, pd.DataFrame):
+            return pd.DataFrame(buffer.values, index=index, columns=value.columns, copy=False)
+        return pd.Series(buffer.values[:, 0], index=index, name=value.name)
+
+    def _append_cum_returns(self, cum_returns, state, data, num_rows, compound=True):
+        """
+        Extends the cumulative returns of data with its last num_rows rows,
+        carrying forward each column's running product (or sum).
+        """
+        totals = state.get("totals")
+        if totals is None:
+            totals = _last_valid(_as_2d(cum_returns.values), 1)
+            if not compound:
+                totals -= 1
+        new_cum_returns = get_backend().cum_returns(
+            _as_2d(data.values[-num_rows:]), compound=compound, initial=totals)
+        last_values = _last_valid(new_cum_returns, np.nan)
+        if not compound:
+            last_values -= 1
+        state["totals"] = np.where(np.isnan(last_values), totals, last_values)
+        return self._extend(cum_returns, new_cum_returns, state, num_rows, data.index[-num_rows:])
+
+    def _append_cumsum(self, cumsum, state, data, num_rows):
+        """
+        Extends the cumulative sum of data (as computed with _accumulate) with
+        its last num_rows rows.
+        """
+        totals = state.get("totals")
+        if totals is None:
+            totals = _last_valid(_as_2d(cumsum.values), 0)
+        new_values = _as_2d(data.values[-num_rows:])
+        isnull = np.isnan(new_values)
+        # prepending the totals adds in the same order as a full cumsum
+        new_cumsum = np.concatenate(
+            (totals.reshape((1, -1)), np.where(isnull, 0, new_values))).cumsum(
+                axis=0, dtype=np.float64)[1:]
+        state["totals"] = new_cumsum[-1]
+        new_cumsum[isnull] = np.nan
+        return self._extend(cumsum, new_cumsum, state, num_rows, data.index[-num_rows:])
+
+    @cached("returns", "compound")
+    def log_growth(self):
+        """
+        Returns the cumulative growth in log space, that is, the running sum
+        of log(1 + return), or the running sum of returns if compound is
+        False. Null returns contribute no growth. Always float64.
+        """
+        return get_log_growth(self.returns, compound=self.compound)
+
+    @log_growth.appender
+    def log_growth(self, log_growth, state, num_rows):
+        new_log_growth = get_backend().log_growth(
+            _as_2d(self.returns.values[-num_rows:]),
+            compound=self.compound,
+            initial=_as_2d(log_growth.values)[-1])
+        return self._extend(log_growth, new_log_growth, state, num_rows)
+
+    @cached("returns", "compound", "log_space")
+    def cum_returns(self):
+
+        if not self.log_space:
+            return get_cum_returns(self.returns, compound=self.compound)
+
+        if self.compound:
+            cum_returns = np.exp(self.log_growth)
+        else:
+            cum_returns = self.log_growth + 1
+        cum_returns = cum_returns.where(self.returns.notnull().values)
+        if self.dtype is not None:
+            cum_returns = cum_returns.astype(self.dtype)
+        return cum_returns
+
+    @cum_returns.appender
+    def cum_returns(self, cum_returns, state, num_rows):
+
+        if not self.log_space:
+            return self._append_cum_returns(
+                cum_returns, state, self.returns, num_rows, compound=self.compound)
+
+        new_log_growth = _as_2d(self.log_growth.values[-num_rows:])
+        if self.compound:
+            new_cum_returns = np.exp(new_log_growth)
+        else:
+            new_cum_returns = new_log_growth + 1
+        new_cum_returns[np.isnan(_as_2d(self.returns.values[-num_rows:]))] = np.nan
+        return self._extend(cum_returns, new_cum_returns, state, num_rows)
+
+    def period_returns(self, start=None, end=None):
+        """
+        Returns the cumulative return between two dates (inclusive),
+        computed from the log growth in constant time.
+
+        Parameters
+        ----------
+        start : str or datetime, optional
+            the first date of the period. Default is the first date
+
+        end : str or datetime, optional
+            the last date of the period. Default is the last date
+
+        Returns
+        -------
+        float or Series of floats
+
+        Examples
+        --------
+        >>> perf.period_returns("2019-01-01", "2019-06-30")
+        """
+        return get_period_returns(self.log_growth, start=start, end=end, compound=self.compound)
+
+    def period_cagr(self, start=None, end=None):
+        """
+        Returns the CAGR between two dates (inclusive), computed from the log
+        growth in constant time.
+
+        Parameters
+        ----------
+        start : str or datetime, optional
+            the first date of the period. Default is the first date
+
+        end : str or datetime, optional
+            the last date of the period. Default is the last date
+
+        Returns
+        -------
+        float or Series of floats
+
+        Examples
+        --------
+        >>> perf.period_cagr(start="2015-01-01")
+        """
+        return get_period_cagr(self.log_growth, start=start, end=end, compound=self.compound)
+
+    @cached("returns", "compound", "log_growth")
+    def range_stats(self):
+        """
+        Returns an index of the returns for computing statistics over many
+        date windows without revisiting the returns (see window_stats).
+        Built on first access, which takes about as long as computing the
+        statistics once.
+        """
+        return RangeStatsIndex(self.returns, self.log_growth, compound=self.compound)
+
+    def window_stats(self, starts, ends):
+        """
+        Returns the CAGR, Sharpe, annual volatility and max drawdown over
+        each of many date windows (inclusive), using the range_stats index.
+
+        CAGR, Sharpe and annual volatility take constant time per window
+        regardless of its length, and max drawdown logarithmic time. The
+        statistics are the same as those of the performance between the
+        window's dates (see between), with CAGR as computed by period_cagr.
+        Max drawdown is only available for compound returns.
+
+        Parameters
+        ----------
+        starts : list of str or datetime, required
+            the first date of each window. None means the first date
+
+        ends : list of str or datetime, required
+            the last date of each window. None means the last date
+
+        Returns
+        -------
+        DataFrame
+            a row per window (and column), indexed by Start and End (and
+            column), and a column per statistic
+
+        Examples
+        --------
+        Statistics for each calendar year:
+
+        >>> years = range(2010, 2020)
+        >>> perf.window_stats(
+        ...     ["{0}-01-01".format(year) for year in years],
+        ...     ["{0}-12-31".format(year) for year in years])
+        """
+        return self.range_stats.query(
+            starts, ends, riskfree=self.riskfree, periods_per_year=self.periods_per_year)
+
+    def between(self, start=None, end=None):
+        """
+        Returns the performance between two dates (inclusive), as a view of
+        this performance rather than a copy.
+
+        The fields of the view are slices of the fields of this performance,
+        made on first access, so they share memory with it. The cumulative
+        returns, log growth, and cumulative costs and pnl are rebased from
+        the cached values of this performance (computing them if needed)
+        rather than recomputed, so taking many sub-periods of the same
+        performance only accumulates once. Drawdowns are computed from the
+        rebased cumulative returns, and the other statistics, such as sharpe,
+        over the fields of the sub-period.
+
+        perf.loc[start:end] is the same as perf.between(start, end).
+
+        Parameters
+        ----------
+        start : str or datetime, optional
+            the first date of the period. Default is the first date
+
+        end : str or datetime, optional
+            the last date of the period. Default is the last date
+
+        Returns
+        -------
+        DailyPerformance
+
+        Examples
+        --------
+        Compare the Sharpe ratios before and after 2020:
+
+        >>> perf.between(end="2019-12-31").sharpe
+        >>> perf.loc["2020-01-01":].sharpe
+        """
+        return DailyPerformanceView(self, start, end)
+
+    @property
+    def loc(self):
+        """
+        Date-range views of the performance, for example
+        perf.loc["2019-01-01":"2019-12-31"] (see between).
+        """
+        return _PerformanceIndexer(self)
+
+    @cached("commissions")
+    def cum_commissions(self):
+
+        if self.commissions is not None:
+            return get_cum_returns(self.commissions, compound=False)
+
+    @cum_commissions.appender
+    def cum_commissions(self, cum_commissions, state, num_rows):
+        return self._append_cum_returns(
+            cum_commissions, state, self.commissions, num_rows, compound=False)
+
+    @cached("commission_amounts")
+    def cum_commission_amounts(self):
+
+        if self.commission_amounts is not None:
+            return self._accumulate(self.commission_amounts, "cumsum")
+
+    @cum_commission_amounts.appender
+    def cum_commission_amounts(self, cum_commission_amounts, state, num_rows):
+        return self._append_cumsum(
+            cum_commission_amounts, state, self.commission_amounts, num_rows)
+
+    @cached("slippages")
+    def cum_slippages(self):
+
+        if self.slippages is not None:
+            return get_cum_returns(self.slippages, compound=False)
+
+    @cum_slippages.appender
+    def cum_slippages(self, cum_slippages, state, num_rows):
+        return self._append_cum_returns(
+            cum_slippages, state, self.slippages, num_rows, compound=False)
+
+    @cached("cum_returns", "compound")
+    def cagr(self):
+        return get_cagr(self.cum_returns, compound=self.compound)
+
+    @cagr.appender
+    def cagr(self, cagr, state, num_rows):
+
+        # Carry forward the dates of each column's first and last
+        # cumulative return and the last cumulative return
+        cum_returns = _as_2d(self.cum_returns.values)
+        dates = self.cum_returns.index.values
+        columns = np.arange(cum_returns.shape[1])
+
+        def first_and_last(values):
+            notnull = ~np.isnan(values)
+            first_positions = notnull.argmax(axis=0)
+            last_positions = len(values) - 1 - notnull[::-1].argmax(axis=0)
+            return notnull.any(axis=0), first_positions, last_positions
+
+        if "ending_values" not in state:
+            old_cum_returns = cum_returns[:-num_rows]
+            has_values, first_positions, last_positions = first_and_last(old_cum_returns)
+            state["first_dates"] = np.where(
+                has_values, dates[first_positions], np.datetime64("NaT"))
+            state["last_dates"] = np.where(
+                has_values, dates[last_positions], np.datetime64("NaT"))
+            state["ending_values"] = np.where(
+                has_values, old_cum_returns[last_positions, columns], np.nan)
+
+        new_cum_returns = cum_returns[-num_rows:]
+        new_dates = dates[-num_rows:]
+        has_values, first_positions, last_positions = first_and_last(new_cum_returns)
+        first_dates = state["first_dates"]
+        state["first_dates"] = first_dates = np.where(
+            np.isnat(first_dates) & has_values, new_dates[first_positions], first_dates)
+        state["last_dates"] = last_dates = np.where(
+            has_values, new_dates[last_positions], state["last_dates"])
+        state["ending_values"] = ending_values = np.where(
+            has_values, new_cum_returns[last_positions, columns], state["ending_values"])
+
+        is_empty = np.isnat(first_dates)
+        days = np.where(is_empty, 0, (last_dates - first_dates).astype("timedelta64[D]").astype(np.int64))
+        new_cagr = np.where(is_empty, 0, _annualize(ending_values, days, compound=self.compound))
+        if isinstance(cagr, pd.Series):
+            return pd.Series(new_cagr, index=cagr.index)
+        return new_cagr[0]
+
+    @cached("returns", "riskfree", "periods_per_year")
+    def sharpe(self):
+        return get_sharpe(
+            self.returns, riskfree=self.riskfree, periods_per_year=self.periods_per_year)
+
+    @sharpe.appender
+    def sharpe(self, sharpe, state, num_rows):
+
+        # Carry forward the count, mean, and squared deviations
+        returns = _as_2d(self.returns.values)
+        moments = state.get("moments")
+        if moments is None:
+            moments = _moments(returns[:-num_rows])
+        state["moments"] = counts, means, sq_deviations = _merge_moments(
+            moments, _moments(returns[-num_rows:]))
+
+        excess_means = means - self.riskfree
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stds = np.sqrt(sq_deviations/(counts - 1))
+            new_sharpe = excess_means/stds * np.sqrt(self.periods_per_year)
+        if isinstance(sharpe, pd.Series):
+            return pd.Series(new_sharpe, index=sharpe.index)
+        if excess_means[0] == 0:
+            return 0
+        return new_sharpe[0]
+
+    @cached("returns", "riskfree", "rolling_sharpe_window", "periods_per_year")
+    def rolling_sharpe(self):
+        return get_rolling_sharpe(
+            self.returns,
+            window=self.rolling_sharpe_window,
+            riskfree=self.riskfree,
+            periods_per_year=self.periods_per_year)
+
+    @rolling_sharpe.appender
+    def rolling_sharpe(self, rolling_sharpe, state, num_rows):
+
+        # Only the trailing window of earlier returns affects the new rows
+        returns = self.returns.iloc[-(num_rows + self.rolling_sharpe_window - 1):]
+        new_rolling_sharpe = get_rolling_sharpe(
+            returns,
+            window=self.rolling_sharpe_window,
+            riskfree=self.riskfree,
+            periods_per_year=self.periods_per_year).values[-num_rows:]
+        return self._extend(rolling_sharpe, new_rolling_sharpe, state, num_rows)
+
+    @property
+    def rolling_windows(self):
+        """
+        The rolling volatility, beta and correlation windows, in periods: 3
+        months, 6 months and 1 year (63, 126 and 252 days).
+        """
+        return [
+            max(int(round(years * self.periods_per_year)), 2)
+            for years in ROLLING_WINDOW_YEARS]
+
+    @cached("returns", "column_benchmark_returns", "periods_per_year")
+    def rolling_stats(self):
+        """
+        Returns a DataFrame of rolling annualized volatility and, if there
+        is a benchmark, rolling beta, correlation and annualized benchmark
+        volatility of each column against its own benchmark (see
+        column_benchmark_returns), over each of the rolling_windows. The
+        columns are (Field, Window) for a Series of returns or (Field,
+        Window, column) for a DataFrame.
+
+        All the statistics for all the columns and windows are computed in
+        one pass over running sums (see get_rolling_stats). They take 12
+        times the memory of the returns (or 3 times without a benchmark), so
+        to use a single window, prefer rolling_stats_for_window.
+        """
+        return get_rolling_stats(
+            self.returns,
+            self.rolling_windows,
+            benchmark_returns=self.column_benchmark_returns,
+            periods_per_year=self.periods_per_year)
+
+    @cached("returns", "column_benchmark_returns", "periods_per_year")
+    def _window_rolling_stats(self):
+        """
+        Returns the memo of rolling statistics of single windows, keyed by
+        window.
+        """
+        return {}
+
+    def rolling_stats_for_window(self, window):
+        """
+        Returns a DataFrame of the rolling statistics of rolling_stats over a
+        single window, computing only that window. The columns are Field
+        for a Series of returns or (Field, column) for a DataFrame.
+
+        Parameters
+        ----------
+        window : int, required
+            the rolling window length, in periods
+
+        Returns
+        -------
+        DataFrame
+        """
+        rolling_stats = self._window_rolling_stats.get(window)
+        if rolling_stats is None:
+            rolling_stats = get_rolling_stats(
+                self.returns,
+                [window],
+                benchmark_returns=self.column_benchmark_returns,
+                periods_per_year=self.periods_per_year)
+            rolling_stats.columns = rolling_stats.columns.droplevel("Window")
+            self._window_rolling_stats[window] = rolling_stats
+        return rolling_stats
+
+    @cached("rolling_stats")
+    def rolling_volatility(self):
+        """
+        Returns the rolling annualized volatility over each of the
+        rolling_windows, with columns Window (and column, for a DataFrame of
+        returns).
+        """
+        return self.rolling_stats["Volatility"]
+
+    @cached("rolling_stats")
+    def rolling_beta(self):
+        """
+        Returns the rolling beta to the benchmark over each of the
+        rolling_windows, with columns Window (and column, for a DataFrame of
+        returns). None if there is no benchmark.
+        """
+        if "Beta" in self.rolling_stats.columns.get_level_values("Field"):
+            return self.rolling_stats["Beta"]
+
+    @cached("rolling_stats")
+    def rolling_correlation(self):
+        """
+        Returns the rolling correlation with the benchmark over each of the
+        rolling_windows, with columns Window (and column, for a DataFrame of
+        returns). None if there is no benchmark.
+        """
+        if "Correlation" in self.rolling_stats.columns.get_level_values("Field"):
+            return self.rolling_stats["Correlation"]
+
+    @cached("cum_returns")
+    def drawdowns(self):
+        return get_drawdowns(self.cum_returns)
+
+    @drawdowns.appender
+    def drawdowns(self, drawdowns, state, num_rows):
+
+        cum_returns = _as_2d(self.cum_returns.values)
+        highwater_marks = state.get("highwater_marks")
+        if highwater_marks is None:
+            highwater_marks = np.fmax.reduce(cum_returns[:-num_rows], axis=0)
+        new_cum_returns = cum_returns[-num_rows:]
+        new_drawdowns = get_backend().drawdowns(new_cum_returns, initial=highwater_marks)
+        state["highwater_marks"] = np.fmax(
+            highwater_marks, np.fmax.reduce(new_cum_returns, axis=0))
+
+        new_index = self.cum_returns.index[-num_rows:]
+        if isinstance(drawdowns, pd.Series):
+            # Null cumulative returns are dropped from a Series
+            notnull = ~np.isnan(new_drawdowns[:, 0])
+            new_drawdowns = new_drawdowns[notnull]
+            new_index = new_index[notnull]
+        return self._extend(drawdowns, new_drawdowns, state, num_rows, new_index)
+
+    @cached("drawdowns")
+    def max_drawdown(self):
+        return self.drawdowns.min()
+
+    @max_drawdown.appender
+    def max_drawdown(self, max_drawdown, state, num_rows):
+        drawdowns = self.drawdowns
+        start = drawdowns.index.searchsorted(self.returns.index[-num_rows])
+        return np.fmin(max_drawdown, drawdowns.iloc[start:].min())
+
+    @cached("drawdowns")
+    def drawdown_periods(self):
+        """
+        Returns a DataFrame of drawdown episodes (peak, trough, and recovery
+        dates, depth, and duration), ranked by depth within each column.
+
+        Examples
+        --------
+        Get the 5 deepest drawdowns for each column:
+
+        >>> periods = perf.drawdown_periods
+        >>> periods[periods.index.get_level_values("Rank") <= 5]
+
+        Get the longest drawdown for each column:
+
+        >>> periods.Duration.groupby(level=0).max()
+        """
+        return get_drawdown_periods(self.drawdowns)
+
+    @cached("returns", "riskfree", "compound", "cum_returns", "periods_per_year")
+    def summary_stats(self):
+        """
+        Returns the CAGR, Sharpe, max drawdown, cumulative return, annual
+        volatility, Sortino, Calmar, skew, and kurtosis, computed together.
+        A Series indexed by statistic, or a DataFrame with a row per column.
+        """
+        return get_summary_stats(
+            self.returns,
+            riskfree=self.riskfree,
+            compound=self.compound,
+            cum_returns=self.cum_returns,
+            periods_per_year=self.periods_per_year)
+
+    @cached("pnl")
+    def cum_pnl(self):
+        if self.pnl is not None:
+            return self._accumulate(self.pnl, "cumsum")
+
+    @cum_pnl.appender
+    def cum_pnl(self, cum_pnl, state, num_rows):
+        return self._append_cumsum(cum_pnl, state, self.pnl, num_rows)
+
+    @cached("_benchmark_prices", "_benchmark_baseline")
+    def benchmark_returns(self):
+        """
+        Returns a Series of benchmark returns from the DataFrame of benchmark
+        prices, if any. If more than one strategy/column has benchmark
+        prices, uses the first to compute returns.
+        """
+        if self._benchmark_prices is None:
+            return None
+
+        have_benchmarks = self._benchmark_prices.notnull().any(axis=0)
+        have_benchmarks = have_benchmarks[have_benchmarks]
+        if have_benchmarks.empty:
+            return None
+
+        col = have_benchmarks.index[0]
+        if len(have_benchmarks.index) > 1:
+            import warnings
+            warnings.warn(
+                "Multiple benchmarks found, only using first ({0}) for benchmark returns "
+                "(benchmark_stats compares each column to its own benchmark)".format(col))
+
+        benchmark_prices = self._benchmark_prices[col]
+
+        baseline = self._benchmark_baseline
+        benchmark_returns = _price_returns(
+            benchmark_prices, baseline[col] if baseline is not None else None)
+        benchmark_returns.name = "benchmark"
+
+        return benchmark_returns
+
+    @benchmark_returns.appender
+    def benchmark_returns(self, benchmark_returns, state, num_rows):
+
+        if benchmark_returns is None:
+            return DailyPerformance.benchmark_returns.func(self)
+
+        if "column" not in state:
+            have_benchmarks = self._benchmark_prices.iloc[:-num_rows].notnull().any(axis=0)
+            state["column"] = have_benchmarks[have_benchmarks].index[0]
+        prices = self._benchmark_prices[state["column"]].values
+        last_price = state.get("last_price")
+        if last_price is None:
+            last_price = _last_valid(_as_2d(prices[:-num_rows]), np.nan)[0]
+        new_prices = prices[-num_rows:]
+        state["last_price"] = _last_valid(_as_2d(new_prices), last_price)[0]
+
+        # pct_change pads nulls, so prepend the last known price
+        new_returns = pd.Series(
+            np.concatenate(([last_price], new_prices))).pct_change().fillna(0).values[1:]
+        return self._extend(benchmark_returns, new_returns, state, num_rows)
+
+    @cached("benchmark_returns")
+    def benchmark_cum_returns(self):
+
+        if self.benchmark_returns is not None:
+            return get_cum_returns(self.benchmark_returns, compound=True)
+
+    @benchmark_cum_returns.appender
+    def benchmark_cum_returns(self, benchmark_cum_returns, state, num_rows):
+
+        if benchmark_cum_returns is None:
+            return DailyPerformance.benchmark_cum_returns.func(self)
+        return self._append_cum_returns(
+            benchmark_cum_returns, state, self.benchmark_returns, num_rows)
+
+    @cached("returns", "_benchmark_prices", "_benchmark_baseline", "benchmark_returns")
+    def column_benchmark_returns(self):
+        """
+        Returns a DataFrame of the benchmark returns of each column, from the
+        column's own benchmark prices. Columns without benchmark prices use
+        the first benchmark (as benchmark_returns does). For a Series of
+        returns, the same as benchmark_returns.
+        """
+        benchmark_returns = self.benchmark_returns
+        if benchmark_returns is None or isinstance(self.returns, pd.Series):
+            return benchmark_returns
+
+        returns = self.returns
+        prices = self._benchmark_prices.reindex(index=returns.index, columns=returns.columns)
+        column_benchmark_returns = _price_returns(prices, self._benchmark_baseline)
+        has_benchmarks = prices.notnull().any(axis=0).values
+        if not has_benchmarks.all():
+            # broadcast the first benchmark to the columns without their own
+            column_benchmark_returns = pd.DataFrame(
+                np.where(
+                    has_benchmarks,
+                    column_benchmark_returns.values,
+                    benchmark_returns.reindex(returns.index).values.reshape((-1, 1))),
+                index=returns.index, columns=returns.columns)
+        return column_benchmark_returns
+
+    @cached("returns", "riskfree", "periods_per_year", "column_benchmark_returns")
+    def benchmark_stats(self):
+        """
+        Returns the beta, alpha, correlation, tracking error, information
+        ratio, and up and down capture of the returns relative to the
+        benchmark, computed for all columns at once, each against its own
+        benchmark (see column_benchmark_returns). A Series indexed by
+        statistic, or a DataFrame with a row per column. None if there are
+        no benchmark prices.
+        """
+        if self.column_benchmark_returns is None:
+            return None
+        return get_benchmark_stats(
+            self.returns,
+            self.column_benchmark_returns.reindex(self.returns.index),
+            riskfree=self.riskfree,
+            periods_per_year=self.periods_per_year)
+
+    @cached(
+        "cum_returns", "pnl", "net_exposures", "abs_exposures", "total_holdings",
+        "turnover", "commission_amounts", "commissions", "slippages",
+        "_benchmark_prices", "_benchmark_baseline", "riskfree", "rolling_sharpe_window",
+        "periods_per_year")
+    def _resampled(self):
+        """
+        Returns the memo of resampled performances, keyed by frequency.
+        """
+        return {}
+
+    def resample(self, freq, periods_per_year=None):
+        """
+        Returns the performance resampled to a lower frequency, for example
+        weekly or monthly, as a DailyPerformance with one row per period.
+
+        The period returns are derived from the cumulative returns at the
+        end of each period, so they compound (or, if compound is False, add
+        up) to the same cumulative returns. Pnl, turnover, commissions and
+        slippages are summed over each period, exposures and holdings are
+        averaged, and benchmark prices are taken at the end of each period,
+        with the first price as the baseline of the first period's benchmark
+        return (so that, like the first period's return, it covers the whole
+        period). The riskfree rate and rolling Sharpe window are converted to the new
+        frequency, and the statistics are annualized with periods_per_year.
+
+        Resampled performances are cached per frequency until the inputs
+        change or rows are appended.
+
+        Parameters
+        ----------
+        freq : str or DateOffset, required
+            the pandas frequency to resample to, for example "W" (weekly),
+            "M" (monthly), "Q" (quarterly) or "A" (annual)
+
+        periods_per_year : int, optional
+            the number of periods per year, used to annualize the statistics.
+            Inferred from freq if omitted; required for other frequencies
+
+        Returns
+        -------
+        DailyPerformance
+
+        Examples
+        --------
+        Get monthly returns and the Sharpe ratio of monthly returns:
+
+        >>> monthly_perf = perf.resample("M")
+        >>> monthly_perf.returns
+        >>> monthly_perf.sharpe
+        """
+        offset = pd.tseries.frequencies.to_offset(freq)
+        if periods_per_year is None:
+            base_periods_per_year = PERIODS_PER_YEAR.get(offset.name.split("-")[0])
+            if base_periods_per_year is None:
+                raise MoonchartError(
+                    "can't infer periods_per_year for frequency {0}, please specify it".format(
+                        offset.freqstr))
+            periods_per_year = base_periods_per_year / offset.n
+
+        key = (offset, periods_per_year)
+        resampled = self._resampled.get(key)
+        if resampled is not None:
+            return resampled
+
+        # Skip periods without any dates
+        counts = pd.Series(1, index=self.returns.index).resample(offset).count()
+        periods = counts.index[counts > 0]
+
+        # The cumulative returns at the end of each period compared to the
+        # end of the previous period (or the baseline of 1)
+        ending_values = self.cum_returns.astype(np.float64).resample(offset).last().reindex(periods)
+        previous_values = ending_values.ffill().shift(1).fillna(1)
+        if self.compound:
+            returns = ending_values / previous_values - 1
+        else:
+            returns = ending_values - previous_values
+
+        kwargs = {}
+        for attr, method in RESAMPLE_METHODS.items():
+            values = getattr(self, attr)
+            if values is None:
+                continue
+            resampler = values.astype(np.float64).resample(offset)
+            if method == "sum":
+                # periods with no values are null rather than 0
+                values = resampler.sum(min_count=1)
+            else:
+                values = getattr(resampler, method)()
+            kwargs[attr.lstrip("_")] = values.reindex(periods)
+        kwargs["benchmark"] = kwargs.pop("benchmark_prices", None)
+
+        resampled = DailyPerformance(
+            returns,
+            riskfree=self.riskfree * self.periods_per_year / periods_per_year,
+            compound=self.compound,
+            rolling_sharpe_window=max(
+                int(round(self.rolling_sharpe_window * periods_per_year / self.periods_per_year)), 2),
+            # the returns were already trimmed and checked for outliers
+            warn_outliers=False,
+            dtype=self.dtype,
+            log_space=self.log_space,
+            periods_per_year=periods_per_year,
+            **kwargs)
+
+        if self._benchmark_prices is not None:
+            baseline = self._benchmark_baseline
+            if baseline is None:
+                baseline = self._benchmark_prices.astype(np.float64).bfill().iloc[0]
+            resampled._benchmark_baseline = baseline
+
+        # Loading the fields of an AggregateDailyPerformance replaces the
+        # memo, so look it up again
+        self._resampled[key] = resampled
+        return resampled
+
+    def append(self, new_results):
+        """
+        Appends new dates of backtest results to the performance, for example
+        the latest day of a paper or live trading strategy.
+
+        Cached derived values (cum_returns, drawdowns, sharpe, etc.) are
+        extended from their running state rather than recomputed, so an
+        append costs time proportional to the number of new dates rather than
+        the length of the history. summary_stats and drawdown_periods are
+        recomputed on next access. AggregateDailyPerformances of this
+        performance are updated too.
+
+        If trim_outliers is set, the new returns are trimmed using z-scores
+        computed over the full history; earlier returns are not re-trimmed.
+
+        Parameters
+        ----------
+        new_results : DataFrame, required
+            Moonshot or PNL backtest results with a (Field, Date) or (Field,
+            Date, Time) MultiIndex, for dates after the last date of the
+            performance. Must include the Return field. Fields which are
+            missing are appended as NaN
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        Append the latest day of results and plot the updated cumulative
+        returns:
+
+        >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
+        >>> perf.append(latest_results)
+        >>> perf.cum_returns.plot()
+        """
+        if "Time" in new_results.index.names:
+            new_results = self._from_intraday(new_results)
+
+        dtype = self.returns.values.dtype
+        store = FieldStore.from_results(new_results, fields=list(FIELD_ATTRS), dtype=dtype)
+        if store is not None:
+            fields = store.fields
+            get_field = store.frame
+        else:
+            fields = new_results.index.get_level_values("Field").unique()
+            get_field = lambda field: new_results.loc[field].astype(dtype, copy=False)
+
+        if "Return" not in fields:
+            raise MoonchartError("new_results must include the Return field")
+
+        unknown_columns = new_results.columns.difference(self.returns.columns)
+        if len(unknown_columns):
+            raise MoonchartError(
+                "new_results contains columns which are not in the performance: {0}".format(
+                    ", ".join([str(column) for column in unknown_columns])))
+
+        rows = {}
+        for field in fields:
+            if field in FIELD_ATTRS:
+                rows[FIELD_ATTRS[field]] = get_field(field).reindex(columns=self.returns.columns)
+
+        self._append_rows(rows)
+
+    def _append_rows(self, rows, extended=None):
+        """
+        Appends rows to the inputs and extends the cached values.
+
+        Parameters
+        ----------
+        rows : dict of str: DataFrame or Series, required
+            the new rows, keyed by input attribute. The Return rows determine
+            the new dates. Inputs missing from rows get NaN rows
+
+        extended : dict of str: DataFrame or Series, optional
+            inputs to replace with already extended values (used for inputs
+            shared with another performance)
+
+        Returns
+        -------
+        None
+        """
+        extended = extended or {}
+        new_index = rows["returns"].index
+        num_rows = len(new_index)
+        if not num_rows:
+            return
+
+        last_date = self.returns.index[-1]
+        if new_index[0] <= last_date or not new_index.is_monotonic_increasing:
+            raise MoonchartError(
+                "can only append dates after {0}, but new dates start at {1}".format(
+                    last_date.date(), new_index[0].date()))
+
+        snapshot = get_cache_snapshot(self)
+
+        # Each input is extended through a growable buffer, which is reused
+        # for as long as the input isn't replaced
+        buffers = self.__dict__.setdefault("_input_buffers", {})
+        for attr in FIELD_ATTRS.values():
+            if attr in extended:
+                setattr(self, attr, extended[attr])
+                continue
+            if attr not in self.__dict__:
+                # a LazyInput which hasn't been loaded yet, and will be
+                # loaded with the new rows
+                continue
+            current = getattr(self, attr)
+            if current is None:
+                continue
+
+            new_rows = rows.get(attr)
+            if new_rows is None:
+                new_values = np.full((num_rows, _as_2d(current.values).shape[1]), np.nan)
+            else:
+                new_values = new_rows.reindex(new_index).values
+
+            buffer, frame = buffers.get(attr, (None, None))
+            if frame is not current:
+                buffer = GrowableArray(_as_2d(current.values))
+            buffer.append(_as_2d(new_values).astype(buffer.values.dtype, copy=False))
+
+            if attr == "returns" and self._trim_outliers:
+                values = buffer.values
+                z_scores = get_backend().zscores(values)[-num_rows:]
+                values[-num_rows:][~(np.abs(z_scores) <= self._trim_outliers)] = 0
+
+            index = current.index.append(new_index.rename(current.index.name))
+            if isinstance(current, pd.DataFrame):
+                frame = pd.DataFrame(buffer.values, index=index, columns=current.columns, copy=False)
+            else:
+                frame = pd.Series(buffer.values[:, 0], index=index, name=current.name)
+            buffers[attr] = (buffer, frame)
+            setattr(self, attr, frame)
+
+        # the inputs are no longer views of the FieldStore
+        self._store = None
+
+        append_to_cache(self, snapshot, num_rows)
+
+        for aggregate in list(self._aggregates):
+            aggregate_rows = dict(
+                (attr, aggregate._reduce(getattr(self, attr).iloc[-num_rows:]))
+                for attr in FIELD_ATTRS.values()
+                if attr != "_benchmark_prices"
+                and attr in aggregate.__dict__
+                and getattr(self, attr) is not None)
+            aggregate._append_rows(
+                aggregate_rows,
+                extended={"_benchmark_prices": aggregate._reduce_benchmark_prices(
+                    self._benchmark_prices)})
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # WeakSets can't be pickled
+        del state["_aggregates"]
+        # the DataFrames are pickled on their own, so pickling the FieldStore
+        # or append buffers they are views of would store the data twice
+        state["_store"] = None
+        state.pop("_input_buffers", None)
+        return state
+
+    def __setstate__(self, state):
+        # performances pickled by earlier versions are daily
+        state.setdefault("periods_per_year", 252)
+        state.setdefault("_benchmark_baseline", None)
+        self.__dict__.update(state)
+        self._aggregates = weakref.WeakSet()
+
+    def cache_info(self):
+        """
+        Returns a DataFrame describing the cached derived values: whether
+        each is currently cached (Warm), the memory it holds (Bytes), and
+        the inputs and derived values it depends on (DependsOn).
+
+        Cached values are discarded when an input they depend on (returns,
+        riskfree, compound, rolling_sharpe_window, etc.) is set.
+
+        Returns
+        -------
+        DataFrame
+
+        Examples
+        --------
+        Show the memory held by cached values:
+
+        >>> perf.cache_info().Bytes.sum()
+        """
+        return get_cache_info(self)
+
+    def clear_cache(self):
+        """
+        Discards all cached derived values. Needed only after modifying an
+        input in place, for example assigning to cells of perf.returns.
+
+        Returns
+        -------
+        None
+        """
+        clear_cache(self)
+
+# AggregateDailyPerformance attributes which are aggregated on first access
+LAZY_ATTRS = [
+    "pnl",
+    "net_exposures",
+    "abs_exposures",
+    "total_holdings",
+    "turnover",
+    "commission_amounts",
+    "commissions",
+    "slippages",
+]
+
+def _sum_fields(performance, attrs):
+    """
+    Sums the named fields of a DailyPerformance across columns, returning a
+    dict of Series (or None for missing fields).
+
+    Fields which are still views of the performance's FieldStore are summed
+    with one reduction per run of adjacent fields in the store; others are
+    summed one at a time.
+    """
+    sums = {}
+    store = performance._store
+    field_names = dict((attr, field) for field, attr in FIELD_ATTRS.items())
+    stored = []
+    for attr in attrs:
+        values = getattr(performance, attr)
+        if values is None:
+            sums[attr] = None
+        elif (
+            store is not None
+            and field_names[attr] in store
+            and np.may_share_memory(values.values, store.data)):
+            stored.append((store.fields.index(field_names[attr]), attr))
+        else:
+            sums[attr] = performance._accumulate(values, "sum", axis=1)
+
+    # Group the stored fields into runs of adjacent positions
+    runs = []
+    for position, attr in sorted(stored):
+        if runs and runs[-1][-1][0] == position - 1:
+            runs[-1].append((position, attr))
+        else:
+            runs.append([(position, attr)])
+
+    for run in runs:
+        data = store.data[run[0][0]:run[-1][0] + 1]
+        # like DataFrame.sum (and in the same order), nulls are skipped and
+        # all-null rows sum to 0
+        run_sums = np.nansum(data, axis=2, dtype=np.float64)
+        if performance.dtype is not None:
+            run_sums = run_sums.astype(performance.dtype)
+        for (position, attr), values in zip(run, run_sums):
+            sums[attr] = pd.Series(values, index=store.index)
+
+    return sums
+
+class AggregateDailyPerformance(DailyPerformance):
+    """
+    Class representing aggregate daily performance.
+
+    Given a DailyPerformance instance containing multi-column (that is,
+    multi-strategy or detailed single-strategy) DataFrames, this class
+    represents the aggregate performance.
+
+    Parameters
+    ----------
+    performance : DailyPerformance, required
+        daily performance results to aggregate
+
+    trim_outliers: int or float, optional
+        discard returns that are more than this many standard deviations from the mean
+        (copied from DailyPerformance if omitted)
+
+    riskfree : float, optional
+        the riskfree rate (copied from DailyPerformance if omitted)
+
+    compound : bool
+         True for compound/geometric returns, False for arithmetic returns (copied from
+         DailyPerformance if omitted)
+
+    rolling_sharpe_window : int, optional
+        compute rolling Sharpe over this many periods (copied from DailyPerformance if
+        omitted)
+
+    Returns
+    -------
+    AggregatePerformance
+
+    Examples
+    --------
+    Plot aggregate cumulative returns:
+
+    >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
+    >>> agg_perf = AggregateDailyPerformance(perf)
+    >>> agg_perf.cum_returns.plot()
+    """
+
+    # Inputs other than returns are summed on first access, so that only
+    # the fields which are used are aggregated
+    pnl = LazyInput("aggregate")
+    net_exposures = LazyInput("aggregate")
+    abs_exposures = LazyInput("aggregate")
+    total_holdings = LazyInput("aggregate")
+    turnover = LazyInput("aggregate")
+    commission_amounts = LazyInput("aggregate")
+    commissions = LazyInput("aggregate")
+    slippages = LazyInput("aggregate")
+
+    def __init__(self, performance, riskfree=None,
+                 compound=None,
+                 rolling_sharpe_window=None,
+                 trim_outliers=None):
+
+        if riskfree is None:
+            riskfree = performance.riskfree
+        if compound is None:
+            compound = performance.compound
+        if rolling_sharpe_window is None:
+            rolling_sharpe_window = performance.rolling_sharpe_window
+        if trim_outliers is None:
+            trim_outliers = performance._trim_outliers
+
+        super(AggregateDailyPerformance, self).__init__(
+            _sum_fields(performance, ["returns"])["returns"],
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            benchmark=performance._benchmark_prices,
+            trim_outliers=trim_outliers,
+            # the returns were already checked for outliers when the
+            # DailyPerformance was constructed
+            warn_outliers=False,
+            dtype=performance.dtype,
+            log_space=performance.log_space,
+            periods_per_year=performance.periods_per_year
+        )
+        self._performance = performance
+        self._benchmark_baseline = performance._benchmark_baseline
+
+        # DailyPerformance.__init__ set the lazy inputs to None; unset them
+        # so they are aggregated on first access
+        for attr in LAZY_ATTRS:
+            self.__dict__.pop(attr, None)
+
+        # keep up to date when rows are appended to the performance
+        performance._aggregates.add(self)
+
+    def aggregate(self, *attrs):
+        """
+        Sums the named fields of the DailyPerformance across columns now,
+        rather than one at a time on first access. Fields which are stored
+        together are summed in one pass over the data.
+
+        Parameters
+        ----------
+        attrs : str
+            the names of the fields to aggregate, for example "net_exposures"
+            and "abs_exposures". Default is all fields
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        Aggregate the position fields at once:
+
+        >>> agg_perf = AggregateDailyPerformance(perf)
+        >>> agg_perf.aggregate("net_exposures", "abs_exposures", "total_holdings")
+        """
+        attrs = [attr for attr in (attrs or LAZY_ATTRS) if attr not in self.__dict__]
+        for attr, values in _sum_fields(self._performance, attrs).items():
+            setattr(self, attr, values)
+
+    def _reduce(self, data):
+        """
+        Sums a DataFrame of the DailyPerformance across columns.
+        """
+        return self._performance._accumulate(data, "sum", axis=1)
+
+    def _reduce_benchmark_prices(self, benchmark_prices):
+        """
+        Returns the benchmark prices of the aggregate performance: those of
+        the DailyPerformance, of which benchmark_returns uses the first.
+        """
+        return benchmark_prices
+
+    def append(self, new_results):
+        """
+        Not supported: append to the DailyPerformance instead, which updates
+        its AggregateDailyPerformances.
+        """
+        raise MoonchartError(
+            "can't append to an AggregateDailyPerformance, please append to "
+            "the DailyPerformance it aggregates")
+
+class GroupedDailyPerformance(DailyPerformance):
+    """
+    Class representing the daily performance of groups of columns (for
+    example strategy families by asset class or region).
+
+    Given a DailyPerformance instance containing multi-column DataFrames and
+    a mapping of each column to a group, this class represents the
+    performance of each group, with the groups as columns, much as
+    AggregateDailyPerformance represents the performance of all the columns
+    together. All fields are summed by group in a single grouped reduction,
+    and each group's benchmark is that of its first column with benchmark
+    prices.
+
+    Parameters
+    ----------
+    performance : DailyPerformance, required
+        daily performance results to group
+
+    groups : dict or Series, required
+        mapping of each column of the DailyPerformance to its group
+
+    trim_outliers: int or float, optional
+        discard returns that are more than this many standard deviations from the mean
+        (copied from DailyPerformance if omitted)
+
+    riskfree : float, optional
+        the riskfree rate (copied from DailyPerformance if omitted)
+
+    compound : bool
+         True for compound/geometric returns, False for arithmetic returns (copied from
+         DailyPerformance if omitted)
+
+    rolling_sharpe_window : int, optional
+        compute rolling Sharpe over this many periods (copied from DailyPerformance if
+        omitted)
+
+    Returns
+    -------
+    GroupedDailyPerformance
+
+    Examples
+    --------
+    Create a tear sheet of strategy families:
+
+    >>> perf = DailyPerformance.from_moonshot_csv("backtest_results.csv")
+    >>> grouped_perf = GroupedDailyPerformance(
+    ...     perf, {"fx-trend": "FX", "fx-carry": "FX", "es-momentum": "Equities"})
+    >>> Tearsheet().create_full_tearsheet(grouped_perf)
+    """
+
+    def __init__(self, performance, groups,
+                 riskfree=None,
+                 compound=None,
+                 rolling_sharpe_window=None,
+                 trim_outliers=None):
+
+        if riskfree is None:
+            riskfree = performance.riskfree
+        if compound is None:
+            compound = performance.compound
+        if rolling_sharpe_window is None:
+            rolling_sharpe_window = performance.rolling_sharpe_window
+        if trim_outliers is None:
+            trim_outliers = performance._trim_outliers
+
+        columns = performance.returns.columns
+        groups = pd.Series(groups)
+        missing_columns = columns.difference(groups.index)
+        if len(missing_columns):
+            raise MoonchartError("no group provided for columns: {0}".format(
+                ", ".join([str(column) for column in missing_columns])))
+        groups = groups.reindex(columns)
+
+        group_names = pd.Index(pd.unique(groups.values))
+        try:
+            group_names = group_names.sort_values()
+        except TypeError:
+            # groups of mixed types can't be sorted, so keep them in order of
+            # appearance
+            pass
+
+        # Summing columns by group is a matrix product with a (column x
+        # group) indicator matrix
+        self._group_names = group_names
+        self._indicators = np.zeros((len(columns), len(group_names)))
+        self._indicators[np.arange(len(columns)), group_names.get_indexer(groups.values)] = 1
+        self._performance = performance
+
+        grouped = self._reduce_fields(performance, [
+            attr for attr in FIELD_ATTRS.values() if attr != "_benchmark_prices"])
+
+        super(GroupedDailyPerformance, self).__init__(
+            grouped.pop("returns"),
+            riskfree=riskfree,
+            compound=compound,
+            rolling_sharpe_window=rolling_sharpe_window,
+            benchmark=self._reduce_benchmark_prices(performance._benchmark_prices),
+            trim_outliers=trim_outliers,
+            # the returns were already checked for outliers when the
+            # DailyPerformance was constructed
+            warn_outliers=False,
+            dtype=performance.dtype,
+            log_space=performance.log_space,
+            periods_per_year=performance.periods_per_year,
+            **dict(
+                (attr, values) for attr, values in grouped.items()
+                if values is not None)
+        )
+        if performance._benchmark_baseline is not None:
+            self._benchmark_baseline = self._reduce_benchmark_prices(
+                performance._benchmark_baseline.to_frame().T).iloc[0]
+
+        # keep up to date when rows are appended to the performance
+        performance._aggregates.add(self)
+
+    def _reduce_values(self, values):
+        """
+        Sums an array whose last axis is the columns of the DailyPerformance
+        by group, skipping nulls.
+        """
+        values = np.where(np.isnan(values), 0, values.astype(np.float64, copy=False))
+        grouped = np.matmul(values, self._indicators)
+        if self.dtype is not None:
+            grouped = grouped.astype(self.dtype)
+        return grouped
+
+    def _reduce(self, data):
+        """
+        Sums a DataFrame of the DailyPerformance by group.
+        """
+        return pd.DataFrame(
+            self._reduce_values(data.values), index=data.index, columns=self._group_names)
+
+    def _reduce_fields(self, performance, attrs):
+        """
+        Sums the named fields of the DailyPerformance by group, returning a
+        dict of DataFrames (or None for missing fields). Fields which are
+        still views of the performance's FieldStore are summed together in
+        one reduction; others are summed one at a time.
+        """
+        # self.dtype isn't set until DailyPerformance.__init__
+        self.dtype = performance.dtype
+
+        grouped = {}
+        store = performance._store
+        field_names = dict((attr, field) for field, attr in FIELD_ATTRS.items())
+        stored = []
+        for attr in attrs:
+            values = getattr(performance, attr)
+            if values is None:
+                grouped[attr] = None
+            elif (
+                store is not None
+                and field_names[attr] in store
+                and np.may_share_memory(values.values, store.data)):
+                stored.append(attr)
+            else:
+                grouped[attr] = self._reduce(values)
+
+        if stored:
+            positions = [store.fields.index(field_names[attr]) for attr in stored]
+            if positions == list(range(len(store.fields))):
+                data = store.data
+            else:
+                data = store.data[positions]
+            for attr, values in zip(stored, self._reduce_values(data)):
+                grouped[attr] = pd.DataFrame(values, index=store.index, columns=self._group_names)
+
+        return grouped
+
+    def _reduce_benchmark_prices(self, benchmark_prices):
+        """
+        Returns the benchmark prices (or baseline prices) of each group: those
+        of the first column in the group which has benchmark prices in the
+        DailyPerformance. Groups without any are null, so they are compared
+        to the first benchmark.
+        """
+        if benchmark_prices is None:
+            return None
+
+        columns = self._performance.returns.columns
+        benchmark_prices = benchmark_prices.reindex(columns=columns)
+        have_benchmarks = self._performance._benchmark_prices.reindex(
+            columns=columns).notnull().any(axis=0).values
+        # the first benchmarked column of each group, if any
+        indicators = self._indicators * have_benchmarks[:, None]
+        has_benchmark = indicators.any(axis=0)
+        positions = indicators.argmax(axis=0)
+
+        values = benchmark_prices.values[:, positions]
+        values = np.where(has_benchmark, values, np.nan).astype(values.dtype, copy=False)
+        return pd.DataFrame(values, index=benchmark_prices.index, columns=self._group_names)
+
+    def append(self, new_results):
+        """
+        Not supported: append to the DailyPerformance instead, which updates
+        its GroupedDailyPerformances.
+        """
+        raise MoonchartError(
+            "can't append to a GroupedDailyPerformance, please append to "
+            "the DailyPerformance it groups")
+
+class _PerformanceIndexer(object):
+    """
+    Indexer for DailyPerformance.loc, which supports date slices only.
+    """
+
+    def __init__(self, performance):
+        self.performance = performance
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise MoonchartError(
+                "only date slices are supported, for example perf.loc['2019-01-01':'2019-12-31']")
+        return self.performance.between(key.start, key.stop)
+
+class DailyPerformanceView(DailyPerformance):
+    """
+    Class representing a date range of a DailyPerformance, as returned by
+    DailyPerformance.between.
+
+    The fields are sliced from the DailyPerformance on first access, and
+    the cumulative values are rebased from its cached values for as long as
+    the fields and parameters they depend on are unchanged.
+
+    Parameters
+    ----------
+    performance : DailyPerformance, required
+        the performance to view
+
+    start : str or datetime, optional
+        the first date of the view. Default is the first date
+
+    end : str or datetime, optional
+        the last date of the view. Default is the last date
+    """
+
+    # Fields other than returns are sliced on first access
+    pnl = LazyInput("_slice")
+    net_exposures = LazyInput("_slice")
+    abs_exposures = LazyInput("_slice")
+    total_holdings = LazyInput("_slice")
+    turnover = LazyInput("_slice")
+    commission_amounts = LazyInput("_slice")
+    commissions = LazyInput("_slice")
+    slippages = LazyInput("_slice")
+    _benchmark_prices = LazyInput("_slice")
+
+    def __init__(self, performance, start=None, end=None):
+
+        dates = performance.returns.index
+        self._start, self._stop, _ = dates.slice_indexer(start, end).indices(len(dates))
+        if self._stop - self._start < 2:
+            raise InsufficientData(
+                "Moonchart needs at least 2 dates to analyze performance, "
+                "but there are {0} dates between {1} and {2}".format(
+                    max(self._stop - self._start, 0), start, end))
+        self._performance = performance
+        # the slices made so far and the inputs they were sliced from, to
+        # tell whether either was replaced
+        self._slices = {}
+
+        self.dtype = performance.dtype
+        self._trim_outliers = performance._trim_outliers
+        self._slice("returns")
+        self.riskfree = performance.riskfree
+        self.compound = performance.compound
+        self.log_space = performance.log_space
+        self.rolling_sharpe_window = performance.rolling_sharpe_window
+        self.periods_per_year = performance.periods_per_year
+        # the baseline precedes the performance's first row only
+        self._benchmark_baseline = performance._benchmark_baseline if self._start == 0 else None
+        self._store = None
+        self._aggregates = weakref.WeakSet()
+
+    def _slice(self, attr):
+        """
+        Sets the input to the view's rows of the performance's input.
+        """
+        values = parent_values = getattr(self._performance, attr)
+        if values is not None:
+            dates = self._performance.returns.index
+            if values.index is dates or values.index.equals(dates):
+                values = values.iloc[self._start:self._stop]
+            else:
+                values = values.loc[dates[self._start]:dates[self._stop - 1]]
+        self._slices[attr] = (values, parent_values)
+        setattr(self, attr, values)
+
+    def _can_rebase(self, *attrs):
+        """
+        Whether the performance's cached values computed from the inputs can
+        be rebased: neither the view's inputs nor the performance's inputs
+        they were sliced from have been replaced, and the parameters match.
+        """
+        performance = self._performance
+        for attr in attrs:
+            # accessing a lazy input slices it
+            view_values = getattr(self, attr)
+            values, parent_values = self._slices.get(attr, (None, None))
+            if view_values is not values or getattr(performance, attr) is not parent_values:
+                return False
+        return (
+            self.compound == performance.compound
+            and self.log_space == performance.log_space)
+
+    def _rebase(self, values, origin=0, divide=False):
+        """
+        Returns the view's rows of a cumulative Series or DataFrame of the
+        performance, rebased so that they accumulate from the origin (0 for
+        sums, 1 for cumulative returns) rather than from the last value
+        before the first row. Cumulative products are rebased by dividing.
+        """
+        if self._start == 0:
+            return values.iloc[:self._stop]
+        baselines = _last_valid_before(_as_2d(values.values), self._start, origin)
+        if isinstance(values, pd.Series):
+            baselines = baselines[0]
+        values = values.iloc[self._start:self._stop]
+        if divide:
+            rebased = values / baselines
+        else:
+            rebased = values - (baselines - origin)
+        return rebased.astype(values.values.dtype, copy=False)
+
+    @cached("returns", "compound")
+    def log_growth(self):
+        if not self._can_rebase("returns"):
+            return DailyPerformance.log_growth.func(self)
+        return self._rebase(self._performance.log_growth)
+
+    @cached("returns", "compound", "log_space")
+    def cum_returns(self):
+        if self.log_space or not self._can_rebase("returns"):
+            return DailyPerformance.cum_returns.func(self)
+        return self._rebase(self._performance.cum_returns, origin=1, divide=self.compound)
+
+    @cached("commissions")
+    def cum_commissions(self):
+        if self.commissions is None or not self._can_rebase("commissions"):
+            return DailyPerformance.cum_commissions.func(self)
+        # accumulated like arithmetic returns, from 1
+        return self._rebase(self._performance.cum_commissions, origin=1)
+
+    @cached("commission_amounts")
+    def cum_commission_amounts(self):
+        if self.commission_amounts is None or not self._can_rebase("commission_amounts"):
+            return DailyPerformance.cum_commission_amounts.func(self)
+        return self._rebase(self._performance.cum_commission_amounts)
+
+    @cached("slippages")
+    def cum_slippages(self):
+        if self.slippages is None or not self._can_rebase("slippages"):
+            return DailyPerformance.cum_slippages.func(self)
+        # accumulated like arithmetic returns, from 1
+        return self._rebase(self._performance.cum_slippages, origin=1)
+
+    @cached("pnl")
+    def cum_pnl(self):
+        if self.pnl is None or not self._can_rebase("pnl"):
+            return DailyPerformance.cum_pnl.func(self)
+        return self._rebase(self._performance.cum_pnl)
+
+    def append(self, new_results):
+        """
+        Not supported: append to the DailyPerformance instead, and take a
+        new view.
+        """
+        raise MoonchartError(
+            "can't append to a view of a DailyPerformance, please append to "
+            "the DailyPerformance instead")
+
+class IntradayPerformance(DailyPerformance):
+    """
+    Class representing intraday performance and derived statistics.
+
+    Like DailyPerformance, but intraday results are kept at the resolution
+    of their bars rather than rolled up to daily: the (Date, Time) levels of
+    the results become a single index of timestamps, and the statistics are
+    annualized by the number of bars per year. The daily rollup is
+    available (and cached) as the daily property.
+
+    Typically constructed using IntradayPerformance.from_moonshot_csv, which
+    takes the same parameters as DailyPerformance.from_moonshot_csv (except
+    chunksize).
+
+    Parameters
+    ----------
+    returns : DataFrame, required
+        a Dataframe of pct returns, indexed by timestamp
+
+    periods_per_year : int, optional
+        the number of bars per year, used to annualize the Sharpe ratio and
+        other statistics. Default is 252 times the average number of bars
+        per day
+
+    kwargs :
+        the other parameters of DailyPerformance. riskfree is the riskfree
+        rate per bar, and rolling_sharpe_window is a number of bars
+
+    Examples
+    --------
+    Plot cumulative returns bar by bar, then create a tear sheet of the
+    daily rollup:
+
+    >>> perf = IntradayPerformance.from_moonshot_csv("intraday_backtest_results.csv")
+    >>> perf.cum_returns.plot()
+    >>> Tearsheet().create_full_tearsheet(perf.daily)
+    """
+
+    def __init__(self, returns, periods_per_year=None, **kwargs):
+
+        if periods_per_year is None:
+            num_days = returns.index.normalize().nunique()
+            periods_per_year = 252 * max(int(round(len(returns.index) / max(num_days, 1))), 1)
+
+        super(IntradayPerformance, self).__init__(
+            returns, periods_per_year=periods_per_year, **kwargs)
 
-        if performance.turnover is not None:
-            self.turnover = performance.turnover.sum(axis=1)
+    @staticmethod
+    def _from_intraday(results):
+        """
+        Replaces the Date and Time levels of intraday results with a single
+        Date level of timestamps.
+        """
+        index = results.index
+        dates = pd.DatetimeIndex(index.levels[index.names.index("Date")])
+        times = pd.to_timedelta(index.levels[index.names.index("Time")].astype(str))
+        # combine the (few) distinct dates and times, then look them up by
+        # code, rather than parsing each row
+        timestamps = (
+            dates[_level_codes(index, index.names.index("Date"))]
+            + times[_level_codes(index, index.names.index("Time"))])
+        results = results.copy(deep=False)
+        results.index = pd.MultiIndex.from_arrays(
+            [index.get_level_values("Field"), timestamps.rename("Date")])
+        return results
+
+    @cached(
+        "returns", "pnl", "net_exposures", "abs_exposures", "total_holdings",
+        "turnover", "commission_amounts", "commissions", "slippages",
+        "_benchmark_prices", "riskfree", "compound", "log_space",
+        "rolling_sharpe_window", "periods_per_year")
+    def daily(self):
+        """
+        Returns the performance rolled up to daily, as a DailyPerformance.
+
+        The bars of each day are combined as quantrocket.moonshot.intraday_to_daily
+        combines them (returns, pnl and costs are summed, net exposures
+        averaged, absolute exposures and holdings maxed, and benchmark prices
+        taken at the close), so the result is the same as loading the
+        results with DailyPerformance. The riskfree rate and rolling Sharpe
+        window are converted from bars to days.
+        """
+        kwargs = {}
+        for attr, method in DAILY_ROLLUP_METHODS.items():
+            values = getattr(self, attr)
+            if values is None:
+                continue
+            values = values.astype(np.float64)
+            grouped = values.groupby(values.index.normalize().rename("Date"))
+            kwargs[attr.lstrip("_")] = getattr(grouped, method)()
+        kwargs["benchmark"] = kwargs.pop("benchmark_prices", None)
+
+        bars_per_day = self.periods_per_year / 252
+        return DailyPerformance(
+            riskfree=self.riskfree * bars_per_day,
+            compound=self.compound,
+            rolling_sharpe_window=max(int(round(self.rolling_sharpe_window / bars_per_day)), 2),
+            # the returns were already trimmed and checked for outliers
+            warn_outliers=False,
+            dtype=self.dtype,
+            log_space=self.log_space,
+            **kwargs)
@@ -0,0 +1,284 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+An index of returns for computing statistics over arbitrary date windows
+without revisiting the returns.
+
+Prefix sums of the returns, the squared returns, and the log growth give
+the mean, standard deviation, Sharpe ratio and CAGR of any window in
+constant time. A segment tree over the log growth gives the max drawdown of
+any window in logarithmic time: each node holds the highest and lowest log
+growth of its rows and the deepest fall from a high to a later low, and
+adjacent nodes combine because the deepest fall of the two is either within
+one of them or from the left node's high to the right node's low.
+
+The index is built and queried for all columns at once, and a batch of
+windows is queried in one pass over the levels of the tree.
+"""
+
+import numpy as np
+import pandas as pd
+from .exceptions import MoonchartError
+
+RANGE_STATS = [
+    "CAGR",
+    "Sharpe",
+    "AnnualVolatility",
+    "MaxDrawdown",
+]
+
+def _merge(left, right):
+    """
+    Combines the (high, low, deepest fall) of adjacent segment tree nodes,
+    left before right.
+    """
+    left_highs, left_lows, left_falls = left
+    right_highs, right_lows, right_falls = right
+    falls = np.fmin(np.fmin(left_falls, right_falls), right_lows - left_highs)
+    return np.fmax(left_highs, right_highs), np.fmin(left_lows, right_lows), falls
+
+class RangeStatsIndex(object):
+    """
+    Index of returns for computing CAGR, Sharpe, annual volatility and max
+    drawdown over many date windows.
+
+    Typically accessed as DailyPerformance.range_stats.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        a Series or DataFrame of returns
+
+    log_growth : Series or DataFrame, required
+        the log growth of the returns, as computed by get_log_growth
+
+    compound : bool
+        True for compounded (geometric) returns, False for arithmetic
+        returns (default True). Max drawdown depends on where a window
+        starts for arithmetic returns, so it is only indexed for compounded
+        returns and is null otherwise
+    """
+
+    def __init__(self, returns, log_growth, compound=True):
+
+        self.dates = returns.index
+        self.columns = returns.columns if isinstance(returns, pd.DataFrame) else None
+        self.compound = compound
+
+        values = returns.values.reshape((len(returns), -1)).astype(np.float64)
+        notnull = ~np.isnan(values)
+        num_rows, num_cols = values.shape
+        zeros = np.zeros((1, num_cols))
+
+        # Shift each column by its mean before accumulating, so that the
+        # squared sums stay small and the variance doesn't suffer from
+        # cancellation
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self._shifts = np.where(
+                notnull.any(axis=0), np.nansum(values, axis=0)/notnull.sum(axis=0), 0)
+        shifted = np.where(notnull, values - self._shifts, 0)
+        self._counts = np.concatenate((zeros, notnull.cumsum(axis=0)))
+        self._sums = np.concatenate((zeros, shifted.cumsum(axis=0)))
+        self._sq_sums = np.concatenate((zeros, (shifted * shifted).cumsum(axis=0)))
+        del shifted
+
+        log_growth = log_growth.values.reshape((num_rows, -1)).astype(np.float64)
+        self._log_growth = np.concatenate((zeros, log_growth))
+
+        self._tree_size = 1
+        while self._tree_size < num_rows:
+            self._tree_size *= 2
+        self._tree = None
+        if compound:
+            self._tree = self._build_tree(np.where(notnull, log_growth, np.nan))
+
+    def _build_tree(self, log_growth):
+        """
+        Builds the segment tree of (high, low, deepest fall) over the log
+        growth, one level at a time. Null rows (and the padding) are neutral.
+        """
+        size = self._tree_size
+        num_cols = log_growth.shape[1]
+        highs = np.full((2 * size, num_cols), -np.inf)
+        lows = np.full((2 * size, num_cols), np.inf)
+        falls = np.full((2 * size, num_cols), np.inf)
+
+        notnull = ~np.isnan(log_growth)
+        leaves = slice(size, size + len(log_growth))
+        highs[leaves] = np.where(notnull, log_growth, -np.inf)
+        lows[leaves] = np.where(notnull, log_growth, np.inf)
+        falls[leaves] = np.where(notnull, 0, np.inf)
+
+        level = size // 2
+        while level:
+            parents = slice(level, 2 * level)
+            left = slice(2 * level, 4 * level, 2)
+            right = slice(2 * level + 1, 4 * level, 2)
+            highs[parents], lows[parents], falls[parents] = _merge(
+                (highs[left], lows[left], falls[left]),
+                (highs[right], lows[right], falls[right]))
+            level //= 2
+
+        return highs, lows, falls
+
+    def _to_timestamps(self, dates, default):
+        """
+        Converts the window bounds to Timestamps, in the timezone of the
+        index.
+        """
+        timestamps = []
+        for date in dates:
+            if date is None:
+                timestamps.append(default)
+                continue
+            date = pd.Timestamp(date)
+            if self.dates.tz is not None and date.tz is None:
+                date = date.tz_localize(self.dates.tz)
+            timestamps.append(date)
+        return pd.DatetimeIndex(timestamps)
+
+    def _max_drawdowns(self, firsts, stops):
+        """
+        Queries the segment tree for the deepest fall of each window of rows
+        [first, stop), for all windows at once.
+        """
+        highs, lows, falls = self._tree
+        num_windows, num_cols = len(firsts), highs.shape[1]
+        neutral = (
+            np.full((num_windows, num_cols), -np.inf),
+            np.full((num_windows, num_cols), np.inf),
+            np.full((num_windows, num_cols), np.inf))
+        left = right = neutral
+
+        lo = firsts + self._tree_size
+        hi = stops + self._tree_size
+        last_node = len(highs) - 1
+        while (lo < hi).any():
+            active = lo < hi
+            take_left = active & (lo % 2 == 1)
+            take_right = active & (hi % 2 == 1)
+            hi = np.where(take_right, hi - 1, hi)
+
+            # windows which take no node this level gather a valid dummy
+            node_positions = np.minimum(lo, last_node)
+            node = (highs[node_positions], lows[node_positions], falls[node_positions])
+            merged = _merge(left, node)
+            left = tuple(np.where(take_left[:, None], new, old) for new, old in zip(merged, left))
+
+            node_positions = np.minimum(hi, last_node)
+            node = (highs[node_positions], lows[node_positions], falls[node_positions])
+            merged = _merge(node, right)
+            right = tuple(np.where(take_right[:, None], new, old) for new, old in zip(merged, right))
+
+            lo = np.where(take_left, lo + 1, lo) // 2
+            hi = hi // 2
+
+        _, _, falls = _merge(left, right)
+        return np.where(np.isinf(falls), np.nan, np.expm1(falls))
+
+    def query(self, starts, ends, riskfree=0, periods_per_year=252):
+        """
+        Computes the CAGR, Sharpe, annual volatility and max drawdown over
+        each date window (inclusive).
+
+        The statistics match those of DailyPerformance.between(start, end):
+        CAGR as computed by period_cagr, and Sharpe, annual volatility and max
+        drawdown as computed by sharpe, summary_stats and max_drawdown.
+
+        Parameters
+        ----------
+        starts : list of str or datetime, required
+            the first date of each window. None means the first date
+
+        ends : list of str or datetime, required
+            the last date of each window. None means the last date
+
+        riskfree : float, optional
+            the risk-free rate (default 0)
+
+        periods_per_year : int, optional
+            the number of return periods per year (default 252)
+
+        Returns
+        -------
+        DataFrame
+            a row per window (and column of the returns), indexed by Start
+            and End, and a column per statistic (see RANGE_STATS). Windows
+            without dates have null statistics
+        """
+        if len(starts) != len(ends):
+            raise MoonchartError("starts and ends must have the same length")
+
+        starts = self._to_timestamps(starts, self.dates[0])
+        ends = self._to_timestamps(ends, self.dates[-1])
+        firsts = self.dates.searchsorted(starts, side="left")
+        stops = self.dates.searchsorted(ends, side="right")
+        stops = np.maximum(stops, firsts)
+        is_empty = (stops == firsts)[:, None]
+
+        # Mean and std from the prefix sums (ddof=1)
+        counts = self._counts[stops] - self._counts[firsts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shifted_means = (self._sums[stops] - self._sums[firsts])/counts
+            sq_deviations = (self._sq_sums[stops] - self._sq_sums[firsts]) - counts * shifted_means**2
+            stds = np.sqrt(np.maximum(sq_deviations, 0)/(counts - 1))
+            excess_means = shifted_means + self._shifts - riskfree
+            annualization = np.sqrt(periods_per_year)
+            sharpes = np.where(excess_means == 0, 0, excess_means/stds * annualization)
+            volatilities = stds * annualization
+
+        # CAGR from the growth between the row before the window and its
+        # last row, over the window's calendar days
+        growth = self._log_growth[stops] - self._log_growth[firsts]
+        last_positions = np.maximum(stops - 1, firsts)
+        days = np.asarray(
+            (self.dates[np.minimum(last_positions, len(self.dates) - 1)]
+             - self.dates[np.minimum(firsts, len(self.dates) - 1)]).days)
+        years = (np.where(days == 0, 1, days)/365.0)[:, None]
+        cagrs = np.expm1(growth/years) if self.compound else growth/years
+
+        if self._tree is not None:
+            max_drawdowns = self._max_drawdowns(firsts, stops)
+        else:
+            max_drawdowns = np.full(growth.shape, np.nan)
+
+        stats = [
+            np.where(is_empty, np.nan, values)
+            for values in (cagrs, sharpes, volatilities, max_drawdowns)]
+
+        if self.columns is None:
+            index = pd.MultiIndex.from_arrays([starts, ends], names=["Start", "End"])
+            return pd.DataFrame(
+                np.column_stack([values[:, 0] for values in stats]),
+                index=index, columns=RANGE_STATS)
+
+        num_cols = len(self.columns)
+        index = pd.MultiIndex.from_arrays(
+            [starts.repeat(num_cols), ends.repeat(num_cols),
+             np.tile(self.columns.values, len(starts))],
+            names=["Start", "End", self.columns.name or "Column"])
+        return pd.DataFrame(
+            np.column_stack([values.reshape(-1) for values in stats]),
+            index=index, columns=RANGE_STATS)
+
+    @property
+    def nbytes(self):
+        """
+        The memory held by the index.
+        """
+        arrays = [self._counts, self._sums, self._sq_sums, self._log_growth]
+        if self._tree is not None:
+            arrays.extend(self._tree)
+        return sum(array.nbytes for array in arrays)
@@ -0,0 +1,293 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+from .exceptions import MoonchartError
+
+def _level_codes(index, level):
+    """
+    Returns the integer codes of a level of a MultiIndex, as an array.
+
+    MultiIndex.codes was named MultiIndex.labels before pandas 0.24.
+    """
+    codes = index.codes if hasattr(index, "codes") else index.labels
+    return np.asarray(codes[level])
+
+class FieldStore(object):
+    """
+    Columnar storage for the fields of a backtest (Return, NetExposure,
+    Commission, etc.) sharing one date index and one column index.
+
+    The fields are held in a single (field x date x column) array. In
+    memory, each column of each field is contiguous, which is how pandas
+    lays out DataFrame blocks, so the DataFrames returned by frame() are
+    views of the store rather than copies, and kernels can operate on
+    several fields at once through the data attribute.
+
+    Parameters
+    ----------
+    data : ndarray, required
+        a 3-d array of shape (fields, dates, columns)
+
+    fields : list of str, required
+        the field names, in the order of the first axis of data
+
+    index : DatetimeIndex, required
+        the dates, shared by all fields
+
+    columns : Index, required
+        the columns (strategies or securities), shared by all fields
+    """
+
+    def __init__(self, data, fields, index, columns):
+        self.data = data
+        self.fields = list(fields)
+        self.index = index
+        self.columns = columns
+
+    @classmethod
+    def from_results(cls, results, fields=None, dtype=None):
+        """
+        Creates a FieldStore from a backtest results DataFrame with a
+        (Field, Date) MultiIndex.
+
+        If the rows of each field are contiguous and the fields share the
+        same dates in the same order (as in Moonshot and PNL results), the
+        store is a reshaped view of the DataFrame's values, so nothing is
+        copied unless fields or dtype require it.
+
+        Parameters
+        ----------
+        results : DataFrame, required
+            backtest results with a (Field, Date) MultiIndex
+
+        fields : list of str, optional
+            only store these fields, if present. Default is all fields
+
+        dtype : str or numpy dtype, optional
+            store the fields as this dtype. Default is the dtype of the
+            DataFrame's values
+
+        Returns
+        -------
+        FieldStore or None
+            None if the fields don't share the same dates, in which case
+            they must be sliced out of the results one by one
+        """
+        index = results.index
+        field_level = index.names.index("Field")
+        date_level = index.names.index("Date")
+
+        num_rows = len(index)
+        field_codes = _level_codes(index, field_level)
+        num_fields = len(pd.unique(field_codes))
+        if not num_fields or num_rows % num_fields:
+            return None
+        num_dates = num_rows // num_fields
+
+        field_codes = field_codes.reshape((num_fields, num_dates))
+        date_codes = _level_codes(index, date_level).reshape((num_fields, num_dates))
+        if (
+            (field_codes != field_codes[:, :1]).any()
+            or len(np.unique(field_codes[:, 0])) != num_fields
+            or (date_codes != date_codes[:1]).any()):
+            return None
+
+        all_fields = index.levels[field_level][field_codes[:, 0]]
+        dates = index.levels[date_level][date_codes[0]].rename("Date")
+
+        # The values of a single-dtype DataFrame are the transpose of a
+        # (column x row) block, so this reshape is a view
+        values = results.values.T.reshape((len(results.columns), num_fields, num_dates))
+
+        if fields is not None:
+            keep = [i for i, field in enumerate(all_fields) if field in fields]
+            if len(keep) < num_fields:
+                values = values[:, keep]
+                all_fields = all_fields[keep]
+
+        if dtype is not None:
+            values = values.astype(dtype, copy=False)
+
+        return cls(values.transpose((1, 2, 0)), all_fields, dates, results.columns)
+
+    @classmethod
+    def from_csv(cls, filepath_or_buffer, fields, chunksize=10000, dtype=None):
+        """
+        Creates a FieldStore from a backtest results CSV in the long (Field,
+        Date) layout, reading it in chunks so that the whole CSV is never in
+        memory at once.
+
+        The CSV is read twice: first only the Field column, to count the
+        dates of each field, then in full, copying the rows of the wanted
+        fields from each chunk into arrays preallocated from the counts and
+        discarding the other rows. Peak memory is therefore about the size of
+        the stored fields plus one chunk.
+
+        Parameters
+        ----------
+        filepath_or_buffer : str or file-like object, required
+            filepath or file-like object of the CSV. A file-like object must
+            be seekable
+
+        fields : list of str, required
+            the fields to store, if present
+
+        chunksize : int, optional
+            the number of CSV rows to parse at a time (default 10000)
+
+        dtype : str or numpy dtype, optional
+            store the fields as this dtype (default float64)
+
+        Returns
+        -------
+        FieldStore
+        """
+        dtype = np.dtype(dtype or np.float64)
+        is_buffer = not isinstance(filepath_or_buffer, str)
+        if is_buffer:
+            if not filepath_or_buffer.seekable():
+                raise MoonchartError("reading a CSV in chunks requires a filepath or a seekable file-like object")
+            start = filepath_or_buffer.tell()
+
+        def read_csv(**kwargs):
+            if is_buffer:
+                filepath_or_buffer.seek(start)
+            return pd.read_csv(filepath_or_buffer, **kwargs)
+
+        header = read_csv(nrows=0)
+        if "Time" in header.columns:
+            raise MoonchartError("intraday results can't be read in chunks, please omit chunksize")
+        columns = header.columns.drop(["Field", "Date"])
+
+        # First pass: count the dates of each field
+        counts = pd.Series(0, index=fields)
+        for chunk in read_csv(usecols=["Field"], chunksize=chunksize):
+            chunk_counts = chunk["Field"].value_counts()
+            counts = counts.add(chunk_counts.reindex(fields, fill_value=0))
+        stored_fields = [field for field in fields if counts[field]]
+        if len(counts[stored_fields].unique()) > 1:
+            raise MoonchartError(
+                "can't read CSV in chunks because the fields have different numbers of dates "
+                "({0}), please omit chunksize".format(
+                    ", ".join("{0}: {1}".format(field, counts[field]) for field in stored_fields)))
+        num_dates = int(counts[stored_fields].iloc[0]) if stored_fields else 0
+
+        # Second pass: copy each chunk's rows into the preallocated arrays. The
+        # arrays are allocated (field x column x date) so each column is
+        # contiguous, as FieldStore expects
+        data = np.empty((len(stored_fields), len(columns), num_dates), dtype=dtype)
+        dates = np.empty((len(stored_fields), num_dates), dtype="datetime64[ns]")
+        positions = [0] * len(stored_fields)
+        for chunk in read_csv(chunksize=chunksize):
+            chunk = chunk[chunk["Field"].isin(stored_fields)]
+            for i, field in enumerate(stored_fields):
+                rows = chunk[chunk["Field"] == field]
+                if rows.empty:
+                    continue
+                start_position = positions[i]
+                end_position = positions[i] = start_position + len(rows)
+                data[i, :, start_position:end_position] = rows[columns].values.T
+                dates[i, start_position:end_position] = pd.to_datetime(rows["Date"]).values
+
+        if (dates != dates[:1]).any():
+            raise MoonchartError("can't read CSV in chunks because the fields have different dates, please omit chunksize")
+
+        index = pd.DatetimeIndex(dates[0] if stored_fields else [], name="Date")
+        return cls(data.transpose((0, 2, 1)), stored_fields, index, columns)
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def frame(self, field):
+        """
+        Returns a DataFrame of the field, which is a view of the store.
+
+        Parameters
+        ----------
+        field : str, required
+            the field name
+
+        Returns
+        -------
+        DataFrame
+        """
+        if field not in self.fields:
+            raise KeyError(field)
+        values = self.data[self.fields.index(field)]
+        return pd.DataFrame(values, index=self.index, columns=self.columns, copy=False)
+
+class GrowableArray(object):
+    """
+    A 2-d (date x column) array which new dates can be appended to without
+    copying the existing dates each time: the capacity doubles whenever it
+    runs out, so appending is amortized O(new rows).
+
+    Like FieldStore, each column is contiguous in memory, so DataFrames
+    constructed from the values attribute are views.
+
+    Parameters
+    ----------
+    values : ndarray, required
+        the initial 2-d values
+
+    capacity : int, optional
+        the number of rows to allocate. Default is twice the initial rows
+    """
+
+    def __init__(self, values, capacity=None):
+        num_rows, num_cols = values.shape
+        capacity = max(capacity or 2 * num_rows, num_rows, 1)
+        self._buffer = np.empty((num_cols, capacity), dtype=values.dtype)
+        self._buffer[:, :num_rows] = values.T
+        self._num_rows = num_rows
+
+    def __len__(self):
+        return self._num_rows
+
+    @property
+    def capacity(self):
+        return self._buffer.shape[1]
+
+    @property
+    def values(self):
+        return self._buffer[:, :self._num_rows].T
+
+    def append(self, values):
+        """
+        Appends rows, reallocating with double the capacity if needed.
+
+        Parameters
+        ----------
+        values : ndarray, required
+            a 2-d array of rows to append
+
+        Returns
+        -------
+        None
+        """
+        num_rows = self._num_rows + len(values)
+        if num_rows > self.capacity:
+            buffer = np.empty(
+                (self._buffer.shape[0], max(num_rows, 2 * self.capacity)),
+                dtype=self._buffer.dtype)
+            buffer[:, :self._num_rows] = self._buffer[:, :self._num_rows]
+            self._buffer = buffer
+        self._buffer[:, self._num_rows:num_rows] = values.T
+        self._num_rows = num_rows
@@ -20,9 +20,8 @@ import matplotlib.pyplot as plt
 from matplotlib.font_manager import FontProperties
 import math
 import warnings
-import empyrical as ep
-import scipy.stats
 from .perf import DailyPerformance, AggregateDailyPerformance
+from .diskcache import DiskCache
 from .base import BaseTearsheet
 from .exceptions import MoonchartError
 from .utils import (
@@ -41,7 +40,8 @@ class Tearsheet(BaseTearsheet):
     def from_moonshot_csv(cls, filepath_or_buffer, figsize=None,
                           max_cols_for_details=25, trim_outliers=None,
                           pdf_filename=None, riskfree=0,
-                          compound=True, rolling_sharpe_window=200):
+                          compound=True, rolling_sharpe_window=200,
+                          cache_dir=None):
         """
         Create a full tear sheet from a moonshot backtest results CSV.
 
@@ -76,6 +76,14 @@ class Tearsheet(BaseTearsheet):
         rolling_sharpe_window : int, optional
             compute rolling Sharpe over this many periods (default 200)
 
+        cache_dir : str, optional
+            cache the parsed results and the statistics derived from them in
+            this directory, keyed by the content of the CSV and the above
+            parameters (other than figsize, max_cols_for_details and
+            pdf_filename), so that re-rendering the same CSV skips parsing
+            and computation. The least recently used entries are evicted
+            when the cache exceeds 1 GB. Default is not to cache
+
         Returns
         -------
         None
@@ -85,18 +93,28 @@ class Tearsheet(BaseTearsheet):
         >>> from moonshot import Tearsheet
         >>> Tearsheet.from_moonshot_csv("backtest_results.csv")
         """
-        perf = DailyPerformance.from_moonshot_csv(
-            filepath_or_buffer,
-            trim_outliers=trim_outliers,
-            riskfree=riskfree,
-            compound=compound,
-            rolling_sharpe_window=rolling_sharpe_window)
+        def load_performance():
+            return DailyPerformance.from_moonshot_csv(
+                filepath_or_buffer,
+                trim_outliers=trim_outliers,
+                riskfree=riskfree,
+                compound=compound,
+                rolling_sharpe_window=rolling_sharpe_window)
 
         t = cls(figsize=figsize,
                 max_cols_for_details=max_cols_for_details,
                 pdf_filename=pdf_filename)
 
-        return t.create_full_tearsheet(perf)
+        if cache_dir:
+            return t._create_cached_full_tearsheet(
+                cache_dir, filepath_or_buffer, load_performance,
+                source="moonshot",
+                trim_outliers=trim_outliers,
+                riskfree=riskfree,
+                compound=compound,
+                rolling_sharpe_window=rolling_sharpe_window)
+
+        return t.create_full_tearsheet(load_performance())
 
     def _from_pnl(self, results, trim_outliers=None,
                   riskfree=0, compound=True,
@@ -117,7 +135,8 @@ class Tearsheet(BaseTearsheet):
     def from_pnl_csv(cls, filepath_or_buffer, figsize=None,
                      max_cols_for_details=25, trim_outliers=None,
                      pdf_filename=None, riskfree=0,
-                     compound=True, rolling_sharpe_window=200):
+                     compound=True, rolling_sharpe_window=200,
+                     cache_dir=None):
         """
         Create a full tear sheet from a pnl CSV.
 
@@ -151,22 +170,75 @@ class Tearsheet(BaseTearsheet):
         rolling_sharpe_window : int, optional
             compute rolling Sharpe over this many periods (default 200)
 
+        cache_dir : str, optional
+            cache the parsed results and the statistics derived from them in
+            this directory, keyed by the content of the CSV and the above
+            parameters (other than figsize, max_cols_for_details and
+            pdf_filename), so that re-rendering the same CSV skips parsing
+            and computation. The least recently used entries are evicted
+            when the cache exceeds 1 GB. Default is not to cache
+
         Returns
         -------
         None
         """
-        results = pd.read_csv(filepath_or_buffer,
-                              parse_dates=["Date"],
-                              index_col=["Field","Date"])
-
         t = cls(figsize=figsize,
                 max_cols_for_details=max_cols_for_details,
                 pdf_filename=pdf_filename)
 
+        if cache_dir:
+            def load_performance():
+                results = pd.read_csv(filepath_or_buffer,
+                                      parse_dates=["Date"],
+                                      index_col=["Field","Date"])
+                return DailyPerformance._from_pnl(
+                    results,
+                    trim_outliers=trim_outliers,
+                    riskfree=riskfree,
+                    compound=compound,
+                    rolling_sharpe_window=rolling_sharpe_window)
+
+            return t._create_cached_full_tearsheet(
+                cache_dir, filepath_or_buffer, load_performance,
+                source="pnl",
+                trim_outliers=trim_outliers,
+                riskfree=riskfree,
+                compound=compound,
+                rolling_sharpe_window=rolling_sharpe_window)
+
+        results = pd.read_csv(filepath_or_buffer,
+                              parse_dates=["Date"],
+                              index_col=["Field","Date"])
+
         return t._from_pnl(results, trim_outliers=trim_outliers, riskfree=riskfree,
             compound=compound, rolling_sharpe_window=rolling_sharpe_window)
 
-    def create_full_tearsheet(self, performance):
+    def _create_cached_full_tearsheet(self, cache_dir, filepath_or_buffer,
+                                      load_performance, **params):
+        """
+        Creates a full tear sheet, loading the performance from the disk cache
+        if the file was already loaded with the same parameters, or else
+        loading it with load_performance and caching it (along with the
+        derived values computed while rendering) afterwards.
+        """
+        cache = DiskCache(cache_dir)
+        key = cache.make_key(filepath_or_buffer, **params)
+        cached = cache.get(key) if key else None
+        if cached is not None:
+            performance, agg_performance = cached
+            performance._aggregates.add(agg_performance)
+        else:
+            performance = load_performance()
+            agg_performance = AggregateDailyPerformance(performance)
+
+        result = self.create_full_tearsheet(performance, agg_performance)
+
+        if key and cached is None:
+            cache.put(key, (performance, agg_performance))
+
+        return result
+
+    def create_full_tearsheet(self, performance, agg_performance=None):
         """
         Create a full tear sheet of performance results including returns
         plots, returns by year plots, and position-related plots.
@@ -176,6 +248,10 @@ class Tearsheet(BaseTearsheet):
         performance : instance
             a DailyPerformance instance
 
+        agg_performance : AggregateDailyPerformance, optional
+            an AggregateDailyPerformance instance. Constructed from performance
+            if not provided.
+
         Returns
         -------
         None
@@ -191,7 +267,8 @@ class Tearsheet(BaseTearsheet):
         --------
         Tearsheet.from_moonshot_csv : create a full tear sheet from a Moonshot CSV
         """
-        agg_performance = AggregateDailyPerformance(performance)
+        if agg_performance is None:
+            agg_performance = AggregateDailyPerformance(performance)
 
         num_cols = len(performance.returns.columns)
         if num_cols > self.max_cols_for_details:
@@ -251,32 +328,54 @@ class Tearsheet(BaseTearsheet):
 
         stats.append(['Total Months', int(len(agg_performance.returns) / 22)])
 
+        summary_stats = agg_performance.summary_stats
         stats.append(["", " Risk and Returns"])
-        stats.append(["CAGR", "{0}%".format(round(agg_performance.cagr * 100, 1))])
+        stats.append(["CAGR", "{0}%".format(round(summary_stats["CAGR"] * 100, 1))])
         stats.append([
             "Sharpe Ratio",
-            '%.2f' % agg_performance.sharpe])
+            '%.2f' % summary_stats["Sharpe"]])
         stats.append([
             "Max Drawdown",
-            "{0}%".format(round(agg_performance.max_drawdown * 100, 1))])
+            "{0}%".format(round(summary_stats["MaxDrawdown"] * 100, 1))])
+        longest_drawdown = agg_performance.drawdown_periods.Duration.max()
+        stats.append([
+            "Longest Drawdown",
+            "{0} days".format(longest_drawdown.days if pd.notnull(longest_drawdown) else 0)])
         stats.append([
             "Cumulative Return",
-            "{0}%".format(round(ep.cum_returns_final(agg_performance.returns) * 100, 1))])
+            "{0}%".format(round(summary_stats["CumulativeReturn"] * 100, 1))])
         stats.append([
             "Annual Volatility",
-            "{0}%".format(round(ep.annual_volatility(agg_performance.returns) * 100, 1))])
+            "{0}%".format(round(summary_stats["AnnualVolatility"] * 100, 1))])
         stats.append([
             "Sortino Ratio",
-            '%.2f' % ep.sortino_ratio(agg_performance.returns)])
+            '%.2f' % summary_stats["Sortino"]])
         stats.append([
             "Calmar Ratio",
-            '%.2f' % ep.calmar_ratio(agg_performance.returns)])
+            '%.2f' % summary_stats["Calmar"]])
         stats.append([
             "Skew",
-            '%.2f' % scipy.stats.skew(agg_performance.returns)])
+            '%.2f' % summary_stats["Skew"]])
         stats.append([
             "Kurtosis",
-            '%.2f' % scipy.stats.kurtosis(agg_performance.returns)])
+            '%.2f' % summary_stats["Kurtosis"]])
+
+        benchmark_stats = agg_performance.benchmark_stats
+        if benchmark_stats is not None:
+            stats.append(["", " Benchmark"])
+            stats.append(["Beta", '%.2f' % benchmark_stats["Beta"]])
+            stats.append(["Alpha", "{0}%".format(round(benchmark_stats["Alpha"] * 100, 1))])
+            stats.append(["Correlation", '%.2f' % benchmark_stats["Correlation"]])
+            stats.append([
+                "Tracking Error",
+                "{0}%".format(round(benchmark_stats["TrackingError"] * 100, 1))])
+            stats.append(["Information Ratio", '%.2f' % benchmark_stats["InformationRatio"]])
+            stats.append(["Up Capture", "{0}%".format(round(benchmark_stats["UpCapture"] * 100, 1))])
+            stats.append(["Down Capture", "{0}%".format(round(benchmark_stats["DownCapture"] * 100, 1))])
+
+        # the position fields are all used below, so aggregate them in one pass
+        agg_performance.aggregate(
+            "abs_exposures", "net_exposures", "total_holdings", "turnover")
 
         if any([field is not None for field in (
             agg_performance.abs_exposures,
@@ -311,7 +410,7 @@ class Tearsheet(BaseTearsheet):
                 "{0}%".format(round(avg_daily_turnover * 100, 1))])
 
         if agg_performance.abs_exposures is not None:
-            norm_cagr = agg_performance.cagr / avg_abs_exposures
+            norm_cagr = summary_stats["CAGR"] / avg_abs_exposures
             stats.append([
                 "Normalized CAGR (CAGR/Absolute Exposure)",
                 "{0}%".format(round(norm_cagr * 100, 1))])
@@ -385,8 +484,9 @@ class Tearsheet(BaseTearsheet):
         Create a tear sheet of returns-related plots.
 
         The included plots depend on what is present in the performance data.
-        Always plots cumulative returns, drawdowns, and rolling Sharpe. Plots
-        cumulative returns vs benchmark if benchmark is present. Plots
+        Always plots cumulative returns, drawdowns, rolling Sharpe, and
+        rolling volatility. Plots cumulative returns vs benchmark, and
+        rolling beta and correlation, if benchmark is present. Plots
         cumulative PNL if PNL is present. For multi-column performance
         data (multi-strategy or detailed single-strategy), plots bar
         charts of Sharpe, CAGR, and PNL if present.
@@ -446,26 +546,60 @@ class Tearsheet(BaseTearsheet):
             axis = fig.add_subplot(2,2,1)
             axis.set_ylabel("CAGR")
             self._y_format_as_percentage(axis)
-            cagr = performance.cagr.copy()
+            summary_stats = performance.summary_stats
+            cagr = summary_stats["CAGR"].copy()
             cagr.index = cagr.index.astype(str).str.wrap(10)
             cagr.plot(ax=axis, kind="bar", title="CAGR (Details)")
 
             axis = fig.add_subplot(2,2,2)
             self._y_format_at_least_two_decimal_places(axis)
             axis.set_ylabel("Sharpe ratio")
-            sharpe = performance.sharpe.copy()
+            sharpe = summary_stats["Sharpe"].copy()
             sharpe.index = sharpe.index.astype(str).str.wrap(10)
             sharpe.plot(ax=axis, kind="bar", title="Sharpe (Details)")
 
             axis = fig.add_subplot(2,2,3)
             axis.set_ylabel("Drawdown")
             self._y_format_as_percentage(axis)
-            max_drawdowns = performance.max_drawdown.copy()
+            max_drawdowns = summary_stats["MaxDrawdown"].copy()
             max_drawdowns.index = max_drawdowns.index.astype(str).str.wrap(10)
             max_drawdowns.plot(ax=axis, kind="bar", title="Max drawdown (Details)")
 
         fig.tight_layout()
 
+        benchmark_stats = performance.benchmark_stats
+        if benchmark_stats is not None:
+            benchmark_stats = benchmark_stats.copy()
+            benchmark_stats.index = benchmark_stats.index.astype(str).str.wrap(10)
+
+            fig = plt.figure("Benchmark (Details)", figsize=self.figsize)
+
+            with sns.color_palette(color_palette):
+
+                axis = fig.add_subplot(2,2,1)
+                self._y_format_at_least_two_decimal_places(axis)
+                axis.set_ylabel("Beta")
+                benchmark_stats["Beta"].plot(ax=axis, kind="bar", title="Beta (Details)")
+
+                axis = fig.add_subplot(2,2,2)
+                axis.set_ylabel("Alpha")
+                self._y_format_as_percentage(axis)
+                benchmark_stats["Alpha"].plot(ax=axis, kind="bar", title="Alpha (Details)")
+
+                axis = fig.add_subplot(2,2,3)
+                self._y_format_at_least_two_decimal_places(axis)
+                axis.set_ylabel("Information ratio")
+                benchmark_stats["InformationRatio"].plot(
+                    ax=axis, kind="bar", title="Information ratio (Details)")
+
+            axis = fig.add_subplot(2,2,4)
+            axis.set_ylabel("Capture")
+            self._y_format_as_percentage(axis)
+            benchmark_stats[["UpCapture", "DownCapture"]].plot(
+                ax=axis, kind="bar", title="Up and down capture (Details)")
+
+            fig.tight_layout()
+
         if performance.pnl is not None:
             fig = plt.figure("PNL (Details)", figsize=self.figsize)
             axis = fig.add_subplot(111)
@@ -644,7 +778,7 @@ class Tearsheet(BaseTearsheet):
                 axis.set_ylabel("Percentage of capital")
 
             if performance.abs_exposures is not None:
-                norm_cagrs = performance.cagr / avg_abs_exposures
+                norm_cagrs = performance.summary_stats["CAGR"] / avg_abs_exposures
                 axis = fig.add_subplot(rows,2,next_pos)
                 next_pos += 1
                 self._y_format_as_percentage(axis)
@@ -12,8 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import warnings
 import pandas as pd
 import numpy as np
+from .exceptions import MoonchartError
+from .backends import get_backend
+
+def _like(data, values, index=None):
+    """
+    Wraps an array of values computed from a Series or DataFrame in a
+    Series or DataFrame with the same labels.
+    """
+    if index is None:
+        index = data.index
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(values, index=index, columns=data.columns)
+    else:
+        return pd.Series(values, index=index, name=data.name)
 
 def get_zscores(returns):
     """
@@ -29,9 +44,32 @@ def get_zscores(returns):
     Series or DataFrame
     """
     # Ignore 0 returns in calculating z score
-    nonzero_returns = returns.where(returns != 0)
-    z_scores = (nonzero_returns - nonzero_returns.mean())/nonzero_returns.std()
-    return z_scores
+    z_scores = get_backend().zscores(returns.values)
+    return _like(returns, z_scores)
+
+def get_max_zscore(returns):
+    """
+    Returns the largest absolute Z-score of the input returns, without
+    computing the Z-score of every return.
+
+    Like get_zscores, 0 returns are ignored.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        Series or DataFrame of returns
+
+    Returns
+    -------
+    float
+    """
+    values = returns.values
+    if values.ndim == 1:
+        values = values.reshape((-1, 1))
+    max_zscores = get_backend().max_zscores(values)
+    if np.isnan(max_zscores).all():
+        return np.nan
+    return np.nanmax(max_zscores)
 
 def trim_outliers(returns, z_score):
     """
@@ -50,8 +88,8 @@ def trim_outliers(returns, z_score):
     -------
     Series or DataFrame
     """
-    z_scores = get_zscores(returns)
-    return returns.where(z_scores.abs() <= z_score, 0)
+    z_scores = get_backend().zscores(returns.values)
+    return returns.where(np.abs(z_scores) <= z_score, 0)
 
 def with_baseline(data, value=1):
     """
@@ -102,7 +140,7 @@ def with_baseline(data, value=1):
         data_with_baseline = pd.concat((baseline_row, data))
     return data_with_baseline
 
-def get_sharpe(returns, riskfree=0):
+def get_sharpe(returns, riskfree=0, periods_per_year=252):
     """
     Returns the Sharpe ratio of the returns.
 
@@ -114,21 +152,60 @@ def get_sharpe(returns, riskfree=0):
     riskfree : float, optional
         the risk-free rate (default 0)
 
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize the Sharpe
+        ratio (default 252, for daily returns)
+
     Returns
     -------
     float or Series of floats
     """
-    mean = (returns - riskfree).mean()
+    # compute the moments in float64 even if the returns are stored as float32
+    excess_returns = returns.astype(np.float64, copy=False) - riskfree
+    mean = excess_returns.mean()
     if isinstance(mean, float) and mean == 0:
         return 0
-    std = (returns - riskfree).std()
-    # Returns are assumed to represent daily returns, so annualize the Sharpe ratio
-    return mean/std * np.sqrt(252)
+    std = excess_returns.std()
+    return mean/std * np.sqrt(periods_per_year)
 
-def get_rolling_sharpe(returns, window, riskfree=0):
+def _moments(values):
+    """
+    Returns the count, mean, and sum of squared deviations from the mean of
+    each column of a 2-d array, ignoring nulls.
+    """
+    counts = (~np.isnan(values)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(values, axis=0, dtype=np.float64)/counts
+    sq_deviations = np.nansum(np.square(values - means, dtype=np.float64), axis=0)
+    return counts, means, sq_deviations
+
+def _merge_moments(moments, other_moments):
+    """
+    Combines the moments (as returned by _moments) of two sets of rows into
+    the moments of their union, without revisiting the rows.
+    """
+    counts_a, means_a, sq_deviations_a = moments
+    counts_b, means_b, sq_deviations_b = other_moments
+    # empty columns have null moments, but contribute nothing
+    means_a = np.where(counts_a > 0, means_a, 0)
+    means_b = np.where(counts_b > 0, means_b, 0)
+    sq_deviations_a = np.where(counts_a > 0, sq_deviations_a, 0)
+    sq_deviations_b = np.where(counts_b > 0, sq_deviations_b, 0)
+    counts = counts_a + counts_b
+    deltas = means_b - means_a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = means_a + deltas * counts_b/counts
+        sq_deviations = sq_deviations_a + sq_deviations_b + deltas**2 * counts_a * counts_b/counts
+    return counts, means, sq_deviations
+
+def get_rolling_sharpe(returns, window, riskfree=0, periods_per_year=252):
     """
     Computes rolling Sharpe ratios for the returns.
 
+    Uses running sums of returns and squared returns, so the cost is linear
+    in the number of rows regardless of the window length. Missing returns
+    are treated as 0.
+
     Parameters
     ----------
     returns : Series or DataFrame, required
@@ -140,19 +217,95 @@ def get_rolling_sharpe(returns, window, riskfree=0):
     riskfree : float, optional
         the risk-free rate (default 0)
 
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize the Sharpe
+        ratio (default 252, for daily returns)
+
     Returns
     -------
     Series or DataFrame
     """
-    rolling_returns = returns.fillna(0).rolling(window, min_periods=window)
-    try:
-        return rolling_returns.apply(get_sharpe, raw=True, kwargs=dict(riskfree=riskfree))
-    except TypeError as e:
-        # handle pandas<0.23
-        if "apply() got an unexpected keyword argument 'raw'" in repr(e):
-            return rolling_returns.apply(get_sharpe, kwargs=dict(riskfree=riskfree))
-        else:
-            raise
+    excess_returns = returns.fillna(0).values - riskfree
+    rolling_sharpe = get_backend().rolling_sharpe(
+        excess_returns, window, periods_per_year=periods_per_year)
+    return _like(returns, rolling_sharpe)
+
+ROLLING_STATS = [
+    "Volatility",
+    "Beta",
+    "Correlation",
+    "BenchmarkVolatility",
+]
+
+def get_rolling_stats(returns, windows, benchmark_returns=None, periods_per_year=252):
+    """
+    Computes rolling annualized volatility and, if benchmark returns are
+    given, rolling beta, correlation and annualized benchmark volatility,
+    for every column and window at once.
+
+    Uses running sums of the returns, the benchmark returns, their squares
+    and their products, accumulated once and differenced for each window,
+    so the cost is linear in the number of rows regardless of the number
+    or length of the windows. Missing returns are treated as 0, and the
+    standard deviations are population standard deviations, as in
+    get_rolling_sharpe.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        a Series or DataFrame of returns
+
+    windows : list of int, required
+        rolling window lengths
+
+    benchmark_returns : Series or DataFrame, optional
+        the benchmark returns: a Series shared by all columns, or a
+        DataFrame with the same shape as the returns. If omitted, only
+        volatility is computed
+
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize the
+        volatilities (default 252)
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame indexed like the returns, with columns (Field, Window)
+        for a Series of returns or (Field, Window, column) for a DataFrame,
+        where Field is one of ROLLING_STATS
+    """
+    values = returns.fillna(0).values
+    if benchmark_returns is None:
+        benchmark_values = np.zeros(len(values))
+        fields = ROLLING_STATS[:1]
+    else:
+        benchmark_values = benchmark_returns.reindex(returns.index).fillna(0).values
+        fields = ROLLING_STATS
+
+    comoments = get_backend().rolling_comoments(values, benchmark_values, windows)
+
+    annualization = np.sqrt(periods_per_year)
+    stats = {}
+    for window, (variances, benchmark_variances, covariances) in zip(windows, comoments):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            window_stats = {
+                "Volatility": np.sqrt(variances) * annualization,
+                # constant benchmarks or returns have no defined beta or
+                # correlation
+                "Beta": np.where(
+                    benchmark_variances == 0, np.nan, covariances/benchmark_variances),
+                "Correlation": np.where(
+                    (variances == 0) | (benchmark_variances == 0), np.nan,
+                    covariances/np.sqrt(variances * benchmark_variances)),
+                "BenchmarkVolatility": np.sqrt(benchmark_variances) * annualization,
+            }
+        for field in fields:
+            stats[(field, window)] = _like(returns, window_stats[field])
+
+    # order the columns by field, then window
+    stats = [stats[(field, window)] for field in fields for window in windows]
+    keys = [(field, window) for field in fields for window in windows]
+    return pd.concat(stats, axis=1, keys=keys, names=["Field", "Window"])
 
 def get_cum_returns(returns, compound=True):
     """
@@ -171,13 +324,124 @@ def get_cum_returns(returns, compound=True):
     -------
     Series or DataFrame
     """
-    if compound:
-        cum_returns = (1 + returns).cumprod()
-    else:
-        cum_returns = returns.cumsum() + 1
+    cum_returns = get_backend().cum_returns(returns.values, compound=compound)
+    return _like(returns, cum_returns, index=returns.index.rename("Date"))
+
+def get_log_growth(returns, compound=True):
+    """
+    Computes the cumulative growth of the returns in log space, that is, the
+    running sum of log(1 + return). Unlike cumulative products, the running
+    sum doesn't underflow or overflow over long histories, and the growth
+    between any two dates is a single difference (see get_period_returns).
+
+    Nulls contribute no growth, so the value of a row with a null return is
+    that of the previous row. The result is always float64.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        a Series or DataFrame of returns
+
+    compound : bool
+        True for compounded (geometric) returns, False for arithmetic
+        returns, for which the running sum of the returns themselves is
+        returned (default True)
+
+    Returns
+    -------
+    Series or DataFrame
+
+    Examples
+    --------
+    Cumulative returns, recovered from the log growth:
+
+    >>> np.exp(get_log_growth(returns)).where(returns.notnull())
+    """
+    log_growth = get_backend().log_growth(returns.values, compound=compound)
+    return _like(returns, log_growth, index=returns.index.rename("Date"))
+
+def get_period_returns(log_growth, start=None, end=None, compound=True):
+    """
+    Returns the cumulative return between two dates (inclusive) from the
+    log growth computed by get_log_growth, in constant time per column.
+
+    Parameters
+    ----------
+    log_growth : Series or DataFrame, required
+        a Series or DataFrame of log growth
+
+    start : str or datetime, optional
+        the first date of the period. Default is the first date
+
+    end : str or datetime, optional
+        the last date of the period. Default is the last date
+
+    compound : bool
+        True if the log growth was computed for compounded (geometric)
+        returns, False for arithmetic returns (default True)
+
+    Returns
+    -------
+    float or Series of floats
+
+    Examples
+    --------
+    Return for the year 2019:
+
+    >>> get_period_returns(get_log_growth(returns), "2019-01-01", "2019-12-31")
+    """
+    growth, _ = _period_growth(log_growth, start, end)
+    return np.expm1(growth) if compound else growth
+
+def get_period_cagr(log_growth, start=None, end=None, compound=True):
+    """
+    Returns the CAGR between two dates (inclusive) from the log growth
+    computed by get_log_growth, in constant time per column.
+
+    As with get_cagr, the number of years is measured from the first to the
+    last date of the period, and the CAGR of arithmetic returns is the
+    average annual return.
+
+    Parameters
+    ----------
+    log_growth : Series or DataFrame, required
+        a Series or DataFrame of log growth
+
+    start : str or datetime, optional
+        the first date of the period. Default is the first date
+
+    end : str or datetime, optional
+        the last date of the period. Default is the last date
+
+    compound : bool
+        True if the log growth was computed for compounded (geometric)
+        returns, False for arithmetic returns (default True)
 
-    cum_returns.index.name = "Date"
-    return cum_returns
+    Returns
+    -------
+    float or Series of floats
+    """
+    growth, days = _period_growth(log_growth, start, end)
+    years = (days or 1)/365.0
+    # annualizing in log space can't overflow
+    return np.expm1(growth/years) if compound else growth/years
+
+def _period_growth(log_growth, start, end):
+    """
+    Returns the growth between two dates (inclusive) and the number of days
+    between the first and last date of the period.
+    """
+    dates = log_growth.index
+    first, last, _ = dates.slice_indexer(start, end).indices(len(dates))
+    if first >= last:
+        raise MoonchartError("no dates between {0} and {1}".format(start, end))
+    last -= 1
+    growth = log_growth.iloc[last]
+    if first > 0:
+        growth = growth - log_growth.iloc[first - 1]
+    if isinstance(growth, pd.Series):
+        growth.name = None
+    return growth, (dates[last] - dates[first]).days
 
 def get_cagr(cum_returns, compound=True):
     """
@@ -196,33 +460,50 @@ def get_cagr(cum_returns, compound=True):
     -------
     float or Series of floats
     """
-    # For DataFrames, apply this function to each Series.
     if isinstance(cum_returns, pd.DataFrame):
-        return cum_returns.apply(get_cagr, axis=0)
+        cagr = _cagr(cum_returns.values, cum_returns.index, compound=compound)
+        return pd.Series(cagr, index=cum_returns.columns)
 
-    # Ignore nulls when compting CAGR
-    cum_returns = cum_returns[cum_returns.notnull()]
+    cagr = _cagr(cum_returns.values.reshape((-1, 1)), cum_returns.index, compound=compound)
+    return cagr[0]
 
-    if cum_returns.empty:
-        return 0
+def _cagr(cum_returns, dates, compound=True):
+    """
+    Computes the CAGR of each column of a 2-d array of cumulative returns,
+    using each column's first and last non-null value and ignoring nulls.
+    Columns with no values have a CAGR of 0.
+    """
+    num_rows, num_cols = cum_returns.shape
+    if num_rows == 0:
+        return np.zeros(num_cols)
 
-    # Compute the CAGR of the Series
-    min_date = cum_returns.index.min()
-    max_date = cum_returns.index.max()
-    years = ((max_date - min_date).days or 1)/365.0
-    ending_value = cum_returns.iloc[-1]
+    notnull = ~np.isnan(cum_returns)
+    has_values = notnull.any(axis=0)
+    first_positions = notnull.argmax(axis=0)
+    last_positions = num_rows - 1 - notnull[::-1].argmax(axis=0)
+
+    days = np.asarray((dates[last_positions] - dates[first_positions]).days)
+    ending_values = cum_returns[last_positions, np.arange(num_cols)]
+    return np.where(has_values, _annualize(ending_values, days, compound=compound), 0)
+
+def _annualize(ending_values, days, compound=True):
+    """
+    Computes the CAGR from ending cumulative returns reached over the given
+    number of days (0 days is treated as 1).
+    """
+    years = np.where(days == 0, 1, days)/365.0
+    ending_values = np.asarray(ending_values, dtype=np.float64)
     # Since we are computing CAGR on cumulative returns, the beginning
     # value is always 1.
     beginning_value = 1
-    if compound:
-        cagr = (ending_value/beginning_value)**(1/years) - 1
-    else:
-        # Compound annual growth rate doesn't apply to arithmetic
-        # returns, so just divide the cum_returns by the number of years
-        # to get the annual return
-        cagr = (ending_value/beginning_value - 1)/years
-
-    return cagr
+    with np.errstate(invalid="ignore"):
+        if compound:
+            return (ending_values/beginning_value)**(1/years) - 1
+        else:
+            # Compound annual growth rate doesn't apply to arithmetic
+            # returns, so just divide the cum_returns by the number of years
+            # to get the annual return
+            return (ending_values/beginning_value - 1)/years
 
 def get_drawdowns(cum_returns):
     """
@@ -237,37 +518,499 @@ def get_drawdowns(cum_returns):
     -------
     Series or DataFrame
     """
-    cum_returns = cum_returns[cum_returns.notnull()]
-    highwater_marks = cum_returns.expanding().max()
-    drawdowns = cum_returns/highwater_marks - 1
+    drawdowns = _like(cum_returns, get_backend().drawdowns(cum_returns.values))
+
+    if isinstance(cum_returns, pd.DataFrame):
+        return drawdowns
+
+    # Null cumulative returns are dropped from a Series
+    isnull = np.isnan(cum_returns.values)
+    if isnull.any():
+        drawdowns = drawdowns[~isnull]
     return drawdowns
 
-def get_top_movers(returns, n=10):
+SUMMARY_STATS = [
+    "CAGR",
+    "Sharpe",
+    "MaxDrawdown",
+    "CumulativeReturn",
+    "AnnualVolatility",
+    "Sortino",
+    "Calmar",
+    "Skew",
+    "Kurtosis",
+]
+
+def get_summary_stats(returns, riskfree=0, compound=True, cum_returns=None,
+                      periods_per_year=252):
     """
-    Returns the biggest gainers and losers in the returns.
+    Computes summary performance statistics of the returns in one pass.
+
+    CAGR, Sharpe, and MaxDrawdown are computed as by get_cagr, get_sharpe,
+    and get_drawdowns. The remaining statistics follow empyrical and
+    scipy.stats (compounded cumulative return, Calmar based on the
+    compounded annual return, biased skew and excess kurtosis), except that
+    nulls are ignored.
 
     Parameters
     ----------
     returns : Series or DataFrame, required
         a Series or DataFrame of returns
 
-    n : int, optional
-        the number of biggest gainers and losers to return (default 10)
+    riskfree : float, optional
+        the risk-free rate (default 0)
+
+    compound : bool
+        True for compounded (geometric) returns, False for arithmetic
+        returns (default True)
+
+    cum_returns : Series or DataFrame, optional
+        the cumulative returns, if already computed with get_cum_returns
+
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize the
+        statistics (default 252, for daily returns)
 
     Returns
     -------
     Series or DataFrame
+        a Series indexed by statistic, or for DataFrames a DataFrame with a
+        row per column and a column per statistic (see SUMMARY_STATS)
+
+    Examples
+    --------
+    >>> stats = get_summary_stats(returns)
+    >>> stats["Sharpe"]
     """
+    if isinstance(returns, pd.DataFrame):
+        values = returns.values
+    else:
+        values = returns.values.reshape((-1, 1))
+
+    if cum_returns is not None:
+        cum_returns = cum_returns.values.reshape(values.shape)
+
+    stats = _summary_stats(values, returns.index, riskfree=riskfree,
+                           compound=compound, cum_returns=cum_returns,
+                           periods_per_year=periods_per_year)
 
     if isinstance(returns, pd.DataFrame):
-        returns = returns.stack()
+        return pd.DataFrame(stats, index=returns.columns, columns=SUMMARY_STATS)
+    else:
+        return pd.Series(stats[0], index=SUMMARY_STATS, name=returns.name)
 
-    returns = returns.sort_values()
+def _summary_stats(returns, dates, riskfree=0, compound=True, cum_returns=None,
+                   periods_per_year=252):
+    """
+    Computes the SUMMARY_STATS of each column of a 2-d array of returns,
+    sharing the moments and the cumulative growth path among all
+    statistics. Returns a 2-d array with a row per column.
+    """
+    num_rows = returns.shape[0]
+    notnull = ~np.isnan(returns)
+    has_nulls = not notnull.all()
+    counts = notnull.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        # Central moments
+        means = np.nansum(returns, axis=0, dtype=np.float64)/counts
+        deviations = returns - means
+        sq_deviations = deviations * deviations
+        m2 = np.nansum(sq_deviations, axis=0)/counts
+        m3 = np.nansum(sq_deviations * deviations, axis=0)/counts
+        m4 = np.nansum(sq_deviations * sq_deviations, axis=0)/counts
+        del deviations, sq_deviations
+        stds = np.sqrt(m2 * counts/(counts - 1))
+
+        excess_means = means - riskfree
+        annualization = np.sqrt(periods_per_year)
+        sharpes = np.where(excess_means == 0, 0, excess_means/stds * annualization)
+        annual_volatilities = stds * annualization
+        downside_risks = np.sqrt(
+            np.nansum(np.minimum(returns, 0)**2, axis=0, dtype=np.float64)/counts) * annualization
+        sortinos = means * periods_per_year/downside_risks
+        # scipy.stats treats (nearly) constant returns as having no skew or
+        # kurtosis
+        is_constant = m2 <= (np.finfo(np.float64).eps * means)**2
+        skews = np.where(is_constant, np.nan, m3/m2**1.5)
+        kurtoses = np.where(is_constant, np.nan, m4/m2**2 - 3)
+
+        # Cumulative growth
+        if cum_returns is None:
+            if compound:
+                cum_returns = np.cumprod(np.where(notnull, returns + 1, 1), axis=0, dtype=np.float64)
+                if has_nulls:
+                    cum_returns[~notnull] = np.nan
+            else:
+                cum_returns = np.cumsum(np.where(notnull, returns, 0), axis=0, dtype=np.float64) + 1
+                if has_nulls:
+                    cum_returns[~notnull] = np.nan
+
+        highwater_marks = np.fmax.accumulate(cum_returns, axis=0)
+        max_drawdowns = np.nanmin(cum_returns/highwater_marks, axis=0) - 1
+        cagrs = _cagr(cum_returns, dates, compound=compound)
+
+        # The compounded statistics (cumulative return, Calmar) treat nulls
+        # as 0 and start from a baseline of 1, so reuse the cumulative
+        # returns if they are the same thing
+        if compound and not has_nulls:
+            growth = cum_returns
+            growth_drawdowns = max_drawdowns
+        else:
+            growth = np.cumprod(np.where(notnull, returns + 1, 1), axis=0, dtype=np.float64)
+            growth_drawdowns = np.nanmin(growth/np.fmax.accumulate(growth, axis=0), axis=0) - 1
+        # Including the baseline of 1 in the high-water marks is the same as
+        # also counting the drop from 1 to the lowest value
+        growth_drawdowns = np.minimum(growth_drawdowns, growth.min(axis=0) - 1)
+        final_growth = growth[-1].astype(np.float64)
+        cum_returns_final = final_growth - 1
+        annual_returns = final_growth ** (periods_per_year/num_rows) - 1
+        calmars = np.where(growth_drawdowns < 0, annual_returns/np.abs(growth_drawdowns), np.nan)
+        calmars = np.where(np.isinf(calmars), np.nan, calmars)
+
+    return np.column_stack((
+        cagrs,
+        sharpes,
+        max_drawdowns,
+        cum_returns_final,
+        annual_volatilities,
+        sortinos,
+        calmars,
+        skews,
+        kurtoses))
+
+BENCHMARK_STATS = [
+    "Beta",
+    "Alpha",
+    "Correlation",
+    "TrackingError",
+    "InformationRatio",
+    "UpCapture",
+    "DownCapture",
+]
+
+def get_benchmark_stats(returns, benchmark_returns, riskfree=0, periods_per_year=252):
+    """
+    Computes statistics of the returns relative to benchmark returns: beta,
+    annualized (Jensen's) alpha, correlation, annualized tracking error,
+    information ratio, and up and down capture (the mean return on dates
+    the benchmark rose or fell, as a proportion of the benchmark's mean
+    return on those dates).
 
-    try:
-        top_movers = pd.concat((returns.head(n), returns.tail(n)), sort=True)
-    except TypeError:
-        # sort was introduced in pandas 0.23
-        top_movers = pd.concat((returns.head(n), returns.tail(n)))
+    Each column of a DataFrame of returns is compared to the same column of
+    a DataFrame of benchmark returns, all at once. Dates on which either
+    return is null are ignored.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        a Series or DataFrame of returns
+
+    benchmark_returns : Series or DataFrame, required
+        the benchmark returns, with the same shape as the returns
+
+    riskfree : float, optional
+        the risk-free rate (default 0)
+
+    periods_per_year : int, optional
+        the number of return periods per year, used to annualize alpha,
+        tracking error and the information ratio (default 252)
+
+    Returns
+    -------
+    Series or DataFrame
+        a Series indexed by statistic, or for DataFrames a DataFrame with a
+        row per column and a column per statistic (see BENCHMARK_STATS)
+    """
+    if isinstance(returns, pd.DataFrame):
+        values = returns.values
+        benchmark_values = benchmark_returns.values
+    else:
+        values = returns.values.reshape((-1, 1))
+        benchmark_values = benchmark_returns.values.reshape((-1, 1))
+
+    stats = _benchmark_stats(
+        values, benchmark_values, riskfree=riskfree, periods_per_year=periods_per_year)
+
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(stats, index=returns.columns, columns=BENCHMARK_STATS)
+    else:
+        return pd.Series(stats[0], index=BENCHMARK_STATS, name=returns.name)
+
+def _benchmark_stats(returns, benchmark_returns, riskfree=0, periods_per_year=252):
+    """
+    Computes the BENCHMARK_STATS of each column of a 2-d array of returns
+    against the same column of a 2-d array of benchmark returns. Returns a
+    2-d array with a row per column.
+    """
+    valid = ~np.isnan(returns) & ~np.isnan(benchmark_returns)
+    returns = np.where(valid, returns, 0).astype(np.float64, copy=False)
+    benchmark_returns = np.where(valid, benchmark_returns, 0).astype(np.float64, copy=False)
+    active_returns = returns - benchmark_returns
+    counts = valid.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        means = returns.sum(axis=0)/counts
+        benchmark_means = benchmark_returns.sum(axis=0)/counts
+        active_means = active_returns.sum(axis=0)/counts
+        deviations = np.where(valid, returns - means, 0)
+        benchmark_deviations = np.where(valid, benchmark_returns - benchmark_means, 0)
+        active_deviations = np.where(valid, active_returns - active_means, 0)
+
+        covariances = (deviations * benchmark_deviations).sum(axis=0)/(counts - 1)
+        variances = (deviations * deviations).sum(axis=0)/(counts - 1)
+        benchmark_variances = (benchmark_deviations * benchmark_deviations).sum(axis=0)/(counts - 1)
+        active_stds = np.sqrt((active_deviations * active_deviations).sum(axis=0)/(counts - 1))
+
+        betas = covariances/benchmark_variances
+        alphas = ((means - riskfree) - betas * (benchmark_means - riskfree)) * periods_per_year
+        correlations = covariances/np.sqrt(variances * benchmark_variances)
+        tracking_errors = active_stds * np.sqrt(periods_per_year)
+        information_ratios = active_means/active_stds * np.sqrt(periods_per_year)
+
+        # the means over the same dates, so the ratio of the sums
+        up = benchmark_returns > 0
+        down = benchmark_returns < 0
+        up_captures = (returns * up).sum(axis=0)/(benchmark_returns * up).sum(axis=0)
+        down_captures = (returns * down).sum(axis=0)/(benchmark_returns * down).sum(axis=0)
+
+    stats = np.column_stack((
+        betas,
+        alphas,
+        correlations,
+        tracking_errors,
+        information_ratios,
+        up_captures,
+        down_captures))
+    # constant benchmarks or returns have no defined beta or correlation
+    return np.where(np.isinf(stats), np.nan, stats)
+
+def get_drawdown_periods(drawdowns):
+    """
+    Returns a table of drawdown episodes, ranked by depth within each column.
+
+    An episode begins at the last high-water mark (the peak), reaches its
+    deepest point at the trough, and ends on the first subsequent date at a
+    new high-water mark (the recovery). Episodes which haven't recovered by
+    the last date have a null recovery date. Null drawdowns are skipped
+    and don't interrupt an episode.
+
+    Parameters
+    ----------
+    drawdowns : Series or DataFrame, required
+        a Series or DataFrame of drawdowns (see get_drawdowns)
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame with columns Peak, Trough, Recovery, Depth, and Duration
+        (the time from the peak to the recovery, or to the last date if not
+        recovered). Indexed by Rank (1 being the deepest drawdown), plus the
+        DataFrame column if a DataFrame was passed.
+
+    Examples
+    --------
+    Get the 3 deepest drawdowns for each column:
+
+    >>> drawdown_periods = get_drawdown_periods(drawdowns)
+    >>> drawdown_periods[drawdown_periods.index.get_level_values("Rank") <= 3]
+    """
+    if isinstance(drawdowns, pd.DataFrame):
+        values = drawdowns.values
+    else:
+        values = drawdowns.values.reshape((-1, 1))
+
+    num_rows = values.shape[0]
+    periods = _drawdown_periods(values)
+    dates = drawdowns.index
+
+    def to_dates(positions):
+        return pd.DatetimeIndex(dates[np.maximum(positions, 0) % max(num_rows, 1)]).where(positions >= 0)
+
+    peaks = to_dates(periods["peak"])
+    recoveries_or_ends = np.where(periods["recovery"] >= 0, periods["recovery"], periods["end"])
+
+    drawdown_periods = pd.DataFrame(
+        dict(
+            Peak=peaks,
+            Trough=to_dates(periods["trough"]),
+            Recovery=to_dates(periods["recovery"]),
+            Depth=periods["depth"],
+            Duration=to_dates(recoveries_or_ends) - peaks),
+        columns=["Peak", "Trough", "Recovery", "Depth", "Duration"])
+
+    if isinstance(drawdowns, pd.DataFrame):
+        drawdown_periods.index = pd.MultiIndex.from_arrays(
+            [drawdowns.columns[periods["column"]], periods["rank"]],
+            names=[drawdowns.columns.name, "Rank"])
+    else:
+        drawdown_periods.index = pd.Index(periods["rank"], name="Rank")
+
+    return drawdown_periods
+
+def _drawdown_periods(drawdowns):
+    """
+    Segments a 2-d array of drawdowns into episodes, for all columns at once.
+
+    Returns a dict of 1-d arrays (one element per episode, sorted by column
+    then depth) of the column position, rank, depth, and the flat
+    (column-major) positions of the peak, trough, last underwater row, and
+    recovery (-1 if none).
+    """
+    num_rows = drawdowns.shape[0]
+
+    # Lay the columns end to end and keep only the non-null drawdowns;
+    # episodes are then runs of negative values within a column
+    flat = drawdowns.ravel(order="F")
+    positions = np.flatnonzero(~np.isnan(flat))
+    values = flat[positions]
+    cols = positions // max(num_rows, 1)
+    num_values = len(values)
+
+    underwater = values < 0
+    continues = np.zeros(num_values, dtype=bool)
+    continues[1:] = underwater[:-1] & (cols[1:] == cols[:-1])
+
+    underwater_idx = np.flatnonzero(underwater)
+    if not len(underwater_idx):
+        empty = np.array([], dtype=np.int64)
+        return dict(column=empty, rank=empty, depth=np.array([]),
+                    peak=empty, trough=empty, end=empty, recovery=empty)
+
+    underwater_values = values[underwater_idx]
+    is_start = ~continues[underwater_idx]
+    seg_starts = np.flatnonzero(is_start)
+    seg_ends = np.append(seg_starts[1:], len(underwater_idx)) - 1
+    seg_ids = np.cumsum(is_start) - 1
+
+    depths = np.minimum.reduceat(underwater_values, seg_starts)
+    # the trough is the first occurrence of the minimum in each episode
+    is_trough = underwater_values == depths[seg_ids]
+    troughs = np.minimum.reduceat(
+        np.where(is_trough, np.arange(len(underwater_idx)), len(underwater_idx)),
+        seg_starts)
+
+    starts = underwater_idx[seg_starts]
+    ends = underwater_idx[seg_ends]
+    episode_cols = cols[starts]
+
+    # the peak is the preceding value and the recovery the following value,
+    # if they belong to the same column
+    peaks = starts - 1
+    has_peak = (peaks >= 0) & (cols[np.maximum(peaks, 0)] == episode_cols)
+    recoveries = ends + 1
+    has_recovery = recoveries < num_values
+    has_recovery[has_recovery] = cols[recoveries[has_recovery]] == episode_cols[has_recovery]
+
+    # rank by depth within each column
+    order = np.lexsort((depths, episode_cols))
+    sorted_cols = episode_cols[order]
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = sorted_cols[1:] != sorted_cols[:-1]
+    arange = np.arange(len(order))
+    ranks = arange - np.maximum.accumulate(np.where(is_first, arange, 0)) + 1
+
+    return dict(
+        column=sorted_cols,
+        rank=ranks,
+        depth=depths[order],
+        peak=np.where(has_peak, positions[np.maximum(peaks, 0)], -1)[order],
+        trough=positions[underwater_idx[troughs]][order],
+        end=positions[ends][order],
+        recovery=np.where(has_recovery, positions[np.minimum(recoveries, num_values - 1)], -1)[order])
+
+def get_top_movers(returns, n=10, per=None):
+    """
+    Returns the biggest gainers and losers in the returns.
+
+    Only the n smallest and n largest returns are selected and sorted, so
+    the cost doesn't depend on sorting the entire DataFrame.
+
+    Parameters
+    ----------
+    returns : Series or DataFrame, required
+        a Series or DataFrame of returns
+
+    n : int, optional
+        the number of biggest gainers and losers to return (default 10)
+
+    per : str, optional
+        for DataFrames, return the n biggest gainers and losers of each
+        column ("column") or of each date ("date") instead of the DataFrame
+        as a whole
+
+    Returns
+    -------
+    Series
+        the losers followed by the gainers, each sorted in ascending order
+        (grouped by column or date if `per` is specified). For DataFrames,
+        the Series has a (Date, column) MultiIndex.
+
+    Examples
+    --------
+    Get the 5 biggest gainers and losers of each security:
+
+    >>> get_top_movers(returns, n=5, per="column")
+    """
+    if per not in (None, "column", "date"):
+        raise MoonchartError("per must be None, 'column', or 'date', not {0}".format(per))
+
+    if not isinstance(returns, pd.DataFrame):
+        positions, _ = _top_mover_positions(returns.values.reshape((-1, 1)), n)
+        return returns.iloc[positions]
+
+    values = returns.values
+    num_cols = values.shape[1]
+    if per == "column":
+        dates, cols = _top_mover_positions(values, n)
+    elif per == "date":
+        cols, dates = _top_mover_positions(values.T, n)
+    else:
+        positions, _ = _top_mover_positions(values.reshape((-1, 1)), n)
+        dates, cols = positions // num_cols, positions % num_cols
+
+    top_movers = pd.Series(
+        values[dates, cols],
+        index=pd.MultiIndex.from_arrays(
+            [returns.index[dates], returns.columns[cols]],
+            names=[returns.index.name, returns.columns.name]))
 
     return top_movers
+
+def _top_mover_positions(values, n):
+    """
+    Selects the n smallest and n largest non-null values in each column of a
+    2-d array with a partial sort (argpartition).
+
+    Returns a tuple of 1-d arrays of (row positions, column positions),
+    ordered by column, with each column's smallest values (ascending)
+    followed by its largest values (ascending).
+    """
+    num_rows, num_cols = values.shape
+    n = min(n, num_rows)
+    if n < 1:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    isnull = np.isnan(values)
+    # Push nulls to the end when selecting the losers, and to the beginning
+    # when selecting the gainers
+    partitioned = np.where(isnull, np.inf, values)
+    losers = np.argpartition(partitioned, n - 1, axis=0)[:n]
+    np.copyto(partitioned, -np.inf, where=isnull)
+    gainers = np.argpartition(partitioned, num_rows - n, axis=0)[num_rows - n:]
+    del partitioned
+
+    rows = []
+    for selected in (losers, gainers):
+        selected_values = np.take_along_axis(values, selected, axis=0)
+        order = np.argsort(selected_values, axis=0, kind="mergesort")
+        rows.append(np.take_along_axis(selected, order, axis=0))
+
+    rows = np.concatenate(rows).T.ravel()
+    cols = np.repeat(np.arange(num_cols), 2 * n)
+    notnull = ~np.isnan(values[rows, cols])
+
+    return rows[notnull], cols[notnull]
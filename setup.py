@@ -30,7 +30,9 @@ setup(name='quantrocket-moonchart',
         "pandas>=0.20",
         "seaborn",
         "quantrocket-client",
-        "empyrical",
-        "scipy",
-    ]
+    ],
+    extras_require={
+        "numba": ["numba"],
+        "arrow": ["pyarrow"],
+    }
 )
@@ -0,0 +1,126 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart import DailyPerformance
+from moonchart.exceptions import MoonchartError
+from moonchart.arrowio import (
+    read_results_parquet,
+    read_results_feather,
+    write_results_parquet,
+    write_results_feather)
+from .test_store import make_results
+
+class ArrowIOTestCase(unittest.TestCase):
+    """
+    Test cases for reading and writing Parquet and Feather results.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+
+        results = make_results(fields=("Return", "AbsWeight", "NetExposure"))
+        for write, read, ext in (
+            (write_results_parquet, read_results_parquet, "parquet"),
+            (write_results_feather, read_results_feather, "feather")):
+
+            filepath = os.path.join(self.directory, "results." + ext)
+            write(results, filepath)
+            pd.testing.assert_frame_equal(read(filepath), results)
+
+            # only the requested fields and columns are read
+            projected = read(
+                filepath, fields=["Return", "NetExposure", "Slippage"],
+                columns=["strategy-2", "strategy-0"])
+            pd.testing.assert_frame_equal(
+                projected,
+                results.loc[["Return", "NetExposure"], ["strategy-2", "strategy-0"]])
+
+            with self.assertRaises(MoonchartError) as cm:
+                read(filepath, columns=["strategy-9"])
+            self.assertIn("columns not found: strategy-9", repr(cm.exception))
+
+    def test_non_string_columns(self):
+
+        # integer conid columns are stored and read back as strings
+        results = make_results(fields=("Return", "NetExposure"))
+        results.columns = [12345, 23456, 34567]
+        for write, read, ext in (
+            (write_results_parquet, read_results_parquet, "parquet"),
+            (write_results_feather, read_results_feather, "feather")):
+
+            filepath = os.path.join(self.directory, "results." + ext)
+            write(results, filepath)
+            self.assertListEqual(list(read(filepath).columns), ["12345", "23456", "34567"])
+
+            projected = read(filepath, columns=[23456])
+            pd.testing.assert_frame_equal(
+                projected, results[[23456]].rename(columns=str))
+
+            with self.assertRaises(MoonchartError) as cm:
+                read(filepath, columns=[99999])
+            self.assertIn("columns not found: 99999", repr(cm.exception))
+
+    def test_mixed_types(self):
+
+        # PNL results have string fields alongside numeric fields
+        dates = pd.to_datetime(["2019-01-21", "2019-01-22"])
+        results = pd.DataFrame(
+            {"strategy-a": [0.0, 0.0012, 500.5, np.nan, "U12345", "U12345"]},
+            index=pd.MultiIndex.from_product(
+                [["Return", "Pnl", "Account"], dates], names=["Field", "Date"]),
+            dtype=object)
+
+        filepath = os.path.join(self.directory, "pnl.parquet")
+        write_results_parquet(results, filepath)
+        pnl_results = read_results_parquet(filepath)
+        self.assertListEqual(
+            pnl_results["strategy-a"].tolist(),
+            ["0.0", "0.0012", "500.5", None, "U12345", "U12345"])
+
+        perf = DailyPerformance.from_pnl_parquet(filepath)
+        self.assertListEqual(perf.returns["strategy-a"].tolist(), [0.0, 0.0012])
+        self.assertEqual(perf.pnl["strategy-a"].iloc[0], 500.5)
+        self.assertTrue(np.isnan(perf.pnl["strategy-a"].iloc[1]))
+
+    def test_performance(self):
+
+        results = make_results(fields=("Return", "AbsWeight", "Commission", "Slippage"))
+        expected = DailyPerformance._from_moonshot(results)
+
+        for write, ext in ((write_results_parquet, "parquet"), (write_results_feather, "feather")):
+            filepath = os.path.join(self.directory, "results." + ext)
+            write(results, filepath)
+            load = getattr(DailyPerformance, "from_moonshot_" + ext)
+
+            perf = load(filepath)
+            self.assertListEqual(perf._store.fields, ["Return", "Commission", "Slippage"])
+            pd.testing.assert_frame_equal(perf.cum_returns, expected.cum_returns, check_freq=False)
+            pd.testing.assert_frame_equal(perf.slippages, expected.slippages, check_freq=False)
+
+            perf = load(filepath, columns=["strategy-1"], dtype="float32")
+            self.assertListEqual(list(perf.returns.columns), ["strategy-1"])
+            self.assertEqual(perf.returns.dtypes.iloc[0], np.float32)
@@ -0,0 +1,135 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart import DailyPerformance, AggregateDailyPerformance
+from moonchart.exceptions import MoonchartError
+from .test_store import make_results
+
+class BundleTestCase(unittest.TestCase):
+    """
+    Test cases for DailyPerformance.save and DailyPerformance.load.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load(self):
+
+        results = make_results(fields=("Return", "NetExposure", "Commission", "Benchmark"))
+        perf = DailyPerformance._from_moonshot(
+            results, riskfree=0.01, compound=False, rolling_sharpe_window=5, trim_outliers=3)
+        perf.save(self.directory)
+
+        self.assertListEqual(
+            sorted(os.listdir(self.directory)),
+            ["benchmark_prices.npy", "columns.json", "commissions.npy", "index.npy",
+             "metadata.json", "net_exposures.npy", "returns.npy"])
+
+        loaded_perf = DailyPerformance.load(self.directory)
+        for attr in ("returns", "net_exposures", "commissions", "_benchmark_prices"):
+            pd.testing.assert_frame_equal(
+                getattr(loaded_perf, attr), getattr(perf, attr), check_freq=False)
+        self.assertIsNone(loaded_perf.pnl)
+        self.assertEqual(loaded_perf.riskfree, 0.01)
+        self.assertFalse(loaded_perf.compound)
+        self.assertEqual(loaded_perf.rolling_sharpe_window, 5)
+        self.assertEqual(loaded_perf._trim_outliers, 3)
+
+        # the fields are read-only views of the memory-mapped files
+        returns = base = loaded_perf.returns.values
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        self.assertFalse(returns.flags.writeable)
+
+        pd.testing.assert_frame_equal(loaded_perf.cum_returns, perf.cum_returns, check_freq=False)
+        pd.testing.assert_series_equal(loaded_perf.sharpe, perf.sharpe)
+        pd.testing.assert_frame_equal(loaded_perf.summary_stats, perf.summary_stats)
+
+        loaded_perf = DailyPerformance.load(self.directory, mmap_mode=None)
+        self.assertTrue(loaded_perf.returns.values.flags.writeable)
+
+    def test_aggregate(self):
+
+        perf = DailyPerformance._from_moonshot(make_results())
+        agg_perf = AggregateDailyPerformance(perf)
+        agg_perf.save(self.directory)
+
+        loaded_perf = DailyPerformance.load(self.directory)
+        pd.testing.assert_series_equal(loaded_perf.returns, agg_perf.returns, check_freq=False)
+        self.assertAlmostEqual(loaded_perf.cagr, agg_perf.cagr)
+
+    def test_overwrite(self):
+
+        results = make_results(fields=("Return", "NetExposure", "Commission"))
+        perf = DailyPerformance._from_moonshot(results)
+        perf.save(self.directory)
+        loaded_perf = DailyPerformance.load(self.directory)
+        returns = loaded_perf.returns.copy()
+
+        # saving over a loaded bundle replaces the directory rather than
+        # rewriting the memory-mapped files
+        new_perf = DailyPerformance._from_moonshot(results.loc[["Return"]] * 2)
+        new_perf.save(self.directory)
+        pd.testing.assert_frame_equal(loaded_perf.returns, returns)
+        self.assertListEqual(
+            sorted(os.listdir(self.directory)),
+            ["columns.json", "index.npy", "metadata.json", "returns.npy"])
+        pd.testing.assert_frame_equal(
+            DailyPerformance.load(self.directory).returns, new_perf.returns, check_freq=False)
+        # no temporary directories are left behind
+        temp_prefix = ".{0}.".format(os.path.basename(self.directory))
+        self.assertListEqual(
+            [name for name in os.listdir(os.path.dirname(self.directory))
+             if name.startswith(temp_prefix)], [])
+
+        # an interrupted save leaves the existing bundle intact
+        class Interrupted(Exception):
+            pass
+        def interrupt(*args, **kwargs):
+            raise Interrupted()
+        original_save = np.save
+        np.save = interrupt
+        try:
+            with self.assertRaises(Interrupted):
+                perf.save(self.directory)
+        finally:
+            np.save = original_save
+        pd.testing.assert_frame_equal(
+            DailyPerformance.load(self.directory).returns, new_perf.returns, check_freq=False)
+
+    def test_not_a_bundle(self):
+
+        with self.assertRaises(MoonchartError) as cm:
+            DailyPerformance.load(self.directory)
+        self.assertIn("is not a bundle directory", repr(cm.exception))
+
+        # an existing directory which isn't a bundle isn't replaced
+        with open(os.path.join(self.directory, "notes.txt"), "w") as f:
+            f.write("notes")
+        with self.assertRaises(MoonchartError) as cm:
+            DailyPerformance._from_moonshot(make_results()).save(self.directory)
+        self.assertIn("is not empty and is not a bundle directory", repr(cm.exception))
+        self.assertListEqual(os.listdir(self.directory), ["notes.txt"])
@@ -0,0 +1,94 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import unittest
+import numpy as np
+from moonchart.cache import Input, cached, clear_cache, get_cache_info
+
+class Prices(object):
+
+    prices = Input()
+    multiplier = Input()
+
+    def __init__(self, prices, multiplier=1):
+        self.prices = prices
+        self.multiplier = multiplier
+        self.calls = []
+
+    @cached("prices")
+    def returns(self):
+        self.calls.append("returns")
+        return np.diff(self.prices) / self.prices[:-1]
+
+    @cached("returns")
+    def total_return(self):
+        self.calls.append("total_return")
+        return np.prod(self.returns + 1) - 1
+
+    @cached("multiplier")
+    def scaled_multiplier(self):
+        self.calls.append("scaled_multiplier")
+        return self.multiplier * 10
+
+class CacheTestCase(unittest.TestCase):
+    """
+    Test cases for Input and cached.
+    """
+
+    def test_computes_once(self):
+
+        prices = Prices(np.array([1.0, 2.0, 3.0]))
+        self.assertAlmostEqual(prices.total_return, 2.0)
+        self.assertAlmostEqual(prices.total_return, 2.0)
+        self.assertListEqual(prices.calls, ["total_return", "returns"])
+
+        with self.assertRaises(AttributeError):
+            prices.total_return = 5
+
+    def test_invalidates_dependents_only(self):
+
+        prices = Prices(np.array([1.0, 2.0, 3.0]))
+        prices.total_return
+        prices.scaled_multiplier
+        prices.calls = []
+
+        prices.prices = np.array([1.0, 1.5])
+        self.assertAlmostEqual(prices.total_return, 0.5)
+        self.assertEqual(prices.scaled_multiplier, 10)
+        # the transitive dependents of prices were recomputed, but not
+        # scaled_multiplier
+        self.assertListEqual(prices.calls, ["total_return", "returns"])
+
+        prices.calls = []
+        prices.multiplier = 2
+        self.assertEqual(prices.scaled_multiplier, 20)
+        prices.total_return
+        self.assertListEqual(prices.calls, ["scaled_multiplier"])
+
+        clear_cache(prices)
+        prices.total_return
+        self.assertListEqual(prices.calls, ["scaled_multiplier", "total_return", "returns"])
+
+    def test_cache_info(self):
+
+        prices = Prices(np.array([1.0, 2.0, 3.0]))
+        prices.returns
+
+        info = get_cache_info(prices)
+        self.assertListEqual(list(info.index), ["returns", "total_return", "scaled_multiplier"])
+        self.assertListEqual(info.Warm.tolist(), [True, False, False])
+        self.assertListEqual(info.Bytes.tolist(), [16, 0, 0])
+        self.assertListEqual(info.DependsOn.tolist(), ["prices", "returns", "multiplier"])
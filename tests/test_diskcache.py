@@ -0,0 +1,127 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import io
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart import DailyPerformance, AggregateDailyPerformance
+from moonchart import diskcache
+from moonchart.diskcache import DiskCache
+
+class DiskCacheTestCase(unittest.TestCase):
+    """
+    Test cases for DiskCache.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv = os.path.join(self.directory, "results.csv")
+        with open(self.csv, "w") as f:
+            f.write("Field,Date,strategy-1\nReturn,2019-01-01,0.01\n")
+        self.cache = DiskCache(os.path.join(self.directory, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_make_key(self):
+
+        key = self.cache.make_key(self.csv, riskfree=0)
+        self.assertEqual(key, self.cache.make_key(self.csv, riskfree=0))
+        self.assertNotEqual(key, self.cache.make_key(self.csv, riskfree=0.01))
+
+        # the key depends on the content (from the current position of a
+        # buffer), not the path
+        with open(self.csv) as f:
+            content = f.read()
+        buffer = io.StringIO("junk" + content)
+        buffer.seek(4)
+        self.assertEqual(key, self.cache.make_key(buffer, riskfree=0))
+        self.assertEqual(buffer.tell(), 4)
+
+        # entries written by other versions of moonchart aren't used
+        original_version = diskcache.__version__
+        diskcache.__version__ = "0.0.0"
+        try:
+            self.assertNotEqual(key, self.cache.make_key(self.csv, riskfree=0))
+        finally:
+            diskcache.__version__ = original_version
+
+        with open(self.csv, "a") as f:
+            f.write("Return,2019-01-02,0.02\n")
+        self.assertNotEqual(key, self.cache.make_key(self.csv, riskfree=0))
+
+    def test_get_and_put(self):
+
+        key = self.cache.make_key(self.csv)
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, {"a": np.arange(3)})
+        np.testing.assert_array_equal(self.cache.get(key)["a"], np.arange(3))
+
+        # corrupt entries are discarded
+        with open(self.cache._path(key), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.nbytes, 0)
+
+    def test_lru_eviction(self):
+
+        value = np.zeros(100)
+        then = time.time() - 60
+        for i, key in enumerate(("a", "b", "c")):
+            self.cache.put(key, value)
+            # set increasing access times explicitly, as mtime resolution
+            # may be coarse
+            os.utime(self.cache._path(key), (then + i, then + i))
+        entry_size = os.path.getsize(self.cache._path("a"))
+
+        self.assertIsNotNone(self.cache.get("a"))
+        # "b" is now the least recently used
+        self.assertGreater(os.path.getmtime(self.cache._path("a")), then + 2)
+
+        self.cache.max_bytes = 3 * entry_size
+        self.cache.put("d", value)
+        self.assertIsNone(self.cache.get("b"))
+        for key in ("a", "c", "d"):
+            self.assertIsNotNone(self.cache.get(key))
+        self.assertLessEqual(self.cache.nbytes, 3 * entry_size)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.nbytes, 0)
+
+    def test_performance(self):
+
+        dates = pd.date_range("2019-01-01", periods=10, name="Date")
+        returns = pd.DataFrame(
+            np.random.normal(0, 0.01, (10, 2)), index=dates, columns=["a", "b"])
+        perf = DailyPerformance(returns)
+        agg_perf = AggregateDailyPerformance(perf)
+        perf.drawdowns
+        agg_perf.sharpe
+
+        self.cache.put("perf", (perf, agg_perf))
+        cached_perf, cached_agg_perf = self.cache.get("perf")
+
+        # derived values are cached too
+        self.assertTrue(cached_perf.cache_info().Warm["drawdowns"])
+        self.assertTrue(cached_agg_perf.cache_info().Warm["sharpe"])
+        pd.testing.assert_frame_equal(cached_perf.drawdowns, perf.drawdowns)
+        self.assertEqual(cached_agg_perf.sharpe, agg_perf.sharpe)
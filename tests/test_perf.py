@@ -16,12 +16,19 @@
 
 import os
 import unittest
+import warnings
+import numpy as np
 import pandas as pd
 # Specify non-interactive matplotlib backend before anything else imports
 # matplotlib
 import matplotlib as mpl
 mpl.use("Agg")
-from moonchart import DailyPerformance, AggregateDailyPerformance
+from moonchart import (
+    DailyPerformance,
+    AggregateDailyPerformance,
+    GroupedDailyPerformance,
+    IntradayPerformance)
+from moonchart.exceptions import MoonchartError
 from moonchart.utils import get_zscores
 from copy import deepcopy
 
@@ -595,10 +602,12 @@ class DailyPerformanceTestCase(unittest.TestCase):
         )
 
         perf = DailyPerformance.from_moonshot_csv("backtest.csv", rolling_sharpe_window=2)
+        # rolling Sharpe is computed from running sums, so compare within
+        # float tolerance
         self.assertDictEqual(
-            perf.rolling_sharpe.fillna(-1).to_dict(orient="list"),
-            {'strategy-1': [-1.0, -22.205756137004837, -21.77149197579271],
-             'strategy-2': [-1.0, -4.55699466016689, -841.576244567701]}
+            perf.rolling_sharpe.fillna(-1).round(9).to_dict(orient="list"),
+            {'strategy-1': [-1.0, -22.205756137, -21.771491976],
+             'strategy-2': [-1.0, -4.55699466, -841.576244568]}
         )
 
     def test_trim_outliers(self):
@@ -625,6 +634,31 @@ class DailyPerformanceTestCase(unittest.TestCase):
              'strategy-2': [0.0, -0.005031677, -0.004845368]}
         )
 
+    def test_warn_outliers(self):
+
+        np.random.seed(0)
+        returns = pd.DataFrame(
+            np.random.normal(0, 0.01, (500, 2)),
+            index=pd.date_range("2018-01-01", periods=500),
+            columns=["strategy-1", "strategy-2"])
+        returns.iloc[100, 1] = 1
+
+        with warnings.catch_warnings(record=True) as warning_list:
+            warnings.simplefilter("always")
+            perf = DailyPerformance(returns)
+            AggregateDailyPerformance(perf)
+
+        # only warns once, not again for the aggregate performance
+        outlier_warnings = [w for w in warning_list if "standard deviations" in str(w.message)]
+        self.assertEqual(len(outlier_warnings), 1)
+        self.assertIn("Found returns which are 22 standard deviations", str(outlier_warnings[0].message))
+
+        with warnings.catch_warnings(record=True) as warning_list:
+            warnings.simplefilter("always")
+            DailyPerformance(returns, warn_outliers=False)
+
+        self.assertFalse([w for w in warning_list if "standard deviations" in str(w.message)])
+
     def test_benchmark(self):
 
         backtest_results = deepcopy(BACKTEST_RESULTS)
@@ -648,4 +682,642 @@ class DailyPerformanceTestCase(unittest.TestCase):
         self.assertListEqual(
             perf.benchmark_returns.tolist(),
             [0.0, 0.02237762237762242, -0.002540551104162625]
-        )
\ No newline at end of file
+        )
+
+    def test_rolling_stats(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=300, name="Date")
+        columns = ["strategy-1", "strategy-2"]
+        results = pd.concat({
+            "Return": pd.DataFrame(np.random.normal(0, 0.01, (300, 2)), index=dates, columns=columns),
+            "Benchmark": pd.DataFrame(
+                100 * np.cumprod(1 + np.random.normal(0, 0.01, (300, 2)), axis=0),
+                index=dates, columns=columns)},
+            names=["Field", "Date"])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            perf = DailyPerformance._from_moonshot(results)
+        self.assertListEqual(perf.rolling_windows, [63, 126, 252])
+
+        # each column against its own benchmark
+        benchmark_returns = perf.column_benchmark_returns["strategy-2"]
+        returns = perf.returns["strategy-2"]
+        pd.testing.assert_series_equal(
+            perf.rolling_beta[(126, "strategy-2")],
+            returns.rolling(126).cov(benchmark_returns) / benchmark_returns.rolling(126).var(),
+            check_names=False, check_freq=False)
+        pd.testing.assert_series_equal(
+            perf.rolling_correlation[(63, "strategy-2")],
+            returns.rolling(63).corr(benchmark_returns), check_names=False, check_freq=False)
+        pd.testing.assert_series_equal(
+            perf.rolling_volatility[(252, "strategy-2")],
+            returns.rolling(252).std(ddof=0) * np.sqrt(252), check_names=False, check_freq=False)
+        self.assertTrue(perf.cache_info().Warm["rolling_stats"])
+
+        # a single window is computed on its own
+        window_rolling_stats = perf.rolling_stats_for_window(126)
+        pd.testing.assert_frame_equal(
+            window_rolling_stats, perf.rolling_stats.xs(126, level="Window", axis=1))
+        self.assertIs(perf.rolling_stats_for_window(126), window_rolling_stats)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            agg_perf = AggregateDailyPerformance(perf)
+            self.assertListEqual(list(agg_perf.rolling_beta.columns), [63, 126, 252])
+
+        # the windows follow the return frequency
+        perf = DailyPerformance(perf.returns, periods_per_year=52)
+        self.assertListEqual(perf.rolling_windows, [13, 26, 52])
+        self.assertIsNone(perf.rolling_beta)
+        self.assertIsNone(perf.rolling_correlation)
+        self.assertListEqual(
+            list(perf.rolling_volatility.columns.get_level_values("Window").unique()), [13, 26, 52])
+
+    def test_benchmark_stats(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=100, name="Date")
+        columns = ["strategy-1", "strategy-2", "strategy-3"]
+        benchmark_prices = np.full((100, 3), np.nan)
+        benchmark_prices[:, 0] = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 100))
+        benchmark_prices[:, 1] = 50 * np.cumprod(1 + np.random.normal(0, 0.01, 100))
+        results = pd.concat({
+            "Return": pd.DataFrame(np.random.normal(0, 0.01, (100, 3)), index=dates, columns=columns),
+            "Benchmark": pd.DataFrame(benchmark_prices, index=dates, columns=columns)},
+            names=["Field", "Date"])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            perf = DailyPerformance._from_moonshot(results)
+            benchmark_stats = perf.benchmark_stats
+
+        # each column is compared to its own benchmark, and columns without
+        # a benchmark to the first
+        benchmark_returns = results.loc["Benchmark"].pct_change().fillna(0)
+        pd.testing.assert_series_equal(
+            perf.column_benchmark_returns["strategy-2"], benchmark_returns["strategy-2"], check_freq=False)
+        pd.testing.assert_series_equal(
+            perf.column_benchmark_returns["strategy-3"], benchmark_returns["strategy-1"],
+            check_names=False, check_freq=False)
+        for column, benchmark in (
+            ("strategy-1", "strategy-1"), ("strategy-2", "strategy-2"), ("strategy-3", "strategy-1")):
+            returns = perf.returns[column]
+            self.assertAlmostEqual(
+                benchmark_stats.Beta[column],
+                returns.cov(benchmark_returns[benchmark]) / benchmark_returns[benchmark].var())
+        self.assertTrue(perf.cache_info().Warm["benchmark_stats"])
+
+        # the aggregate performance is compared to the first benchmark
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            agg_perf = AggregateDailyPerformance(perf)
+            self.assertAlmostEqual(
+                agg_perf.benchmark_stats["Correlation"],
+                agg_perf.returns.corr(benchmark_returns["strategy-1"]))
+
+        perf = DailyPerformance._from_moonshot(results.loc[["Return"]])
+        self.assertIsNone(perf.benchmark_stats)
+    def test_drawdown_periods(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        drawdown_periods = perf.drawdown_periods
+        drawdown_periods.index = drawdown_periods.index.map(lambda idx: "{0}/{1}".format(*idx))
+
+        self.assertDictEqual(
+            drawdown_periods.astype(str).to_dict(orient="index"),
+            {'strategy-1/1': {
+                'Peak': '2018-12-03',
+                'Trough': '2018-12-05',
+                'Recovery': 'NaT',
+                'Depth': '-0.0027700799602632387',
+                'Duration': '2 days'},
+             'strategy-2/1': {
+                 'Peak': '2018-12-03',
+                 'Trough': '2018-12-05',
+                 'Recovery': 'NaT',
+                 'Depth': '-0.009852664673277833',
+                 'Duration': '2 days'}})
+
+        agg_perf = AggregateDailyPerformance(perf)
+        self.assertListEqual(
+            agg_perf.drawdown_periods.Depth.tolist(),
+            [-0.012608871878603933])
+
+    def test_summary_stats(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        summary_stats = perf.summary_stats
+
+        self.assertListEqual(list(summary_stats.index), ['strategy-1', 'strategy-2'])
+        for col in summary_stats.index:
+            self.assertAlmostEqual(summary_stats.CAGR[col], perf.cagr[col])
+            self.assertAlmostEqual(summary_stats.Sharpe[col], perf.sharpe[col])
+            self.assertAlmostEqual(summary_stats.MaxDrawdown[col], perf.max_drawdown[col])
+
+        agg_perf = AggregateDailyPerformance(perf)
+        self.assertAlmostEqual(agg_perf.summary_stats["CAGR"], agg_perf.cagr)
+        self.assertAlmostEqual(agg_perf.summary_stats["CumulativeReturn"], -0.012085510148098778)
+
+    def test_dtype(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        perf32 = DailyPerformance.from_moonshot_csv("backtest.csv", dtype="float32")
+
+        for field in ("returns", "net_exposures", "abs_exposures", "total_holdings",
+                      "turnover", "commissions", "slippages"):
+            self.assertTrue((getattr(perf32, field).dtypes == np.float32).all())
+        self.assertTrue((perf32.cum_returns.dtypes == np.float32).all())
+        self.assertTrue((perf32.drawdowns.dtypes == np.float32).all())
+        self.assertTrue((perf32.rolling_sharpe.dtypes == np.float32).all())
+
+        pd.testing.assert_frame_equal(
+            perf32.cum_returns, perf.cum_returns, check_dtype=False, rtol=1e-6)
+        pd.testing.assert_series_equal(perf32.cagr, perf.cagr, rtol=1e-5)
+        pd.testing.assert_series_equal(perf32.sharpe, perf.sharpe, rtol=1e-5)
+        pd.testing.assert_frame_equal(perf32.summary_stats, perf.summary_stats, rtol=1e-4)
+
+        agg_perf32 = AggregateDailyPerformance(perf32)
+        self.assertEqual(agg_perf32.returns.dtype, np.float32)
+        self.assertEqual(agg_perf32.dtype, np.float32)
+        self.assertAlmostEqual(
+            agg_perf32.cagr, AggregateDailyPerformance(perf).cagr, places=6)
+
+        # pnl fields default to float64
+        perf = DailyPerformance.from_pnl_csv("pnl.csv")
+        self.assertEqual(perf.returns.dtypes.unique().tolist(), [np.float64])
+        perf32 = DailyPerformance.from_pnl_csv("pnl.csv", dtype=np.float32)
+        self.assertEqual(perf32.pnl.dtypes.unique().tolist(), [np.float32])
+        self.assertEqual(perf32.cum_pnl.dtypes.unique().tolist(), [np.float32])
+        pd.testing.assert_frame_equal(
+            perf32.cum_pnl, perf.cum_pnl, check_dtype=False, rtol=1e-6)
+
+    def test_log_space(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        log_perf = DailyPerformance.from_moonshot_csv("backtest.csv", log_space=True)
+
+        pd.testing.assert_frame_equal(log_perf.cum_returns, perf.cum_returns)
+        pd.testing.assert_series_equal(log_perf.cagr, perf.cagr)
+
+        pd.testing.assert_series_equal(
+            perf.period_returns(),
+            perf.cum_returns.iloc[-1].rename(None) - 1)
+        pd.testing.assert_series_equal(
+            perf.period_returns("2018-12-02", "2018-12-03"),
+            (perf.returns.loc["2018-12-02":"2018-12-03"] + 1).prod() - 1)
+        pd.testing.assert_series_equal(perf.period_cagr(), perf.cagr)
+
+        agg_perf = AggregateDailyPerformance(log_perf)
+        self.assertTrue(agg_perf.log_space)
+        self.assertAlmostEqual(
+            agg_perf.period_returns("2018-12-03"),
+            (agg_perf.returns.loc["2018-12-03":] + 1).prod() - 1)
+
+    def test_cache_invalidation(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        sharpe = perf.sharpe
+        rolling_sharpe = perf.rolling_sharpe
+        cagr = perf.cagr
+        perf.max_drawdown
+
+        info = perf.cache_info()
+        self.assertTrue(info.Warm[["sharpe", "rolling_sharpe", "cagr", "cum_returns",
+                                   "drawdowns", "max_drawdown"]].all())
+        self.assertFalse(info.Warm["summary_stats"])
+        self.assertGreater(info.Bytes["cum_returns"], 0)
+        self.assertIs(perf.cagr, cagr)
+
+        perf.riskfree = 0.001
+        info = perf.cache_info()
+        self.assertFalse(info.Warm["sharpe"])
+        self.assertFalse(info.Warm["rolling_sharpe"])
+        # values that don't depend on riskfree are kept
+        self.assertTrue(info.Warm["cagr"])
+        self.assertTrue(info.Warm["max_drawdown"])
+        self.assertTrue((perf.sharpe < sharpe).all())
+        pd.testing.assert_series_equal(
+            perf.sharpe,
+            DailyPerformance.from_moonshot_csv("backtest.csv", riskfree=0.001).sharpe)
+
+        perf.compound = False
+        self.assertFalse(perf.cache_info().Warm[["cum_returns", "cagr", "drawdowns", "max_drawdown"]].any())
+        pd.testing.assert_series_equal(
+            perf.cagr,
+            DailyPerformance.from_moonshot_csv("backtest.csv", compound=False).cagr)
+
+        perf.returns = perf.returns * 2
+        self.assertFalse(perf.cache_info().Warm.any())
+
+        perf.clear_cache()
+        self.assertEqual(perf.cache_info().Bytes.sum(), 0)
+
+    def test_append(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=300, name="Date")
+        columns = ["strategy-1", "strategy-2", "strategy-3"]
+        fields = {
+            "Return": np.random.normal(0.0005, 0.01, (300, 3)),
+            "Commission": np.random.uniform(0, 0.0001, (300, 3)),
+            "Slippage": np.random.uniform(0, 0.0001, (300, 3)),
+            "NetExposure": np.random.uniform(-1, 1, (300, 3)),
+            "Benchmark": np.full((300, 3), np.nan)}
+        fields["Return"][:20, 2] = np.nan
+        fields["Benchmark"][:, 1] = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 300))
+        results = pd.concat(
+            dict((field, pd.DataFrame(values, index=dates, columns=columns))
+                 for field, values in fields.items()),
+            names=["Field", "Date"])
+
+        def get_rows(start, stop):
+            return results.loc[(slice(None), dates[start:stop]), :]
+
+        full_perf = DailyPerformance._from_moonshot(results, rolling_sharpe_window=20)
+        full_agg_perf = AggregateDailyPerformance(full_perf)
+
+        perf = DailyPerformance._from_moonshot(get_rows(0, 250), rolling_sharpe_window=20)
+        agg_perf = AggregateDailyPerformance(perf)
+        for p in (perf, agg_perf):
+            for name in ("cum_returns", "cum_commissions", "cum_slippages", "cagr",
+                         "sharpe", "rolling_sharpe", "drawdowns", "max_drawdown",
+                         "benchmark_cum_returns"):
+                getattr(p, name)
+
+        perf.append(get_rows(250, 251))
+        perf.append(get_rows(251, 300))
+
+        # the cached values were extended rather than discarded
+        self.assertTrue(perf.cache_info().Warm[["cum_returns", "drawdowns", "sharpe"]].all())
+        self.assertFalse(perf.cache_info().Warm["summary_stats"])
+
+        for name in ("returns", "net_exposures", "cum_returns", "cum_commissions",
+                     "cum_slippages", "rolling_sharpe", "drawdowns"):
+            pd.testing.assert_frame_equal(
+                getattr(perf, name), getattr(full_perf, name), check_freq=False)
+        for name in ("cagr", "sharpe", "max_drawdown"):
+            pd.testing.assert_series_equal(getattr(perf, name), getattr(full_perf, name))
+        pd.testing.assert_series_equal(
+            perf.benchmark_cum_returns, full_perf.benchmark_cum_returns, check_freq=False)
+        pd.testing.assert_frame_equal(perf.summary_stats, full_perf.summary_stats)
+
+        for name in ("returns", "cum_returns", "cum_commissions", "rolling_sharpe",
+                     "drawdowns", "net_exposures", "benchmark_cum_returns"):
+            pd.testing.assert_series_equal(
+                getattr(agg_perf, name), getattr(full_agg_perf, name), check_freq=False)
+        for name in ("cagr", "sharpe", "max_drawdown"):
+            self.assertAlmostEqual(getattr(agg_perf, name), getattr(full_agg_perf, name))
+
+        with self.assertRaises(MoonchartError) as cm:
+            perf.append(get_rows(290, 300))
+        self.assertIn("can only append dates after 2019-10-27", repr(cm.exception))
+
+        with self.assertRaises(MoonchartError):
+            agg_perf.append(get_rows(290, 300))
+
+    def test_append_pnl(self):
+
+        perf = DailyPerformance.from_pnl_csv("pnl.csv")
+        perf.cum_pnl
+        perf.cum_commission_amounts
+
+        dates = pd.DatetimeIndex(["2019-01-24", "2019-01-25"], name="Date")
+        new_results = pd.concat({
+            "Return": pd.DataFrame(
+                {"strategy-a": [0.001, -0.002], "strategy-b": [0.003, 0.0]}, index=dates),
+            "Pnl": pd.DataFrame(
+                {"strategy-a": [600.0, -1200.0], "strategy-b": [1800.0, 0.0]}, index=dates),
+            "CommissionAmount": pd.DataFrame(
+                {"strategy-a": [10.0, 12.5], "strategy-b": [5.0, 0.0]}, index=dates)},
+            names=["Field", "Date"])
+        perf.append(new_results)
+
+        self.assertEqual(len(perf.returns.index), 5)
+        pd.testing.assert_frame_equal(perf.cum_pnl, perf.pnl.cumsum())
+        pd.testing.assert_frame_equal(
+            perf.cum_commission_amounts, perf.commission_amounts.cumsum())
+        self.assertAlmostEqual(perf.cum_pnl["strategy-a"].iloc[-1], 2595.9208)
+        self.assertAlmostEqual(perf.cum_pnl["strategy-b"].iloc[-1], 8835.3196)
+        # fields missing from the new results are appended as NaN
+        self.assertTrue(perf.commissions.iloc[3:].isnull().all().all())
+
+    def test_lazy_aggregation(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        agg_perf = AggregateDailyPerformance(perf)
+
+        # only the returns are aggregated up front
+        for attr in ("net_exposures", "abs_exposures", "commissions", "slippages", "turnover"):
+            self.assertNotIn(attr, agg_perf.__dict__)
+
+        pd.testing.assert_series_equal(agg_perf.commissions, perf.commissions.sum(axis=1))
+        self.assertIn("commissions", agg_perf.__dict__)
+        self.assertNotIn("slippages", agg_perf.__dict__)
+        self.assertIsNone(agg_perf.pnl)
+
+        agg_perf.aggregate("net_exposures", "abs_exposures", "total_holdings")
+        for attr in ("net_exposures", "abs_exposures", "total_holdings"):
+            self.assertIn(attr, agg_perf.__dict__)
+            pd.testing.assert_series_equal(
+                getattr(agg_perf, attr), getattr(perf, attr).sum(axis=1))
+        self.assertNotIn("turnover", agg_perf.__dict__)
+
+        agg_perf.aggregate()
+        pd.testing.assert_series_equal(agg_perf.turnover, perf.turnover.sum(axis=1))
+
+        # setting a lazy input invalidates like any other input
+        agg_perf.cum_commissions
+        agg_perf.commissions = agg_perf.commissions * 2
+        self.assertFalse(agg_perf.cache_info().Warm["cum_commissions"])
+
+    def test_grouped(self):
+
+        perf = DailyPerformance.from_moonshot_csv("backtest.csv")
+        grouped_perf = GroupedDailyPerformance(
+            perf, {"strategy-1": "family-b", "strategy-2": "family-a"})
+
+        self.assertListEqual(list(grouped_perf.returns.columns), ["family-a", "family-b"])
+        for attr in ("returns", "net_exposures", "commissions", "slippages", "turnover"):
+            pd.testing.assert_frame_equal(
+                getattr(grouped_perf, attr),
+                getattr(perf, attr).rename(
+                    columns={"strategy-1": "family-b", "strategy-2": "family-a"})[["family-a", "family-b"]],
+                check_names=False, check_freq=False)
+        self.assertIsNone(grouped_perf.pnl)
+        self.assertEqual(grouped_perf.sharpe["family-a"], perf.sharpe["strategy-2"])
+
+        # a single group matches the aggregate performance
+        grouped_perf = GroupedDailyPerformance(perf, {"strategy-1": "all", "strategy-2": "all"})
+        agg_perf = AggregateDailyPerformance(perf)
+        for attr in ("returns", "abs_exposures", "total_holdings"):
+            np.testing.assert_allclose(
+                getattr(grouped_perf, attr)["all"].values, getattr(agg_perf, attr).values)
+        self.assertAlmostEqual(grouped_perf.cagr["all"], agg_perf.cagr)
+
+        with self.assertRaises(MoonchartError) as cm:
+            GroupedDailyPerformance(perf, {"strategy-1": "all"})
+        self.assertIn("no group provided for columns: strategy-2", repr(cm.exception))
+
+    def test_grouped_append(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=30, name="Date")
+        columns = ["a-1", "a-2", "b-1", "c-1"]
+        results = pd.concat(
+            dict((field, pd.DataFrame(np.random.normal(0, 0.01, (30, 4)), index=dates, columns=columns))
+                 for field in ("Return", "NetExposure", "Commission")),
+            names=["Field", "Date"])
+        results.iloc[3, 1] = np.nan
+        groups = {"a-1": "a", "a-2": "a", "b-1": "b", "c-1": "c"}
+
+        full_grouped_perf = GroupedDailyPerformance(DailyPerformance._from_moonshot(results), groups)
+
+        perf = DailyPerformance._from_moonshot(results.loc[(slice(None), dates[:20]), :])
+        grouped_perf = GroupedDailyPerformance(perf, groups)
+        grouped_perf.cum_returns
+        perf.append(results.loc[(slice(None), dates[20:]), :])
+
+        for attr in ("returns", "net_exposures", "cum_returns", "cum_commissions"):
+            pd.testing.assert_frame_equal(
+                getattr(grouped_perf, attr), getattr(full_grouped_perf, attr), check_freq=False)
+
+    def test_grouped_benchmarks(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=60, name="Date")
+        columns = ["a-1", "a-2", "b-1", "c-1"]
+        benchmark_prices = np.full((60, 4), np.nan)
+        benchmark_prices[:, 1] = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 60))
+        benchmark_prices[:, 2] = 50 * np.cumprod(1 + np.random.normal(0, 0.01, 60))
+        results = pd.concat({
+            "Return": pd.DataFrame(np.random.normal(0, 0.01, (60, 4)), index=dates, columns=columns),
+            "Benchmark": pd.DataFrame(benchmark_prices, index=dates, columns=columns)},
+            names=["Field", "Date"])
+        groups = {"a-1": "a", "a-2": "a", "b-1": "b", "c-1": "c"}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            full_grouped_perf = GroupedDailyPerformance(DailyPerformance._from_moonshot(results), groups)
+            column_benchmark_returns = full_grouped_perf.column_benchmark_returns
+
+        # each group uses its first benchmarked column, and groups without
+        # a benchmark the first benchmark
+        benchmark_returns = results.loc["Benchmark"].pct_change().fillna(0)
+        for group, column in (("a", "a-2"), ("b", "b-1"), ("c", "a-2")):
+            np.testing.assert_allclose(
+                column_benchmark_returns[group].values, benchmark_returns[column].values)
+
+        # and stays so as rows are appended
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            perf = DailyPerformance._from_moonshot(results.loc[(slice(None), dates[:40]), :])
+            grouped_perf = GroupedDailyPerformance(perf, groups)
+            perf.append(results.loc[(slice(None), dates[40:]), :])
+            pd.testing.assert_frame_equal(
+                grouped_perf.column_benchmark_returns, column_benchmark_returns, check_freq=False)
+
+    def test_resample(self):
+
+        np.random.seed(0)
+        dates = pd.bdate_range("2019-01-01", periods=130, name="Date")
+        columns = ["strategy-1", "strategy-2"]
+        fields = {
+            "Return": np.random.normal(0.0005, 0.01, (130, 2)),
+            "Commission": np.random.uniform(0, 0.0001, (130, 2)),
+            "NetExposure": np.random.uniform(-1, 1, (130, 2)),
+            "Benchmark": np.full((130, 2), np.nan)}
+        fields["Return"][:30, 1] = np.nan
+        fields["Benchmark"][:, 0] = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 130))
+        results = pd.concat(
+            dict((field, pd.DataFrame(values, index=dates, columns=columns))
+                 for field, values in fields.items()),
+            names=["Field", "Date"])
+        perf = DailyPerformance._from_moonshot(results, riskfree=0.0001)
+
+        monthly_perf = perf.resample("M")
+        self.assertIsInstance(monthly_perf, DailyPerformance)
+        self.assertEqual(monthly_perf.periods_per_year, 12)
+        self.assertAlmostEqual(monthly_perf.riskfree, 0.0001 * 21)
+        self.assertEqual(len(monthly_perf.returns.index), 7)
+        self.assertTrue((monthly_perf.returns.index == dates.to_series().resample("M").last().index).all())
+
+        # the monthly returns compound to the daily cumulative returns
+        for month, month_returns in perf.returns.groupby(pd.Grouper(freq="M")):
+            pd.testing.assert_series_equal(
+                monthly_perf.returns.loc[month],
+                ((month_returns + 1).prod(min_count=1) - 1).rename(month))
+        pd.testing.assert_series_equal(
+            monthly_perf.cum_returns.iloc[-1], perf.cum_returns.iloc[-1], check_names=False)
+        # strategy-2 has no returns in January
+        self.assertTrue(np.isnan(monthly_perf.returns["strategy-2"].iloc[0]))
+
+        pd.testing.assert_frame_equal(
+            monthly_perf.commissions, perf.commissions.resample("M").sum(), check_freq=False)
+        pd.testing.assert_frame_equal(
+            monthly_perf.net_exposures, perf.net_exposures.resample("M").mean(), check_freq=False)
+        # the benchmark returns compound the daily benchmark returns, the
+        # first month's included
+        monthly_benchmark_returns = (perf.benchmark_returns + 1).resample("M").prod() - 1
+        self.assertNotEqual(monthly_benchmark_returns.iloc[0], 0)
+        pd.testing.assert_series_equal(
+            monthly_perf.benchmark_returns, monthly_benchmark_returns,
+            check_freq=False, check_names=False)
+        pd.testing.assert_series_equal(
+            monthly_perf.column_benchmark_returns["strategy-2"], monthly_benchmark_returns,
+            check_freq=False, check_names=False)
+        pd.testing.assert_series_equal(
+            AggregateDailyPerformance(monthly_perf).benchmark_returns, monthly_benchmark_returns,
+            check_freq=False, check_names=False)
+
+        # the statistics are annualized monthly
+        pd.testing.assert_series_equal(
+            monthly_perf.sharpe,
+            (monthly_perf.returns - monthly_perf.riskfree).mean()
+            / monthly_perf.returns.std() * np.sqrt(12))
+        self.assertEqual(perf.resample("W").periods_per_year, 52)
+        self.assertEqual(perf.resample("2W-FRI").periods_per_year, 26)
+
+        # resampled performances are cached until the performance changes
+        self.assertIs(perf.resample("M"), monthly_perf)
+        perf.riskfree = 0
+        self.assertIsNot(perf.resample("M"), monthly_perf)
+        self.assertEqual(perf.resample("M").riskfree, 0)
+
+        agg_perf = AggregateDailyPerformance(perf)
+        monthly_agg_perf = agg_perf.resample("M")
+        self.assertIs(agg_perf.resample("M"), monthly_agg_perf)
+        pd.testing.assert_series_equal(
+            monthly_agg_perf.commissions, agg_perf.commissions.resample("M").sum(),
+            check_freq=False)
+
+        with self.assertRaises(MoonchartError) as cm:
+            perf.resample("3D")
+        self.assertIn("can't infer periods_per_year for frequency 3D", repr(cm.exception))
+        self.assertEqual(perf.resample("3D", periods_per_year=84).periods_per_year, 84)
+
+    def test_intraday(self):
+
+        np.random.seed(0)
+        dates = pd.bdate_range("2019-01-01", periods=20)
+        times = ["09:30:00", "10:30:00", "11:30:00", "12:30:00", "13:30:00", "14:30:00", "15:30:00"]
+        columns = ["strategy-1", "strategy-2"]
+        num_bars = len(dates) * len(times)
+        results = pd.concat(
+            dict((field, pd.DataFrame(
+                values, columns=columns,
+                index=pd.MultiIndex.from_product([dates, times], names=["Date", "Time"])))
+                 for field, values in (
+                     ("Return", np.random.normal(0, 0.001, (num_bars, 2))),
+                     ("AbsExposure", np.random.uniform(0, 1, (num_bars, 2))),
+                     ("Commission", np.random.uniform(0, 0.0001, (num_bars, 2))))),
+            names=["Field"])
+
+        perf = IntradayPerformance._from_moonshot(results, riskfree=0.00001)
+        self.assertEqual(len(perf.returns.index), num_bars)
+        self.assertEqual(perf.returns.index[1], pd.Timestamp("2019-01-01 10:30:00"))
+        self.assertEqual(perf.periods_per_year, 252 * 7)
+        np.testing.assert_array_equal(
+            perf.returns.values, results.loc["Return"].values)
+
+        pd.testing.assert_series_equal(
+            perf.sharpe,
+            (perf.returns - 0.00001).mean() / perf.returns.std() * np.sqrt(252 * 7))
+        pd.testing.assert_frame_equal(
+            perf.cum_returns, (perf.returns + 1).cumprod(), check_freq=False)
+
+        # the daily rollup is the same as loading the results as daily
+        daily_perf = DailyPerformance._from_moonshot(results, riskfree=0.00007, rolling_sharpe_window=29)
+        self.assertIs(perf.daily, perf.daily)
+        self.assertEqual(perf.daily.periods_per_year, 252)
+        self.assertAlmostEqual(perf.daily.riskfree, 0.00007)
+        self.assertEqual(perf.daily.rolling_sharpe_window, 29)
+        for attr in ("returns", "abs_exposures", "commissions", "cum_returns"):
+            pd.testing.assert_frame_equal(
+                getattr(perf.daily, attr), getattr(daily_perf, attr), check_freq=False)
+        pd.testing.assert_series_equal(perf.daily.sharpe, daily_perf.sharpe)
+
+        # appended bars are kept at intraday resolution
+        perf = IntradayPerformance._from_moonshot(results.loc[(slice(None), dates[:10]), :])
+        perf.cum_returns
+        perf.daily
+        perf.append(results.loc[(slice(None), dates[10:]), :])
+        self.assertEqual(len(perf.returns.index), num_bars)
+        pd.testing.assert_frame_equal(
+            perf.cum_returns, (perf.returns + 1).cumprod(), check_freq=False)
+        self.assertEqual(len(perf.daily.returns.index), 20)
+
+    def test_between(self):
+
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=100, name="Date")
+        columns = ["strategy-1", "strategy-2"]
+        fields = {
+            "Return": np.random.normal(0.0005, 0.01, (100, 2)),
+            "Commission": np.random.uniform(0, 0.0001, (100, 2)),
+            "NetExposure": np.random.uniform(-1, 1, (100, 2))}
+        fields["Return"][45:55, 1] = np.nan
+        results = pd.concat(
+            dict((field, pd.DataFrame(values, index=dates, columns=columns))
+                 for field, values in fields.items()),
+            names=["Field", "Date"])
+
+        for compound in (True, False):
+            perf = DailyPerformance._from_moonshot(results, compound=compound, rolling_sharpe_window=10)
+            view = perf.between("2019-02-20", "2019-03-31")
+            expected = DailyPerformance._from_moonshot(
+                results.loc[(slice(None), slice("2019-02-20", "2019-03-31")), :],
+                compound=compound, rolling_sharpe_window=10)
+
+            # the fields are views of the performance's fields, sliced on
+            # first access
+            self.assertNotIn("net_exposures", view.__dict__)
+            self.assertTrue(np.shares_memory(view.returns.values, perf.returns.values))
+            self.assertTrue(np.shares_memory(view.net_exposures.values, perf.net_exposures.values))
+
+            for attr in ("returns", "net_exposures", "cum_returns", "log_growth",
+                         "cum_commissions", "drawdowns", "rolling_sharpe"):
+                pd.testing.assert_frame_equal(
+                    getattr(view, attr), getattr(expected, attr), check_freq=False)
+            for attr in ("cagr", "sharpe", "max_drawdown"):
+                pd.testing.assert_series_equal(getattr(view, attr), getattr(expected, attr))
+            pd.testing.assert_frame_equal(view.summary_stats, expected.summary_stats)
+
+            # the cumulative values were rebased from the performance's
+            self.assertTrue(perf.cache_info().Warm[["cum_returns", "log_growth", "cum_commissions"]].all())
+
+        perf = DailyPerformance._from_moonshot(results)
+        pd.testing.assert_series_equal(
+            perf.loc["2019-03-01":].sharpe,
+            DailyPerformance._from_moonshot(
+                results.loc[(slice(None), slice("2019-03-01", None)), :]).sharpe)
+
+        # views of aggregate performance
+        agg_perf = AggregateDailyPerformance(perf)
+        pd.testing.assert_series_equal(
+            agg_perf.loc[:"2019-02-15"].cum_returns,
+            AggregateDailyPerformance(perf.loc[:"2019-02-15"]).cum_returns,
+            check_freq=False)
+
+        # replaced inputs are no longer rebased
+        view = perf.loc["2019-02-01":"2019-02-28"]
+        view.returns = view.returns * 2
+        pd.testing.assert_frame_equal(
+            view.cum_returns, (view.returns.fillna(0) + 1).cumprod().where(view.returns.notnull()),
+            check_freq=False)
+
+        # so are inputs replaced on the performance after taking the view
+        view = perf.loc["2019-02-01":"2019-02-28"]
+        perf.returns = perf.returns * 2
+        perf.cum_returns
+        pd.testing.assert_frame_equal(
+            view.cum_returns, (view.returns.fillna(0) + 1).cumprod().where(view.returns.notnull()),
+            check_freq=False)
+
+        with self.assertRaises(MoonchartError) as cm:
+            perf.loc["2019-01-01"]
+        self.assertIn("only date slices are supported", repr(cm.exception))
+
+        with self.assertRaises(MoonchartError):
+            view.append(results)
@@ -0,0 +1,100 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart import DailyPerformance, AggregateDailyPerformance
+from moonchart.exceptions import MoonchartError
+from moonchart.rangestats import RANGE_STATS
+
+class RangeStatsTestCase(unittest.TestCase):
+    """
+    Test cases for DailyPerformance.range_stats and window_stats.
+    """
+
+    def setUp(self):
+        np.random.seed(0)
+        dates = pd.date_range("2019-01-01", periods=300, name="Date")
+        returns = np.random.normal(0.0005, 0.01, (300, 3))
+        returns[100:120, 1] = np.nan
+        returns[:50, 2] = np.nan
+        self.returns = pd.DataFrame(
+            returns, index=dates, columns=["strategy-1", "strategy-2", "strategy-3"])
+
+    def assert_matches_between(self, perf, starts, ends):
+        stats = perf.window_stats(starts, ends)
+        self.assertListEqual(list(stats.columns), RANGE_STATS)
+        self.assertEqual(len(stats.index), len(starts) * len(perf.returns.columns))
+
+        for start, end in zip(starts, ends):
+            window_stats = stats.xs((pd.Timestamp(start), pd.Timestamp(end)), level=["Start", "End"])
+            view = perf.between(start, end)
+            np.testing.assert_allclose(
+                window_stats.Sharpe.values, view.sharpe.values, rtol=1e-9)
+            np.testing.assert_allclose(
+                window_stats.AnnualVolatility.values,
+                view.summary_stats.AnnualVolatility.values, rtol=1e-9)
+            np.testing.assert_allclose(
+                window_stats.CAGR.values, perf.period_cagr(start, end).values, rtol=1e-9)
+            np.testing.assert_allclose(
+                window_stats.MaxDrawdown.values, view.max_drawdown.values, rtol=1e-9)
+
+    def test_window_stats(self):
+
+        perf = DailyPerformance(self.returns)
+        starts = ["2019-01-01", "2019-02-10", "2019-04-05", "2019-04-05", "2019-07-01", "2019-03-01"]
+        ends = ["2019-10-27", "2019-02-20", "2019-05-15", "2019-04-30", "2019-10-27", "2019-09-13"]
+        self.assert_matches_between(perf, starts, ends)
+
+        # random windows
+        dates = self.returns.index
+        firsts = np.random.randint(0, 300, 50)
+        lasts = np.minimum(firsts + np.random.randint(1, 300, 50), 299)
+        firsts, lasts = zip(*sorted(set(zip(firsts, lasts))))
+        self.assert_matches_between(perf, list(dates[list(firsts)]), list(dates[list(lasts)]))
+
+        # the whole period matches the full statistics
+        stats = perf.window_stats([None], [None]).droplevel(["Start", "End"])
+        np.testing.assert_allclose(stats.Sharpe.values, perf.sharpe.values)
+        np.testing.assert_allclose(stats.MaxDrawdown.values, perf.max_drawdown.values)
+        np.testing.assert_allclose(stats.CAGR.values, perf.period_cagr().values)
+
+        self.assertTrue(perf.cache_info().Warm["range_stats"])
+        self.assertGreater(perf.cache_info().Bytes["range_stats"], 0)
+
+    def test_empty_window(self):
+
+        perf = DailyPerformance(self.returns)
+        stats = perf.window_stats(["2021-01-01", "2019-01-10"], ["2021-12-31", "2019-01-05"])
+        self.assertTrue(stats.isnull().all().all())
+
+        with self.assertRaises(MoonchartError):
+            perf.window_stats(["2019-01-01"], [])
+
+    def test_aggregate_and_arithmetic(self):
+
+        agg_perf = AggregateDailyPerformance(DailyPerformance(self.returns))
+        stats = agg_perf.window_stats(["2019-03-01"], ["2019-06-30"])
+        view = agg_perf.between("2019-03-01", "2019-06-30")
+        self.assertAlmostEqual(stats.Sharpe.iloc[0], view.sharpe)
+        self.assertAlmostEqual(stats.MaxDrawdown.iloc[0], view.max_drawdown)
+
+        perf = DailyPerformance(self.returns, compound=False)
+        stats = perf.window_stats(["2019-03-01"], ["2019-06-30"])
+        np.testing.assert_allclose(
+            stats.CAGR.values, perf.period_cagr("2019-03-01", "2019-06-30").values)
+        self.assertTrue(stats.MaxDrawdown.isnull().all())
@@ -0,0 +1,172 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import io
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart import DailyPerformance
+from moonchart.store import FieldStore, GrowableArray
+from moonchart.exceptions import MoonchartError
+
+def make_results(fields=("Return", "NetExposure", "Weight"), rows=20, cols=3, seed=0):
+    """
+    Returns a DataFrame of Moonshot-style results with a (Field, Date)
+    MultiIndex.
+    """
+    np.random.seed(seed)
+    dates = pd.date_range("2019-01-01", periods=rows, name="Date")
+    results = pd.concat(
+        dict((field, pd.DataFrame(
+            np.random.normal(0, 0.01, (rows, cols)),
+            index=dates,
+            columns=["strategy-{0}".format(i) for i in range(cols)]))
+             for field in fields),
+        names=["Field", "Date"])
+    return results
+
+class FieldStoreTestCase(unittest.TestCase):
+    """
+    Test cases for FieldStore.
+    """
+
+    def test_from_results(self):
+
+        results = make_results()
+        store = FieldStore.from_results(results)
+
+        self.assertListEqual(store.fields, ["Return", "NetExposure", "Weight"])
+        self.assertEqual(store.data.shape, (3, 20, 3))
+        self.assertEqual(store.index.name, "Date")
+        for field in store.fields:
+            returns = store.frame(field)
+            pd.testing.assert_frame_equal(returns, results.loc[field], check_freq=False)
+
+        # the store and its frames are views of the results
+        self.assertTrue(np.shares_memory(store.data, results.values))
+        self.assertTrue(np.shares_memory(store.frame("Return").values, store.data))
+
+        with self.assertRaises(KeyError):
+            store.frame("Slippage")
+
+    def test_fields_and_dtype(self):
+
+        results = make_results()
+        store = FieldStore.from_results(
+            results, fields=["Return", "Weight", "Benchmark"], dtype=np.float32)
+
+        self.assertListEqual(store.fields, ["Return", "Weight"])
+        self.assertNotIn("NetExposure", store)
+        self.assertEqual(store.data.dtype, np.float32)
+        self.assertEqual(store.nbytes, 2 * 20 * 3 * 4)
+        pd.testing.assert_frame_equal(
+            store.frame("Weight"), results.loc["Weight"].astype(np.float32), check_freq=False)
+
+    def test_unaligned_fields(self):
+
+        results = make_results()
+        # drop a date from one field only
+        results = results.drop(("Weight", pd.Timestamp("2019-01-05")))
+        self.assertIsNone(FieldStore.from_results(results))
+
+    def test_performance_views(self):
+
+        results = make_results(fields=("Return", "Commission", "Slippage", "Weight"))
+        perf = DailyPerformance._from_moonshot(results)
+
+        store = perf._store
+        self.assertListEqual(store.fields, ["Return", "Commission", "Slippage"])
+        for data in (perf.returns, perf.commissions, perf.slippages):
+            self.assertTrue(np.shares_memory(data.values, store.data))
+        pd.testing.assert_frame_equal(perf.returns, results.loc["Return"], check_freq=False)
+
+        # unaligned results fall back to slicing each field
+        results = results.drop(("Slippage", pd.Timestamp("2019-01-05")))
+        perf = DailyPerformance._from_moonshot(results)
+        self.assertIsNone(perf._store)
+        self.assertEqual(len(perf.slippages.index), 19)
+        pd.testing.assert_frame_equal(perf.returns, results.loc["Return"], check_freq=False)
+
+class GrowableArrayTestCase(unittest.TestCase):
+    """
+    Test cases for GrowableArray.
+    """
+
+    def test_append(self):
+
+        values = np.arange(6, dtype=np.float64).reshape((3, 2))
+        array = GrowableArray(values)
+        self.assertEqual(len(array), 3)
+        self.assertEqual(array.capacity, 6)
+
+        array.append(np.array([[6.0, 7.0]]))
+        buffer = array._buffer
+        array.append(np.array([[8.0, 9.0], [10.0, 11.0]]))
+        # appending within the capacity doesn't reallocate
+        self.assertIs(array._buffer, buffer)
+        np.testing.assert_array_equal(array.values, np.arange(12).reshape((6, 2)))
+
+        array.append(np.array([[12.0, 13.0]]))
+        self.assertEqual(array.capacity, 12)
+        np.testing.assert_array_equal(array.values, np.arange(14).reshape((7, 2)))
+        # each column is contiguous
+        self.assertEqual(array.values.strides[0], array.values.itemsize)
+
+class FromCsvTestCase(unittest.TestCase):
+    """
+    Test cases for FieldStore.from_csv.
+    """
+
+    def test_from_csv(self):
+
+        results = make_results(fields=("Return", "AbsWeight", "NetExposure", "Commission"), rows=25)
+        csv = io.StringIO()
+        results.to_csv(csv)
+        csv.seek(0)
+
+        store = FieldStore.from_csv(csv, fields=["Return", "Commission", "NetExposure", "Slippage"], chunksize=7)
+        # fields are stored in the requested order
+        self.assertListEqual(store.fields, ["Return", "Commission", "NetExposure"])
+        self.assertEqual(store.data.shape, (3, 25, 3))
+        for field in store.fields:
+            pd.testing.assert_frame_equal(store.frame(field), results.loc[field], check_freq=False)
+        self.assertTrue(np.shares_memory(store.frame("Return").values, store.data))
+
+        csv.seek(0)
+        store = FieldStore.from_csv(csv, fields=["Return"], chunksize=10, dtype=np.float32)
+        self.assertEqual(store.data.dtype, np.float32)
+
+        # fields with different dates can't be read in chunks
+        csv = io.StringIO()
+        results.drop(("Commission", pd.Timestamp("2019-01-05"))).to_csv(csv)
+        csv.seek(0)
+        with self.assertRaises(MoonchartError) as cm:
+            FieldStore.from_csv(csv, fields=["Return", "Commission"], chunksize=10)
+        self.assertIn("different numbers of dates (Return: 25, Commission: 24)", repr(cm.exception))
+
+    def test_performance(self):
+
+        results = make_results(fields=("Return", "AbsWeight", "Commission", "Slippage"))
+        csv = io.StringIO()
+        results.to_csv(csv)
+        csv.seek(0)
+
+        perf = DailyPerformance.from_moonshot_csv(csv, chunksize=8)
+        csv.seek(0)
+        expected = DailyPerformance.from_moonshot_csv(csv)
+        self.assertListEqual(perf._store.fields, ["Return", "Commission", "Slippage"])
+        for attr in ("returns", "commissions", "slippages", "cum_returns"):
+            pd.testing.assert_frame_equal(getattr(perf, attr), getattr(expected, attr))
@@ -0,0 +1,647 @@
+# Copyright 2019 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: python3 -m unittest discover -s tests/ -p test_*.py -t . -v
+
+import unittest
+import numpy as np
+import pandas as pd
+from moonchart.exceptions import MoonchartError
+from moonchart.backends import (
+    BACKENDS,
+    NumpyBackend,
+    NumbaBackend,
+    get_backend,
+    set_backend)
+from moonchart.utils import (
+    SUMMARY_STATS,
+    BENCHMARK_STATS,
+    ROLLING_STATS,
+    with_baseline,
+    get_sharpe,
+    get_rolling_sharpe,
+    get_rolling_stats,
+    get_cum_returns,
+    get_cagr,
+    get_log_growth,
+    get_period_returns,
+    get_period_cagr,
+    get_drawdowns,
+    get_drawdown_periods,
+    get_top_movers,
+    get_summary_stats,
+    get_benchmark_stats,
+    get_zscores,
+    get_max_zscore)
+
+def make_returns(rows=300, cols=4, seed=0):
+    """
+    Returns a DataFrame of random daily returns with some gaps and an
+    inactive stretch.
+    """
+    np.random.seed(seed)
+    returns = pd.DataFrame(
+        np.random.normal(0.0005, 0.01, (rows, cols)),
+        index=pd.date_range("2018-01-01", periods=rows, freq="B"),
+        columns=["strategy-{0}".format(i) for i in range(cols)])
+    returns.iloc[10:40, 0] = np.nan
+    returns.iloc[50:120, 1] = 0
+    return returns
+
+class RollingSharpeTestCase(unittest.TestCase):
+    """
+    Test cases for get_rolling_sharpe.
+    """
+
+    def _rolling_apply_sharpe(self, returns, window, riskfree=0):
+        rolling_returns = returns.fillna(0).rolling(window, min_periods=window)
+        return rolling_returns.apply(get_sharpe, raw=True, kwargs=dict(riskfree=riskfree))
+
+    def test_matches_rolling_apply(self):
+
+        returns = make_returns()
+
+        for riskfree in (0, 0.02/252):
+            expected = self._rolling_apply_sharpe(returns, 20, riskfree=riskfree)
+            rolling_sharpe = get_rolling_sharpe(returns, 20, riskfree=riskfree)
+
+            self.assertListEqual(list(rolling_sharpe.columns), list(returns.columns))
+            self.assertTrue(rolling_sharpe.index.equals(returns.index))
+            self.assertTrue((rolling_sharpe.isnull() == expected.isnull()).all().all())
+            # windows of constant returns have a std of 0, which the
+            # per-window computation only reproduces up to rounding noise
+            degenerate = expected.abs() > 1e6
+            np.testing.assert_allclose(
+                rolling_sharpe.where(~degenerate).values,
+                expected.where(~degenerate).values,
+                rtol=1e-8)
+
+        # windows with no returns have a Sharpe of 0...
+        self.assertTrue((get_rolling_sharpe(returns, 20).iloc[70:120, 1] == 0).all())
+        # ...unless there is a riskfree rate
+        self.assertTrue(np.isneginf(get_rolling_sharpe(returns, 20, riskfree=0.0001).iloc[70:120, 1]).all())
+
+    def test_series(self):
+
+        returns = make_returns()["strategy-0"]
+        rolling_sharpe = get_rolling_sharpe(returns, 20)
+        self.assertEqual(rolling_sharpe.name, "strategy-0")
+        np.testing.assert_allclose(
+            rolling_sharpe.values,
+            self._rolling_apply_sharpe(returns, 20).values,
+            rtol=1e-8)
+
+    def test_window_longer_than_returns(self):
+
+        returns = make_returns(rows=10)
+        self.assertTrue(get_rolling_sharpe(returns, 20).isnull().all().all())
+
+class RollingStatsTestCase(unittest.TestCase):
+    """
+    Test cases for get_rolling_stats.
+    """
+
+    def test_matches_pandas_rolling(self):
+
+        returns = make_returns()
+        benchmark_returns = make_returns(seed=1)
+        rolling_stats = get_rolling_stats(returns, [20, 60], benchmark_returns=benchmark_returns)
+        self.assertListEqual(
+            list(rolling_stats.columns.get_level_values("Field").unique()), ROLLING_STATS)
+
+        filled_returns = returns.fillna(0)
+        filled_benchmark_returns = benchmark_returns.fillna(0)
+        for window in (20, 60):
+            rolling_returns = filled_returns.rolling(window)
+            rolling_benchmark_returns = filled_benchmark_returns.rolling(window)
+            pd.testing.assert_frame_equal(
+                rolling_stats["Volatility"][window],
+                rolling_returns.std(ddof=0) * np.sqrt(252), check_names=False)
+            pd.testing.assert_frame_equal(
+                rolling_stats["Beta"][window],
+                rolling_returns.cov(filled_benchmark_returns) / rolling_benchmark_returns.var(),
+                check_names=False)
+            pd.testing.assert_frame_equal(
+                rolling_stats["Correlation"][window],
+                rolling_returns.corr(filled_benchmark_returns), check_names=False)
+            pd.testing.assert_frame_equal(
+                rolling_stats["BenchmarkVolatility"][window],
+                rolling_benchmark_returns.std(ddof=0) * np.sqrt(252), check_names=False)
+
+    def test_series_and_shared_benchmark(self):
+
+        returns = make_returns()
+        benchmark_returns = make_returns(seed=1)["strategy-1"]
+        rolling_stats = get_rolling_stats(returns, [30], benchmark_returns=benchmark_returns)
+        series_rolling_stats = get_rolling_stats(
+            returns["strategy-2"], [30], benchmark_returns=benchmark_returns)
+        self.assertListEqual(
+            list(series_rolling_stats.columns), [(field, 30) for field in ROLLING_STATS])
+        pd.testing.assert_series_equal(
+            series_rolling_stats[("Beta", 30)],
+            rolling_stats[("Beta", 30, "strategy-2")], check_names=False)
+
+    def test_without_benchmark_and_constant_windows(self):
+
+        returns = make_returns()
+        returns.iloc[100:150, 0] = 0.001
+        rolling_stats = get_rolling_stats(returns, [20, 400])
+        self.assertListEqual(list(rolling_stats.columns.get_level_values("Field").unique()), ["Volatility"])
+        volatility = rolling_stats["Volatility"][20]
+        self.assertTrue(volatility.iloc[:19].isnull().all().all())
+        # a constant window has no volatility, exactly
+        self.assertTrue((volatility.iloc[119:150, 0] == 0).all())
+        # windows longer than the returns are null
+        self.assertTrue(rolling_stats["Volatility"][400].isnull().all().all())
+
+class CagrTestCase(unittest.TestCase):
+    """
+    Test cases for get_cagr.
+    """
+
+    def test_matches_per_column_cagr(self):
+
+        returns = make_returns()
+        # a column which starts late and ends early
+        returns.iloc[:20, 2] = np.nan
+        returns.iloc[250:, 2] = np.nan
+        # a column with no returns
+        returns["strategy-4"] = np.nan
+
+        for compound in (True, False):
+            cum_returns = get_cum_returns(returns, compound=compound)
+            cagr = get_cagr(cum_returns, compound=compound)
+
+            self.assertListEqual(list(cagr.index), list(returns.columns))
+            for col in returns.columns:
+                self.assertAlmostEqual(
+                    cagr[col], get_cagr(cum_returns[col], compound=compound), places=12)
+
+        self.assertEqual(cagr["strategy-4"], 0)
+
+        col = cum_returns["strategy-2"].dropna()
+        years = (col.index[-1] - col.index[0]).days/365.0
+        self.assertAlmostEqual(cagr["strategy-2"], (col.iloc[-1] - 1)/years)
+
+    def test_single_date(self):
+
+        cum_returns = pd.DataFrame(
+            {"strategy-1": [np.nan, 1.01, np.nan],
+             "strategy-2": [1.02, np.nan, np.nan]},
+            index=pd.date_range("2019-01-01", periods=3))
+
+        # 0 days is treated as 1 day
+        cagr = get_cagr(cum_returns)
+        self.assertAlmostEqual(cagr["strategy-1"], 1.01**365 - 1)
+        self.assertAlmostEqual(cagr["strategy-2"], 1.02**365 - 1)
+
+        cagr = get_cagr(cum_returns, compound=False)
+        self.assertAlmostEqual(cagr["strategy-1"], 0.01*365)
+
+class LogGrowthTestCase(unittest.TestCase):
+    """
+    Test cases for get_log_growth, get_period_returns, and get_period_cagr.
+    """
+
+    def test_matches_cum_returns(self):
+
+        returns = make_returns()
+        for compound in (True, False):
+            log_growth = get_log_growth(returns, compound=compound)
+            self.assertEqual(log_growth.index.name, "Date")
+            # nulls carry the previous growth forward
+            self.assertFalse(log_growth.isnull().any().any())
+            if compound:
+                cum_returns = np.exp(log_growth)
+            else:
+                cum_returns = log_growth + 1
+            pd.testing.assert_frame_equal(
+                cum_returns.where(returns.notnull()),
+                get_cum_returns(returns, compound=compound))
+
+    def test_period_returns(self):
+
+        returns = make_returns()
+        log_growth = get_log_growth(returns)
+
+        period_returns = get_period_returns(log_growth, "2018-02-01", "2018-06-29")
+        expected = (returns.loc["2018-02-01":"2018-06-29"] + 1).prod() - 1
+        pd.testing.assert_series_equal(period_returns, expected)
+
+        # defaults to the full history, and works on a Series
+        self.assertAlmostEqual(
+            get_period_returns(log_growth["strategy-2"]),
+            get_cum_returns(returns["strategy-2"]).iloc[-1] - 1)
+
+        arithmetic_returns = get_period_returns(
+            get_log_growth(returns, compound=False), start="2018-03-01", compound=False)
+        pd.testing.assert_series_equal(
+            arithmetic_returns, returns.loc["2018-03-01":].sum())
+
+        with self.assertRaises(MoonchartError):
+            get_period_returns(log_growth, "2030-01-01")
+
+    def test_period_cagr(self):
+
+        returns = make_returns()
+        for compound in (True, False):
+            log_growth = get_log_growth(returns, compound=compound)
+            cum_returns = get_cum_returns(returns.iloc[1:], compound=compound)
+            # the CAGR is measured over the dates of the period, so pass
+            # ending values in a row with no nulls
+            pd.testing.assert_series_equal(
+                get_period_cagr(log_growth, start=returns.index[1], compound=compound),
+                get_cagr(cum_returns, compound=compound))
+
+    def test_long_history(self):
+
+        # the cumulative product overflows after ~70,000 bars
+        returns = pd.Series(
+            0.01, index=pd.date_range("2000-01-01", periods=100000, freq="min"))
+        with np.errstate(over="ignore"):
+            self.assertTrue(np.isinf(get_cum_returns(returns).iloc[-1]))
+
+        log_growth = get_log_growth(returns)
+        self.assertTrue(np.isfinite(log_growth.iloc[-1]))
+        self.assertAlmostEqual(
+            get_period_returns(log_growth, returns.index[-10], returns.index[-1]),
+            1.01**10 - 1)
+
+class DrawdownsTestCase(unittest.TestCase):
+    """
+    Test cases for get_drawdowns.
+    """
+
+    def _expanding_max_drawdowns(self, cum_returns):
+        cum_returns = cum_returns[cum_returns.notnull()]
+        return cum_returns/cum_returns.expanding().max() - 1
+
+    def test_matches_expanding_max(self):
+
+        returns = make_returns()
+        returns.iloc[200:, 3] = np.nan
+        cum_returns = get_cum_returns(returns)
+
+        drawdowns = get_drawdowns(cum_returns)
+        self.assertTrue(drawdowns.equals(self._expanding_max_drawdowns(cum_returns)))
+        self.assertTrue(drawdowns.iloc[10:40, 0].isnull().all())
+
+    def test_series_drops_nulls(self):
+
+        returns = make_returns()
+        cum_returns = get_cum_returns(returns)["strategy-0"]
+
+        drawdowns = get_drawdowns(cum_returns)
+        self.assertEqual(len(drawdowns.index), len(cum_returns.index) - 30)
+        self.assertTrue(drawdowns.equals(self._expanding_max_drawdowns(cum_returns)))
+
+class DrawdownPeriodsTestCase(unittest.TestCase):
+    """
+    Test cases for get_drawdown_periods.
+    """
+
+    def _loop_drawdown_periods(self, drawdowns):
+        """
+        Finds drawdown episodes one row at a time.
+        """
+        drawdowns = drawdowns.dropna()
+        periods = []
+        peak = None
+        for i, (date, drawdown) in enumerate(drawdowns.items()):
+            if drawdown < 0 and peak is None:
+                peak = drawdowns.index[i-1]
+                trough = date
+            elif drawdown < 0 and drawdown < drawdowns[trough]:
+                trough = date
+            elif drawdown == 0 and peak is not None:
+                periods.append((peak, trough, date, drawdowns[trough]))
+                peak = None
+        if peak is not None:
+            periods.append((peak, trough, pd.NaT, drawdowns[trough]))
+        return sorted(periods, key=lambda period: period[3])
+
+    def test_matches_loop(self):
+
+        returns = make_returns()
+        returns.iloc[60:65, 2] = np.nan
+        drawdowns = get_drawdowns(get_cum_returns(returns))
+        drawdown_periods = get_drawdown_periods(drawdowns)
+
+        self.assertListEqual(list(drawdown_periods.index.names), [None, "Rank"])
+        for col in returns.columns:
+            expected = self._loop_drawdown_periods(drawdowns[col])
+            periods = drawdown_periods.loc[col]
+            self.assertListEqual(list(periods.index), list(range(1, len(expected) + 1)))
+            self.assertListEqual(
+                list(periods[["Peak", "Trough", "Recovery", "Depth"]].itertuples(index=False, name=None)),
+                expected)
+
+    def test_duration(self):
+
+        drawdowns = pd.Series(
+            [0, -0.1, -0.2, 0, -0.05, np.nan, -0.03, 0, -0.01],
+            index=pd.date_range("2019-01-01", periods=9))
+
+        drawdown_periods = get_drawdown_periods(drawdowns)
+        self.assertListEqual(
+            drawdown_periods.reset_index().astype(str).to_dict(orient="records"),
+            [{'Rank': '1',
+              'Peak': '2019-01-01',
+              'Trough': '2019-01-03',
+              'Recovery': '2019-01-04',
+              'Depth': '-0.2',
+              'Duration': '3 days'},
+             {'Rank': '2',
+              'Peak': '2019-01-04',
+              'Trough': '2019-01-05',
+              'Recovery': '2019-01-08',
+              'Depth': '-0.05',
+              'Duration': '4 days'},
+             {'Rank': '3',
+              'Peak': '2019-01-08',
+              'Trough': '2019-01-09',
+              'Recovery': 'NaT',
+              'Depth': '-0.01',
+              'Duration': '1 days'}])
+
+class TopMoversTestCase(unittest.TestCase):
+    """
+    Test cases for get_top_movers.
+    """
+
+    def _sort_top_movers(self, returns, n):
+        returns = returns.stack().sort_values()
+        return pd.concat((returns.head(n), returns.tail(n)))
+
+    def test_matches_full_sort(self):
+
+        returns = make_returns()
+        returns.index.name = "Date"
+
+        top_movers = get_top_movers(returns, n=5)
+        self.assertTrue(top_movers.equals(self._sort_top_movers(returns, 5)))
+        self.assertListEqual(list(top_movers.index.names), ["Date", None])
+
+        # n larger than the data: gainers and losers overlap, as with head/tail
+        top_movers = get_top_movers(returns.iloc[:2], n=10)
+        self.assertTrue(top_movers.equals(self._sort_top_movers(returns.iloc[:2], 10)))
+
+    def test_series(self):
+
+        returns = make_returns()["strategy-0"]
+
+        top_movers = get_top_movers(returns, n=3)
+        returns = returns.dropna().sort_values()
+        self.assertTrue(top_movers.equals(pd.concat((returns.head(3), returns.tail(3)))))
+
+    def test_per_column_and_date(self):
+
+        returns = make_returns()
+
+        top_movers = get_top_movers(returns, n=3, per="column")
+        for col in returns.columns:
+            col_returns = returns[col].dropna().sort_values()
+            self.assertListEqual(
+                top_movers.xs(col, level=1).tolist(),
+                col_returns.head(3).tolist() + col_returns.tail(3).tolist())
+
+        top_movers = get_top_movers(returns, n=1, per="date")
+        self.assertEqual(len(top_movers.index), 2 * len(returns.index))
+        first_date = returns.iloc[0].sort_values()
+        self.assertListEqual(
+            top_movers.iloc[:2].tolist(), [first_date.iloc[0], first_date.iloc[-1]])
+
+class SummaryStatsTestCase(unittest.TestCase):
+    """
+    Test cases for get_summary_stats.
+    """
+
+    def test_matches_individual_stats(self):
+
+        returns = make_returns()
+        returns.iloc[0, 3] = -0.05
+
+        for compound in (True, False):
+            summary_stats = get_summary_stats(returns, riskfree=0.0001, compound=compound)
+            self.assertListEqual(list(summary_stats.index), list(returns.columns))
+            self.assertListEqual(list(summary_stats.columns), SUMMARY_STATS)
+
+            cum_returns = get_cum_returns(returns, compound=compound)
+            np.testing.assert_allclose(summary_stats.CAGR, get_cagr(cum_returns, compound=compound))
+            np.testing.assert_allclose(summary_stats.Sharpe, get_sharpe(returns, riskfree=0.0001))
+            np.testing.assert_allclose(summary_stats.MaxDrawdown, get_drawdowns(cum_returns).min())
+
+        # compounded stats are independent of the compound param
+        cum_returns_final = (returns + 1).prod() - 1
+        np.testing.assert_allclose(summary_stats.CumulativeReturn, cum_returns_final)
+        np.testing.assert_allclose(summary_stats.AnnualVolatility, returns.std() * np.sqrt(252))
+        downside_risk = np.sqrt((returns.clip(upper=0)**2).mean()) * np.sqrt(252)
+        np.testing.assert_allclose(summary_stats.Sortino, returns.mean() * 252 / downside_risk)
+
+        # Calmar includes the drop from the starting value of 1
+        annual_return = (cum_returns_final + 1)**(252/len(returns.index)) - 1
+        growth = with_baseline((returns.fillna(0) + 1).cumprod())
+        max_drawdown = get_drawdowns(growth).min()
+        np.testing.assert_allclose(summary_stats.Calmar, annual_return / max_drawdown.abs())
+
+        deviations = returns - returns.mean()
+        m2 = (deviations**2).mean()
+        np.testing.assert_allclose(summary_stats.Skew, (deviations**3).mean() / m2**1.5)
+        np.testing.assert_allclose(summary_stats.Kurtosis, (deviations**4).mean() / m2**2 - 3)
+
+    def test_series(self):
+
+        returns = make_returns()["strategy-2"]
+        cum_returns = get_cum_returns(returns)
+        summary_stats = get_summary_stats(returns, cum_returns=cum_returns)
+
+        self.assertListEqual(list(summary_stats.index), SUMMARY_STATS)
+        self.assertAlmostEqual(summary_stats["CAGR"], get_cagr(cum_returns))
+        self.assertAlmostEqual(summary_stats["Sharpe"], get_sharpe(returns))
+
+class BenchmarkStatsTestCase(unittest.TestCase):
+    """
+    Test cases for get_benchmark_stats.
+    """
+
+    def test_matches_per_column_stats(self):
+
+        returns = make_returns()
+        benchmark_returns = make_returns(seed=1)
+        benchmark_returns.iloc[200:210, 2] = np.nan
+
+        benchmark_stats = get_benchmark_stats(returns, benchmark_returns, riskfree=0.0001)
+        self.assertListEqual(list(benchmark_stats.index), list(returns.columns))
+        self.assertListEqual(list(benchmark_stats.columns), BENCHMARK_STATS)
+
+        for column in returns.columns:
+            pair = pd.concat(
+                (returns[column], benchmark_returns[column]), axis=1, keys=["r", "b"]).dropna()
+            r, b = pair.r, pair.b
+            beta = r.cov(b) / b.var()
+            stats = benchmark_stats.loc[column]
+            self.assertAlmostEqual(stats.Beta, beta)
+            self.assertAlmostEqual(stats.Alpha, ((r.mean() - 0.0001) - beta * (b.mean() - 0.0001)) * 252)
+            self.assertAlmostEqual(stats.Correlation, r.corr(b))
+            self.assertAlmostEqual(stats.TrackingError, (r - b).std() * np.sqrt(252))
+            self.assertAlmostEqual(stats.InformationRatio, (r - b).mean() / (r - b).std() * np.sqrt(252))
+            self.assertAlmostEqual(stats.UpCapture, r[b > 0].mean() / b[b > 0].mean())
+            self.assertAlmostEqual(stats.DownCapture, r[b < 0].mean() / b[b < 0].mean())
+
+    def test_series(self):
+
+        returns = make_returns()["strategy-3"]
+        benchmark_stats = get_benchmark_stats(returns, returns)
+        self.assertListEqual(list(benchmark_stats.index), BENCHMARK_STATS)
+        self.assertAlmostEqual(benchmark_stats["Beta"], 1)
+        self.assertAlmostEqual(benchmark_stats["Correlation"], 1)
+        self.assertAlmostEqual(benchmark_stats["UpCapture"], 1)
+        # no active returns, so no information ratio
+        self.assertEqual(benchmark_stats["TrackingError"], 0)
+        self.assertTrue(np.isnan(benchmark_stats["InformationRatio"]))
+
+class MaxZscoreTestCase(unittest.TestCase):
+    """
+    Test cases for get_max_zscore.
+    """
+
+    def test_matches_zscores(self):
+
+        returns = make_returns()
+        # a column whose nonzero returns are all negative, so the max is 0
+        returns["strategy-3"] = -returns["strategy-3"].abs()
+        returns.iloc[5, 2] = 0.3
+
+        self.assertAlmostEqual(
+            get_max_zscore(returns), get_zscores(returns).abs().max().max())
+
+        for col in returns.columns:
+            self.assertAlmostEqual(
+                get_max_zscore(returns[col]), get_zscores(returns[col]).abs().max())
+
+    def test_no_nonzero_returns(self):
+
+        returns = pd.DataFrame(0, index=range(5), columns=["a", "b"], dtype=float)
+        self.assertTrue(np.isnan(get_max_zscore(returns)))
+
+@unittest.skipIf("numba" not in BACKENDS, "numba not installed")
+class BackendsTestCase(unittest.TestCase):
+    """
+    Test cases comparing the Numba backend to the NumPy backend.
+    """
+
+    def setUp(self):
+        returns = make_returns(rows=500, cols=150)
+        returns.iloc[100:300, 7] = 0.001
+        returns.iloc[400, 9] = 0.5
+        self.returns = returns.values
+        self.numpy = NumpyBackend()
+        self.numba = NumbaBackend()
+
+    def test_identical_kernels(self):
+
+        for compound in (True, False):
+            cum_returns = self.numpy.cum_returns(self.returns, compound=compound)
+            np.testing.assert_array_equal(
+                self.numba.cum_returns(self.returns, compound=compound), cum_returns)
+            np.testing.assert_array_equal(
+                self.numba.drawdowns(cum_returns), self.numpy.drawdowns(cum_returns))
+
+        # 1-d arrays are supported too
+        np.testing.assert_array_equal(
+            self.numba.cum_returns(self.returns[:, 0]),
+            self.numpy.cum_returns(self.returns[:, 0]))
+
+        # float32 arrays are accumulated and divided in float64 by both
+        returns = self.returns.astype(np.float32)
+        for compound in (True, False):
+            cum_returns = self.numpy.cum_returns(returns, compound=compound)
+            np.testing.assert_array_equal(
+                self.numba.cum_returns(returns, compound=compound), cum_returns)
+            np.testing.assert_array_equal(
+                self.numba.drawdowns(cum_returns), self.numpy.drawdowns(cum_returns))
+        initial = np.random.uniform(1, 2, returns.shape[1])
+        np.testing.assert_array_equal(
+            self.numba.cum_returns(returns, initial=initial),
+            self.numpy.cum_returns(returns, initial=initial))
+        np.testing.assert_array_equal(
+            self.numba.drawdowns(cum_returns, initial=initial),
+            self.numpy.drawdowns(cum_returns, initial=initial))
+
+    def test_tolerance_kernels(self):
+
+        excess_returns = np.nan_to_num(self.returns) - 0.0001
+        np.testing.assert_allclose(
+            self.numba.rolling_sharpe(excess_returns, 50),
+            self.numpy.rolling_sharpe(excess_returns, 50),
+            rtol=1e-10)
+        np.testing.assert_allclose(
+            self.numba.zscores(self.returns), self.numpy.zscores(self.returns), rtol=1e-10)
+        np.testing.assert_allclose(
+            self.numba.max_zscores(self.returns), self.numpy.max_zscores(self.returns), rtol=1e-10)
+
+    def test_large_mean_small_std(self):
+
+        # the variance must not come from the difference of the sums of
+        # squares, which cancels when the mean dwarfs the std
+        np.random.seed(0)
+        returns = np.random.normal(0.05, 1e-6, (500, 20))
+        returns[::7, 3] = 0
+        returns[::11, 5] = np.nan
+        np.testing.assert_allclose(
+            self.numba.max_zscores(returns), self.numpy.max_zscores(returns), rtol=1e-10)
+        nonzero = np.where(returns != 0, returns, np.nan)
+        np.testing.assert_allclose(
+            self.numpy.max_zscores(returns),
+            np.nanmax(np.abs(nonzero - np.nanmean(nonzero, axis=0)), axis=0)
+            / np.nanstd(nonzero, axis=0, ddof=1),
+            rtol=1e-10)
+
+    def test_float32(self):
+
+        returns = self.returns.astype(np.float32)
+        excess_returns = np.nan_to_num(returns) - np.float32(0.0001)
+        for backend in (self.numpy, self.numba):
+            cum_returns = backend.cum_returns(returns)
+            results = [
+                (cum_returns, self.numpy.cum_returns(self.returns)),
+                (backend.drawdowns(cum_returns), self.numpy.drawdowns(self.numpy.cum_returns(self.returns))),
+                (backend.rolling_sharpe(excess_returns, 50), self.numpy.rolling_sharpe(
+                    excess_returns.astype(np.float64), 50)),
+                (backend.zscores(returns), self.numpy.zscores(self.returns)),
+            ]
+            for result, expected in results:
+                # results keep the storage dtype but are accumulated in float64
+                self.assertEqual(result.dtype, np.float32)
+                np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+    def test_fallback(self):
+
+        # 3-d arrays aren't compiled, so fall back to numpy
+        returns = self.returns.reshape((500, 15, 10))
+        np.testing.assert_array_equal(
+            self.numba.cum_returns(returns), self.numpy.cum_returns(returns))
+
+    def test_set_backend(self):
+
+        backend = get_backend()
+        try:
+            set_backend("numpy")
+            self.assertEqual(get_backend().name, "numpy")
+            set_backend("auto")
+            self.assertEqual(get_backend().name, "numba")
+            with self.assertRaises(MoonchartError):
+                set_backend("fortran")
+        finally:
+            set_backend(backend.name)